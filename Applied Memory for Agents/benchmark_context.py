@@ -0,0 +1,85 @@
+"""
+Request size over long sessions, with and without ContextManager's token budget.
+
+Run with:  python benchmark_context.py [--turns 500] [--max-tokens 4000] [--keep-turns 4]
+
+Replays a synthetic conversation (a user message, one tool call in every
+third turn, an assistant answer) and reports the input tokens the next
+request would send at a few checkpoints, the tokens sent in total over
+the session and the time spent in fit_to_budget. No API calls are made.
+"""
+import argparse
+import random
+import time
+
+from context import ContextManager
+
+WORDS = "task laundry groceries call report meeting review draft email plan budget trip dentist".split()
+
+
+def synthetic_turn(i: int, rng: random.Random) -> list[dict]:
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    items = []
+    if i % 3 == 0:
+        items.append({
+            "type": "function_call",
+            "call_id": f"call_{i}",
+            "name": "create_task",
+            "arguments": f'{{"name": "{sentence(3)}", "status": "to-do"}}',
+        })
+        items.append({
+            "type": "function_call_output",
+            "call_id": f"call_{i}",
+            "output": f"Task '{sentence(3)}' created with status 'to-do'.",
+        })
+    items.append({"role": "assistant", "content": sentence(rng.randint(20, 80))})
+    return items
+
+
+def run(turns: int, max_tokens: int, keep_turns: int, compact: bool, checkpoints: set):
+    rng = random.Random(7)
+    context = ContextManager(max_tokens=max_tokens, keep_turns=keep_turns)
+    sent_total = 0
+    fit_seconds = 0.0
+    sizes = {}
+
+    for i in range(1, turns + 1):
+        context.add_user_message(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))))
+        if compact:
+            start = time.perf_counter()
+            context.fit_to_budget()
+            fit_seconds += time.perf_counter() - start
+
+        request = context.token_count()
+        sent_total += request
+        if i in checkpoints:
+            sizes[i] = request
+
+        context.update_messages(context.get_context() + synthetic_turn(i, rng))
+
+    return sizes, sent_total, fit_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    parser.add_argument("--keep-turns", type=int, default=4)
+    args = parser.parse_args()
+
+    checkpoints = {n for n in (1, 10, 50, 100, 250, 500, 1000) if n <= args.turns} | {args.turns}
+    full, full_total, _ = run(args.turns, args.max_tokens, args.keep_turns, False, checkpoints)
+    kept, kept_total, fit_s = run(args.turns, args.max_tokens, args.keep_turns, True, checkpoints)
+
+    print(f"Request input tokens, budget {args.max_tokens:,}, {args.keep_turns} pinned turns")
+    print(f"{'turn':>6} {'full history':>14} {'budgeted':>10}")
+    for turn in sorted(checkpoints):
+        print(f"{turn:>6} {full[turn]:>14,} {kept[turn]:>10,}")
+    print(f"{'total':>6} {full_total:>14,} {kept_total:>10,}")
+    print(f"\nfit_to_budget: {fit_s * 1000:.1f} ms over {args.turns} turns ({fit_s / args.turns * 1e6:.0f} us per call)")
+
+
+if __name__ == "__main__":
+    main()
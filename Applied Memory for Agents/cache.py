@@ -0,0 +1,120 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize(message: str) -> str:
+    """Lowercase, without punctuation, with single spaces."""
+    return " ".join(PUNCTUATION_RE.sub(" ", message.lower()).split())
+
+
+class ResponseCache:
+    """
+    Answers to read-only questions, reused while the data they were built
+    from has not changed.
+
+    Entries are keyed on (session, normalized message) and stamped with the
+    tasks store version they were computed at; a lookup at a newer version
+    drops every entry, so any change to the tasks invalidates the cache.
+    `invalidate` drops the entries of one session, e.g. when a fact is
+    saved to its long-term memory. Entries also expire after `ttl` seconds, and the least recently used
+    are evicted past `max_entries`.
+
+    With `embed` and `similarity`, a message that misses exactly still hits
+    an entry of the same session whose message embedding has a cosine
+    similarity >= `similarity` (e.g. "what's on my to-do list" and "what
+    is on my todo list?").
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        embed: Optional[Callable[[list[str]], np.ndarray]] = None,
+        similarity: float = 0.92,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity = similarity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[str, float, Optional[np.ndarray]]] = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, version: int):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def _expire(self, now: float):
+        # entries are in insertion/use order, but TTL counts from insertion
+        expired = [key for key, (_, created, _) in self._entries.items() if now - created > self.ttl]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, session_id: str, message: str, version: int) -> Optional[str]:
+        key = (session_id, normalize(message))
+        with self._lock:
+            self._sync_version(version)
+            self._expire(time.monotonic())
+            entry = self._entries.get(key)
+            has_candidates = any(k[0] == session_id for k in self._entries)
+
+        if entry is None and self.embed is not None and has_candidates:
+            query = self._embed(key[1])  # outside the lock: may be an API call
+            with self._lock:
+                candidates = [(k, e) for k, e in self._entries.items() if k[0] == session_id]
+                if candidates:
+                    scores = np.array([e[2] @ query for _, e in candidates])
+                    best = int(scores.argmax())
+                    if scores[best] >= self.similarity:
+                        key, entry = candidates[best]
+
+        with self._lock:
+            if entry is None or key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, session_id: str, message: str, version: int, answer: str):
+        key = (session_id, normalize(message))
+        vector = self._embed(key[1]) if self.embed is not None else None
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = (answer, time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str):
+        """Drop the entries of `session_id`."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,224 @@
+from typing import Callable, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when it is installed (and its encoding
+    can be loaded), else estimates them as one token per 4 characters.
+    """
+
+    def __init__(self, encoding: str = "o200k_base"):
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding)
+            except Exception:  # the encoding file is downloaded on first use
+                self._encoding = None
+
+    def __call__(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+
+def item_text(item) -> str:
+    """Text of a context item: a message dict, a tool output dict or a Responses API output item."""
+    if isinstance(item, dict):
+        if "content" in item:
+            content = item["content"] or ""
+            if isinstance(content, list):  # a stored Responses API message
+                return "".join(part.get("text", "") for part in content)
+            return content
+        if "output" in item:
+            return item["output"] or ""
+        return item.get("name", "") + item.get("arguments", "")
+
+    if item.type == "message":
+        return "".join(getattr(part, "text", "") for part in item.content)
+    if item.type == "function_call":
+        return item.name + item.arguments
+    return ""
+
+
+def item_to_dict(item) -> dict:
+    """JSON-serializable form of a context item (Responses API output items are pydantic models)."""
+    if isinstance(item, dict):
+        return item
+    return item.model_dump(exclude_none=True)
+
+
+def item_role(item) -> Optional[str]:
+    if isinstance(item, dict):
+        return item.get("role")
+    return getattr(item, "role", None)
+
+
+def extractive_summary(summary: str, turn: list) -> str:
+    """
+    Default summarizer: one line per user/assistant message of the dropped
+    turn, cut to its first 120 characters. Tool calls are left out; their
+    effect is visible in the assistant's answer.
+    """
+    lines = [summary] if summary else []
+    for item in turn:
+        role = item_role(item)
+        if role in {"user", "assistant"}:
+            text = " ".join(item_text(item).split())
+            if len(text) > 120:
+                text = text[:117] + "..."
+            lines.append(f"{role}: {text}")
+    return "\n".join(lines)
+
+
+class ContextManager:
+    """
+    Conversation context with a token budget.
+
+    `fit_to_budget` (run before each LLM call) folds the oldest turns into
+    a rolling summary until the context fits in `max_tokens`, of which up
+    to `summary_tokens` go to the summary and the recalled memories take
+    what they need. A turn is a user message plus everything that
+    followed it, so tool calls are never separated from their outputs.
+    The last `keep_turns` turns (and always the turn in progress) are
+    pinned and sent verbatim, even when they alone exceed the budget; the
+    summary is kept under `summary_tokens` by dropping its oldest lines.
+    """
+
+    SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+    RECALL_PREFIX = "Possibly relevant memories from past conversations:\n"
+
+    def __init__(
+        self,
+        max_tokens: int = 4000,
+        keep_turns: int = 4,
+        summary_tokens: int = 800,
+        summarizer: Callable[[str, list], str] = extractive_summary,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        self.messages: list[dict] = []
+        self.summary = ""
+        self.recalled: list[str] = []  # long-term memories shown before the next call only
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.count_tokens = count_tokens or TokenCounter()
+        self._summary_item = None
+        self._recall_item = None
+
+    def add_user_message(self, message: str):
+        self.messages.append({
+            "role": "user", "content": message
+        })
+
+    def update_messages(self, messages: list[dict]):
+        self.messages = [
+            msg for msg in messages
+            if msg is not self._summary_item and msg is not self._recall_item
+        ]
+
+    def get_repr(self):
+        """Function for showing context for easier solving of optional tasks"""
+        msgs = []
+        for elem in self.get_context():
+            if type(elem) is dict:
+                if 'role' in elem:
+                    msgs.append(elem['role'] + ': ' + item_text(elem)[:15] + '...')
+                else:
+                    msgs.append(elem['type'] + ': ' + elem['output'][:15] + '...')
+            else:
+                msgs.append(str(elem.type))
+        return 'Context:\n\t' + "\n\t".join(msgs) + '\n-------'
+
+    def set_recalled(self, memories: list[str]):
+        self.recalled = memories
+        self._recall_item = None
+
+    def get_context(self) -> list[dict]:
+        context = []
+        if self.summary:
+            if self._summary_item is None:
+                self._summary_item = {"role": "developer", "content": self.SUMMARY_PREFIX + self.summary}
+            context.append(self._summary_item)
+        if self.recalled:
+            if self._recall_item is None:
+                self._recall_item = {"role": "developer", "content": self._recall_text()}
+            context.append(self._recall_item)
+        return context + self.messages
+
+    def _recall_text(self) -> str:
+        return self.RECALL_PREFIX + "\n".join(f"- {memory}" for memory in self.recalled)
+
+    def compact(self):
+        compacted = []
+        for msg in self.messages:
+            if isinstance(msg, dict) and msg.get("role") in {"user", "assistant"}:
+                compacted.append(msg)
+        self.messages = compacted
+
+    # --------------------------------------------------
+    # Token budget
+    # --------------------------------------------------
+    def _turns(self) -> list[list]:
+        turns = []
+        for item in self.messages:
+            if item_role(item) == "user" or not turns:
+                turns.append([])
+            turns[-1].append(item)
+        return turns
+
+    def _tokens(self, items) -> int:
+        # a few tokens of per-item framing on top of the text
+        return sum(self.count_tokens(item_text(item)) + 4 for item in items)
+
+    def turn_count(self) -> int:
+        """Turns currently in the live context."""
+        return sum(1 for item in self.messages if item_role(item) == "user")
+
+    def token_count(self) -> int:
+        """Tokens the next request's input will use."""
+        return self._tokens(self.get_context())
+
+    def fit_to_budget(self) -> int:
+        """Fold old turns into the summary until the context fits. Returns the number of turns folded."""
+        turns = self._turns()
+        turn_tokens = [self._tokens(turn) for turn in turns]
+        total = sum(turn_tokens)
+        recall_tokens = self._tokens([{"content": self._recall_text()}]) if self.recalled else 0
+        summary_tokens = self._tokens([{"content": self.SUMMARY_PREFIX + self.summary}]) if self.summary else 0
+        if total + summary_tokens + recall_tokens <= self.max_tokens:
+            return 0
+
+        # the summary may grow up to summary_tokens, so reserve that much
+        budget = self.max_tokens - self.summary_tokens - recall_tokens
+        pinned = max(self.keep_turns, 1)  # the last turn may be waiting for tool outputs
+
+        folded = 0
+        while total > budget and len(turns) - folded > pinned:
+            self.summary = self.summarizer(self.summary, turns[folded])
+            total -= turn_tokens[folded]
+            folded += 1
+
+        if not folded:
+            return 0
+
+        lines = self.summary.split("\n")
+        while len(lines) > 1 and self.count_tokens("\n".join(lines)) > self.summary_tokens:
+            del lines[: max(1, len(lines) // 8)]
+        self.summary = "\n".join(lines)
+
+        self.messages = [item for turn in turns[folded:] for item in turn]
+        self._summary_item = None
+        return folded
+
+    def reset(self):
+        self.messages = []
+        self.summary = ""
+        self.recalled = []
+        self._summary_item = None
+        self._recall_item = None
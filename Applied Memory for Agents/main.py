@@ -1,54 +1,48 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import atexit
+import functools
 import os
+import threading
+import time
+from typing import Annotated, AsyncIterator, Literal, get_args
 import dotenv
+import numpy as np
 from tinydb import TinyDB, Query
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
 from enum import Enum
 
+from cache import ResponseCache
+from context import ContextManager, item_role
+from memory import HashingEmbedder, MemoryStore
+from sessions import SessionManager
+from tools import ToolRegistry
+
 dotenv.load_dotenv()
 
 CLIENT = OpenAI(
     base_url=os.getenv("OPENAI_BASE_URL"),
     api_key=os.getenv("OPENAI_API_KEY")
 )
+ASYNC_CLIENT = AsyncOpenAI(
+    base_url=os.getenv("OPENAI_BASE_URL"),
+    api_key=os.getenv("OPENAI_API_KEY")
+)
 
 
-class ContextManager:
-    def __init__(self):
-        self.messages: list[dict] = []
-
-    def add_user_message(self, message: str):
-        self.messages.append({
-            "role": "user", "content": message
-        })
-
-    def update_messages(self, messages: list[dict]):
-        self.messages = messages
-
-    def get_repr(self):
-        """Function for showing context for easier solving of optional tasks"""
-        msgs = []
-        for elem in self.messages:
-            if type(elem) is dict:
-                if 'role' in elem:
-                    msgs.append(elem['role'] + ': ' + elem['content'][:15] + '...')
-                else:
-                    msgs.append(elem['type'] + ': ' + elem['output'][:15] + '...')
-            else:
-                msgs.append(str(elem.type))
-        return 'Context:\n\t' + "\n\t".join(msgs) + '\n-------'
-
-    def get_context(self) -> list[dict]:
-        return self.messages.copy()
+class OpenAIEmbedder:
+    """Embeddings from the API (set EMBEDDING_MODEL, e.g. text-embedding-3-small)."""
 
-    def compact(self):
-        compacted = []
-        for msg in self.messages:
-            if isinstance(msg, dict) and msg.get("role") in {"user", "assistant"}:
-                compacted.append(msg)
-        self.messages = compacted
+    def __init__(self, model: str):
+        self.model = model
+        self.name = f"openai:{model}"
 
-    def reset(self):
-        self.messages = []
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        response = CLIENT.embeddings.create(model=self.model, input=texts)
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
 
 
 class MatchType(Enum):
@@ -56,31 +50,116 @@ class MatchType(Enum):
     CONTAINS = "contains"
 
 
+Status = Literal["to-do", "in-progress", "done"]
+StatusFilter = Literal["to-do", "in-progress", "done", "any"]
+
+
+def _locked(method):
+    """Run the method under the store's lock (tools may be called from several threads)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TasksStore:
-    VALID_STATUSES = {"to-do", "in-progress", "done"}
+    VALID_STATUSES = set(get_args(Status))
 
-    def __init__(self):
-        self.db = TinyDB('tasks.json')
+    def __init__(self, path: str = 'tasks.json', flush_every: int = 20):
+        """
+        Tasks live in memory (CachingMiddleware) and are written to `path`
+        every `flush_every` changes, on `sync()` and at exit, instead of
+        on every tool call.
 
-    def create_task(self, name: str, status: str) -> str:
+        name -> doc_ids and status -> doc_ids maps answer exact lookups
+        without scanning the table; they are kept in sync by every write.
+        """
+        self.db = TinyDB(path, storage=CachingMiddleware(JSONStorage))
+        self.db.storage.WRITE_CACHE_SIZE = flush_every
+        atexit.register(self.close)
+        self._lock = threading.RLock()
+        # bumped by every change, so cached answers can tell they are stale
+        self.version = 0
+
+        self._ids_by_name: dict[str, set[int]] = {}
+        self._ids_by_status: dict[str, set[int]] = {}
+        for doc in self.db.all():
+            self._index(doc.doc_id, doc["name"], doc["status"])
+
+    def _index(self, doc_id: int, name: str, status: str):
+        self.version += 1
+        self._ids_by_name.setdefault(name, set()).add(doc_id)
+        self._ids_by_status.setdefault(status, set()).add(doc_id)
+
+    def _select(self, status: str = "any", name_contains: str = "") -> set[int]:
+        """doc_ids of the tasks with `status` whose name contains `name_contains` (case-insensitive)."""
+        if status == "any":
+            doc_ids = set().union(*self._ids_by_status.values())
+        else:
+            doc_ids = set(self._ids_by_status.get(status, ()))
+        if name_contains:
+            needle = name_contains.lower()
+            doc_ids &= set().union(
+                *(ids for name, ids in self._ids_by_name.items() if needle in name.lower())
+            )
+        return doc_ids
+
+    def _set_status(self, doc_ids: set[int], new_status: str):
+        """One multi-document update, then the status index."""
+        self.version += 1
+        self.db.update({"status": new_status}, doc_ids=list(doc_ids))
+        for ids in self._ids_by_status.values():
+            ids -= doc_ids
+        self._ids_by_status.setdefault(new_status, set()).update(doc_ids)
+
+    def _lookup(self, key: str, value: str):
+        """doc_ids for an exact match on an indexed key, or None if not indexed."""
+        if key == "name":
+            return self._ids_by_name.get(value, set())
+        if key == "status":
+            return self._ids_by_status.get(value, set())
+        return None
+
+    @_locked
+    def create_task(
+        self,
+        name: Annotated[str, "Task name"],
+        status: Annotated[Status, "Initial task status"]
+    ) -> str:
+        """Create a new task with a name and status."""
         if status not in self.VALID_STATUSES:
             return f"Invalid status '{status}'. Valid statuses: {', '.join(self.VALID_STATUSES)}"
 
-        self.db.insert({
+        doc_id = self.db.insert({
             "name": name,
             "status": status
         })
+        self._index(doc_id, name, status)
         return f"Task '{name}' created with status '{status}'."
 
-    def find_task(self, key: str, value: str, match: MatchType = MatchType.EQ) -> str:
+    @_locked
+    def find_task(
+        self,
+        key: Annotated[Literal["name", "status"], "Field name to search (name or status)."],
+        value: Annotated[str, "Field value to match."],
+        match: Annotated[MatchType, "Match type (exact or contains)."] = MatchType.EQ
+    ) -> str:
+        """Find tasks by a field value (exact or pattern match)."""
         Task = Query()
 
-        if match == MatchType.EQ.value:
+        try:
+            match = MatchType(match)
+        except ValueError:
+            return "Invalid match type."
+
+        doc_ids = self._lookup(key, value) if match == MatchType.EQ else None
+        if doc_ids is not None:
+            results = [self.db.get(doc_id=doc_id) for doc_id in sorted(doc_ids)]
+        elif match == MatchType.EQ:
             results = self.db.search(Task[key] == value)
-        elif match == MatchType.CONTAINS.value:
-            results = self.db.search(Task[key].matches(value))
         else:
-            return "Invalid match type."
+            results = self.db.search(Task[key].matches(value))
 
         if not results:
             return "No matching tasks found."
@@ -89,147 +168,448 @@ class TasksStore:
             f"- {task['name']} [{task['status']}]" for task in results
         )
 
-    def update_task_status(self, name: str, new_status: str) -> str:
+    @_locked
+    def update_task_status(
+        self,
+        name: Annotated[str, "Task name"],
+        new_status: Annotated[Status, "New task status"]
+    ) -> str:
+        """Update the status of an existing task."""
         if new_status not in self.VALID_STATUSES:
             return f"Invalid status '{new_status}'. Valid statuses: {', '.join(self.VALID_STATUSES)}"
 
-        Task = Query()
-        updated = self.db.update(
-            {"status": new_status},
-            Task.name == name
-        )
-
-        if not updated:
+        doc_ids = self._ids_by_name.get(name)
+        if not doc_ids:
             return f"No task found with name '{name}'."
 
+        self._set_status(doc_ids, new_status)
         return f"Task '{name}' updated to status '{new_status}'."
 
+    @_locked
+    def create_tasks(
+        self,
+        names: Annotated[list[str], "Names of the tasks to create"],
+        status: Annotated[Status, "Initial status of every task"]
+    ) -> str:
+        """Create several tasks with the same status in one call."""
+        if status not in self.VALID_STATUSES:
+            return f"Invalid status '{status}'. Valid statuses: {', '.join(self.VALID_STATUSES)}"
+        if not names:
+            return "No task names given."
+
+        doc_ids = self.db.insert_multiple({"name": name, "status": status} for name in names)
+        for doc_id, name in zip(doc_ids, names):
+            self._index(doc_id, name, status)
+        return f"Created {len(names)} tasks with status '{status}': " + ", ".join(f"'{name}'" for name in names)
+
+    @_locked
+    def update_tasks_status(
+        self,
+        new_status: Annotated[Status, "New status of the matching tasks"],
+        status: Annotated[StatusFilter, "Only update tasks that currently have this status"] = "any",
+        name_contains: Annotated[str, "Only update tasks whose name contains this text (case-insensitive)"] = ""
+    ) -> str:
+        """Update the status of every task matching the filters, e.g. all in-progress tasks."""
+        if new_status not in self.VALID_STATUSES:
+            return f"Invalid status '{new_status}'. Valid statuses: {', '.join(self.VALID_STATUSES)}"
+
+        doc_ids = self._select(status, name_contains)
+        if not doc_ids:
+            return "No matching tasks found."
+
+        self._set_status(doc_ids, new_status)
+        return f"Updated {len(doc_ids)} tasks to status '{new_status}'."
+
+    @_locked
+    def find_tasks(
+        self,
+        status: Annotated[StatusFilter, "Only list tasks with this status"] = "any",
+        name_contains: Annotated[str, "Only list tasks whose name contains this text (case-insensitive)"] = "",
+        page: Annotated[int, "Page number, starting at 1"] = 1,
+        page_size: Annotated[int, "Tasks per page (at most 100)"] = 20
+    ) -> str:
+        """List the tasks matching the filters, a page at a time, oldest first."""
+        page_size = min(max(page_size, 1), 100)
+        page = max(page, 1)
+
+        doc_ids = sorted(self._select(status, name_contains))
+        if not doc_ids:
+            return "No matching tasks found."
+
+        pages = (len(doc_ids) + page_size - 1) // page_size
+        selected = doc_ids[(page - 1) * page_size:page * page_size]
+        if not selected:
+            return f"Page {page} is past the last page ({pages})."
+
+        return f"Found {len(doc_ids)} tasks (page {page} of {pages}):\n" + "\n".join(
+            f"- {task['name']} [{task['status']}]"
+            for task in (self.db.get(doc_id=doc_id) for doc_id in selected)
+        )
+
+    @_locked
     def flush(self):
+        self.version += 1
         self.db.truncate()
+        self._ids_by_name.clear()
+        self._ids_by_status.clear()
+
+    @_locked
+    def sync(self):
+        """Write pending changes to disk now."""
+        self.db.storage.flush()
+
+    @_locked
+    def close(self):
+        self.db.close()
 
 
 class PersonalAssistant:
+    MAX_TOOL_ITERATIONS = 8
+
     def __init__(self):
         """
-        TODO: fill tools list with correct tool descriptions. Match tool names to function names. And tool parameters to function parameters.
-
-        As a hint, check how tool_result is obtained during tool call phase.
+        The tools' JSON schemas are built from the signatures and docstrings
+        of the registered methods (see tools.ToolRegistry), and every call is
+        validated against them before it runs.
         """
-        self.tools = [
-            {
-                "type": "function",
-                "name": "find_task",
-                "description": "Find tasks by a field value (exact or pattern match).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "key": {"type": "string", "description": "Field name to search (name or status)."},
-                        "value": {"type": "string", "description": "Field value to match."},
-                        "match": {
-                            "type": "string",
-                            "enum": ["eq", "contains"],
-                            "description": "Match type (exact or contains).",
-                            "default": "eq"  # default makes it optional
-                        }
-                    },
-                    "required": ["key", "value"],  # match is optional because it has a default
-                    "additionalProperties": False
-                }
-            },
-            {
-                "type": "function",
-                "name": "create_task",
-                "description": "Create a new task with a name and status.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "Task name"},
-                        "status": {
-                            "type": "string",
-                            "enum": ["to-do", "in-progress", "done"],
-                            "description": "Initial task status"
-                        }
-                    },
-                    "required": ["name", "status"],
-                    "additionalProperties": False
-                }
-            },
-            {
-                "type": "function",
-                "name": "update_task_status",
-                "description": "Update the status of an existing task.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {"type": "string", "description": "Task name"},
-                        "new_status": {
-                            "type": "string",
-                            "enum": ["to-do", "in-progress", "done"],
-                            "description": "New task status"
-                        }
-                    },
-                    "required": ["name", "new_status"],
-                    "additionalProperties": False
-                }
-            }
-        ]
-
         # to store data
         self.tasks_store = TasksStore()
 
-        self.tool_map = {
-            "find_task": self.tasks_store.find_task,
-            "create_task": self.tasks_store.create_task,
-            "update_task_status": self.tasks_store.update_task_status
+        self.tool_registry = ToolRegistry()
+        self.tool_registry.register(self.tasks_store.find_task)
+        self.tool_registry.register(self.tasks_store.create_task)
+        self.tool_registry.register(self.tasks_store.update_task_status)
+        self.tool_registry.register(self.tasks_store.create_tasks)
+        self.tool_registry.register(self.tasks_store.update_tasks_status)
+        self.tool_registry.register(self.tasks_store.find_tasks)
+        self.tool_registry.register(self.remember_fact, injected=("session_id",))
+        self.tools = self.tool_registry.schemas()
+
+        # to recall past turns and facts that are no longer in the context
+        embedding_model = os.getenv("EMBEDDING_MODEL")
+        self.memory = MemoryStore(
+            "memory",
+            embed=OpenAIEmbedder(embedding_model) if embedding_model else HashingEmbedder()
+        )
+
+        # to manage one context per conversation (see send_message's session_id);
+        # an evicted session's memories leave RAM with it
+        self.sessions = SessionManager("sessions", context_factory=ContextManager, on_evict=self.memory.unload)
+        atexit.register(self.sessions.save_all)
+
+        # to answer repeated read-only questions without an LLM call;
+        # near-duplicate matching only with real embeddings
+        self.response_cache = ResponseCache(embed=self.memory.embed if embedding_model else None)
+
+        # to run the read-only tool calls of one response concurrently
+        self.tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool")
+        # per-step timings of the last _call_llm
+        self.last_timings: list[dict] = []
+        # first-token and total latency of the last send_message_stream
+        self.last_stream_metrics: dict = {}
+
+    RECALL_K = 3
+    # tools that change nothing: they may run concurrently, and turns that
+    # only use them can be cached
+    READ_ONLY_TOOLS = {"find_task", "find_tasks"}
+
+    def send_message(self, message: str, session_id: str = "default") -> str:
+        """
+        Answer `message` in the conversation `session_id`. Different
+        sessions may be served concurrently; concurrent messages to one
+        session wait their turn. The task store is shared by all sessions.
+        """
+        with self.sessions.use(session_id) as context_manager:
+            answer = self._cached_answer(context_manager, message, session_id)
+            if answer is not None:
+                return answer
+
+            version = self.tasks_store.version
+            context = self._start_turn(context_manager, message, session_id)
+            context = self._call_llm(context_manager, context, session_id)
+            return self._end_turn(context_manager, message, session_id, context, version)
+
+    async def send_message_stream(self, message: str, session_id: str = "default") -> AsyncIterator[str]:
+        """
+        Like send_message, but yields the answer's text deltas as they
+        arrive. Tool calls are collected from each streamed response and
+        run as in _call_llm, off the event loop. The time to the first
+        delta and the total time are kept in last_stream_metrics.
+        """
+        async with self.sessions.use_async(session_id) as context_manager:
+            async for delta in self._stream_turn(context_manager, message, session_id):
+                yield delta
+
+    async def _stream_turn(self, context_manager: ContextManager, message: str, session_id: str) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        first_token_seconds = None
+        self.last_timings = []
+
+        answer = await asyncio.to_thread(self._cached_answer, context_manager, message, session_id)
+        if answer is not None:
+            yield answer
+            elapsed = time.perf_counter() - start
+            self.last_stream_metrics = {"first_token_seconds": elapsed, "total_seconds": elapsed}
+            return
+
+        version = self.tasks_store.version
+        context = await asyncio.to_thread(self._start_turn, context_manager, message, session_id)
+
+        for step in range(self.MAX_TOOL_ITERATIONS):
+            # token counting and summarizing: off the loop like the other blocking steps
+            context = await asyncio.to_thread(self._budgeted, context_manager, context)
+            step_start = time.perf_counter()
+            stream = await ASYNC_CLIENT.responses.create(
+                model="gpt-4o-mini",
+                input=context,
+                tools=self.tools,
+                tool_choice="auto" if step < self.MAX_TOOL_ITERATIONS - 1 else "none",
+                stream=True
+            )
+            response = None
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    if first_token_seconds is None:
+                        first_token_seconds = time.perf_counter() - start
+                    yield event.delta
+                elif event.type in ("response.completed", "response.incomplete"):
+                    response = event.response
+            if response is None:
+                raise RuntimeError("The response stream ended before the response was completed")
+            llm_seconds = time.perf_counter() - step_start
+
+            context += response.output
+
+            calls = [item for item in response.output if item.type == "function_call"]
+            tools_start = time.perf_counter()
+            results = await asyncio.to_thread(self._run_tools, calls, session_id)
+            self.last_timings.append({
+                "step": step,
+                "llm_seconds": llm_seconds,
+                "tools_seconds": time.perf_counter() - tools_start,
+                "tools": [(item.name, seconds, validation) for item, (_, seconds, validation) in zip(calls, results)]
+            })
+
+            if not calls:
+                break
+
+            context += [output for output, _, _ in results]
+
+        await asyncio.to_thread(self._end_turn, context_manager, message, session_id, context, version)
+        self.last_stream_metrics = {
+            "first_token_seconds": first_token_seconds,
+            "total_seconds": time.perf_counter() - start
         }
-        # to manage context
-        self.context_manager = ContextManager()
 
-    def send_message(self, message: str) -> str:
-        self.context_manager.add_user_message(message)
-        context = self.context_manager.get_context()
-        context = self._call_llm(context)
-        self.context_manager.update_messages(context)
-        return context[-1].content[0].text
+    def _start_turn(self, context_manager: ContextManager, message: str, session_id: str) -> list[dict]:
+        """Add the user's message and the memories it recalls; return the turn's context."""
+        context_manager.add_user_message(message)
+        self._recall(context_manager, message, session_id)
+        return context_manager.get_context()
 
-    def _call_llm(self, messages: list[dict]) -> list[dict]:
+    @staticmethod
+    def _budgeted(context_manager: ContextManager, context: list) -> list:
+        """
+        Take `context` (the turn so far, tool outputs included) into the
+        session and fit it to the token budget, recalled memories included;
+        returns what to send. Run before every LLM request of a turn.
+        """
+        context_manager.update_messages(context)
+        context_manager.fit_to_budget()
+        return context_manager.get_context()
+
+    def _end_turn(
+        self,
+        context_manager: ContextManager,
+        message: str,
+        session_id: str,
+        context: list[dict],
+        version: int
+    ) -> str:
+        """
+        Keep the updated context, store the turn and return the answer.
+        The answer is cached if the turn looked tasks up, changed nothing,
+        and no other session changed the tasks meanwhile (`version` is the
+        store's version when the turn started). Turns without tool calls
+        are not cached: their answer depends on the conversation ("yes"),
+        not only on the message.
+        """
+        context_manager.update_messages(context)
+        answer = context[-1].content[0].text
+        self.memory.add(f"User: {message}\nAssistant: {answer}", session=session_id)
+
+        turn_start = max(i for i, item in enumerate(context) if item_role(item) == "user")
+        tools_used = {
+            item.name for item in context[turn_start:]
+            if getattr(item, "type", None) == "function_call"
+        }
+        if tools_used and tools_used <= self.READ_ONLY_TOOLS and self.tasks_store.version == version:
+            self.response_cache.put(session_id, message, version, answer)
+        return answer
+
+    def _cached_answer(self, context_manager: ContextManager, message: str, session_id: str):
+        """A cached answer to `message`, added to the context as a normal turn, or None."""
+        answer = self.response_cache.get(session_id, message, self.tasks_store.version)
+        if answer is not None:
+            context_manager.add_user_message(message)
+            context_manager.update_messages(
+                context_manager.messages + [{"role": "assistant", "content": answer}]
+            )
+        return answer
+
+    def _recall(self, context_manager: ContextManager, message: str, session_id: str):
+        """Put the long-term memories closest to `message` in the next request."""
+        # turns still in the live context (but the current one) are already stored
+        live_turns = context_manager.turn_count() - 1
+        memories = self.memory.search(
+            message, k=self.RECALL_K, skip_recent_turns=live_turns, session=session_id
+        )
+        context_manager.set_recalled([text for _, text in memories])
+
+    def remember_fact(
+        self,
+        fact: Annotated[str, "The fact, as a short self-contained sentence."],
+        session_id: str = "default"
+    ) -> str:
+        """Save a lasting fact about the user (preference, plan, personal detail) to long-term memory."""
+        self.memory.add(fact, kind="fact", session=session_id)
+        # a new fact may change how cached questions should be answered
+        self.response_cache.invalidate(session_id)
+        return f"Remembered: {fact}"
+
+    def _call_llm(self, context_manager: ContextManager, messages: list[dict], session_id: str = "default") -> list[dict]:
         """
         Handles LLM calls and executes tools if requested.
         Appends tool results correctly in the format expected by OpenAI Responses API.
+
+        Every function call of a response is run (see _run_tools) and all
+        the outputs go back in one follow-up request, until the model answers
+        without calling tools. The last allowed request disables tools so a
+        runaway chain still ends with an answer. The context is fitted to
+        the session's token budget before every request.
         """
+        self.last_timings = []
+
+        for step in range(self.MAX_TOOL_ITERATIONS):
+            messages = self._budgeted(context_manager, messages)
+            start = time.perf_counter()
+            response = CLIENT.responses.create(
+                model="gpt-4o-mini",
+                input=messages,
+                tools=self.tools,
+                tool_choice="auto" if step < self.MAX_TOOL_ITERATIONS - 1 else "none"
+            )
+            llm_seconds = time.perf_counter() - start
+
+            # Append the model output
+            messages += response.output
+
+            calls = [item for item in response.output if item.type == "function_call"]
+            start = time.perf_counter()
+            results = self._run_tools(calls, session_id)
+            self.last_timings.append({
+                "step": step,
+                "llm_seconds": llm_seconds,
+                "tools_seconds": time.perf_counter() - start,
+                "tools": [(item.name, seconds, validation) for item, (_, seconds, validation) in zip(calls, results)]
+            })
+
+            # If there are no more function calls, return messages
+            if not calls:
+                return messages
+
+            messages += [output for output, _, _ in results]
 
-        response = CLIENT.responses.create(
-            model="gpt-4o-mini",
-            input=messages,
-            tools=self.tools
-        )
+        return messages
 
-        # Append the model output
-        messages += response.output
+    def _run_tools(self, calls: list, session_id: str = "default") -> list[tuple[dict, float, float]]:
+        """
+        Run the function calls of one response; results are in call order.
 
-        # Check if the last output is a tool call
-        for item in response.output:
-            if item.type == "function_call":
-                # Execute the tool
-                tool_result = self.tool_map[item.name](**eval(item.arguments))
+        Calls that change state run one at a time in the order the model
+        emitted them, so e.g. a create followed by an update of the same
+        task keeps its meaning. Consecutive read-only calls between them
+        run together in the tool pool.
+        """
+        results = []
+        reads = []
 
-                # Append the function call output in correct format
-                messages.append({
-                    "type": "function_call_output",
-                    "call_id": item.id,  # link output to the original function call
-                    "name": item.name,
-                    "output": str(tool_result)
-                })
+        def run_reads():
+            results.extend(self.tool_executor.map(self._run_tool, reads, [session_id] * len(reads)))
+            reads.clear()
 
-                # Recursive call to let the model see the tool output and respond
-                return self._call_llm(messages)
+        for item in calls:
+            if item.name in self.READ_ONLY_TOOLS:
+                reads.append(item)
+            else:
+                run_reads()
+                results.append(self._run_tool(item, session_id))
+        run_reads()
+        return results
+
+    def _run_tool(self, item, session_id: str = "default") -> tuple[dict, float, float]:
+        """Validate and execute one function call; returns its output item, run time and validation time."""
+        start = time.perf_counter()
+        tool_result, validation_seconds = self.tool_registry.call(
+            item.name, item.arguments, session_id=session_id
+        )
 
-        # If there are no more function calls, return messages
-        return messages
+        # Append the function call output in correct format
+        return {
+            "type": "function_call_output",
+            "call_id": item.id,  # link output to the original function call
+            "name": item.name,
+            "output": tool_result
+        }, time.perf_counter() - start, validation_seconds
 
-    def flush(self):
+    def flush(self, session_id: str = "default"):
         self.tasks_store.flush()
-        self.context_manager.reset()
+        self.response_cache.clear()
+        self.sessions.get(session_id).reset()
+
+    def forget(self):
+        self.memory.clear()
+        self.response_cache.clear()
+
+
+def handle_command(assistant: PersonalAssistant, user_input: str) -> bool:
+    """Run a /command; returns False if the input is not one."""
+    if user_input == "/flush":
+        assistant.flush()
+        print("[INFO] Flushed")
+    elif user_input == "/forget":
+        assistant.forget()
+        print("[INFO] Long-term memory cleared")
+    elif user_input == "/timings":
+        for step in assistant.last_timings:
+            tools = ", ".join(
+                f"{name} {seconds * 1000:.1f}ms (validation {validation * 1e6:.0f}us)"
+                for name, seconds, validation in step["tools"]
+            )
+            print(
+                f"[INFO] step {step['step']}: LLM {step['llm_seconds']:.2f}s, "
+                f"tools {step['tools_seconds'] * 1000:.1f}ms" + (f" ({tools})" if tools else "")
+            )
+        cache = assistant.response_cache
+        print(
+            f"[INFO] response cache: {cache.hits} hits / {cache.hits + cache.misses} lookups "
+            f"({cache.hit_rate:.0%}), {len(cache)} entries"
+        )
+        registry = assistant.tool_registry
+        if registry.calls:
+            print(
+                f"[INFO] tool calls: {registry.calls}, rejected: {registry.rejected}, "
+                f"validation {registry.validation_seconds / registry.calls * 1e6:.0f}us per call"
+            )
+        metrics = assistant.last_stream_metrics
+        if metrics and metrics["first_token_seconds"] is not None:
+            print(
+                f"[INFO] first token {metrics['first_token_seconds']:.2f}s, "
+                f"total {metrics['total_seconds']:.2f}s"
+            )
+    else:
+        return False
+    return True
 
 
 def main():
@@ -244,9 +624,7 @@ def main():
             # Process special commands
             if user_input == "/q":
                 break
-            elif user_input == "/flush":
-                assistant.flush()
-                print("[INFO] Flushed")
+            if handle_command(assistant, user_input):
                 continue
 
             # Process normal message
@@ -257,6 +635,33 @@ def main():
             break
 
 
+async def main_stream():
+    """Conversation loop printing the answers as they are generated"""
+    assistant = PersonalAssistant()
+    while True:
+        user_input = (await asyncio.to_thread(input, "User: ")).strip()
+        if not user_input:
+            continue
+        if user_input == "/q":
+            break
+        if handle_command(assistant, user_input):
+            continue
+
+        print("Assistant: ", end="", flush=True)
+        async for delta in assistant.send_message_stream(user_input):
+            print(delta, end="", flush=True)
+        print()
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Personal assistant with task tools and memory")
+    parser.add_argument("--stream", action="store_true", help="print answers as they are generated")
+    args = parser.parse_args()
 
+    if args.stream:
+        try:
+            asyncio.run(main_stream())
+        except KeyboardInterrupt:
+            print("\nGoodbye!")
+    else:
+        main()
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import threading
+import zlib
+from array import array
+from typing import Callable, Optional
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Local bag-of-words embedder: word unigrams and bigrams are hashed
+    (crc32, stable across runs) into `dim` buckets. Needs no model or API,
+    and is good enough to recall past turns that share words with the
+    query; use a real embedding model for paraphrases.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = TOKEN_RE.findall(text.lower())
+            for feature in words + [a + " " + b for a, b in zip(words, words[1:])]:
+                vectors[row, zlib.crc32(feature.encode()) % self.dim] += 1.0
+        return vectors
+
+
+class _SessionMemories:
+    """The records of one session and their normalized vectors, in row order."""
+
+    def __init__(self, dim: int):
+        self.records: list[dict] = []
+        self.vectors = np.zeros((0, dim), dtype=np.float32)  # capacity rows; the first len(records) are used
+        self.turns: list[int] = []  # indices of the "turn" records
+
+    def append(self, records: list[dict], vectors: np.ndarray):
+        used = len(self.records)
+        if used + len(vectors) > len(self.vectors):
+            grown = np.zeros((max(2 * len(self.vectors), used + len(vectors)), self.vectors.shape[1]), dtype=np.float32)
+            grown[:used] = self.vectors[:used]
+            self.vectors = grown
+        self.vectors[used:used + len(vectors)] = vectors
+        for record in records:
+            if record["kind"] == "turn":
+                self.turns.append(len(self.records))
+            self.records.append(record)
+
+
+class MemoryStore:
+    """
+    Long-term memory: texts (past turns, facts) with their embeddings,
+    searched by cosine similarity. Every memory belongs to a session and
+    is only recalled in that session.
+
+    Kept in `directory` as three files: `records.jsonl` (one record per
+    memory), `vectors.f32` (the normalized float32 embeddings, one row per
+    record, appended as raw bytes) and `meta.json` (embedder name and
+    dimension, checked on load). Both data files are append-only, so adding
+    a memory costs O(1) I/O. Search is a brute-force matrix-vector product
+    over the session's memories.
+
+    Only the texts and vectors of loaded sessions are kept in memory. A
+    session is loaded, by seeking to its rows in both files, the first time
+    it is searched or added to, and dropped by `unload` (the assistant does
+    it when the session is evicted). For every other memory, only its file
+    offset and row number stay in RAM.
+    """
+
+    def __init__(self, directory: str = "memory", embed: Optional[Callable[[list[str]], np.ndarray]] = None):
+        self.directory = directory
+        self.embed = embed or HashingEmbedder()
+        self._offsets = array("q")  # offset of each record in records.jsonl, by row
+        self._records_end = 0
+        self._rows_by_session: dict[str, array] = {}
+        self._loaded: dict[str, _SessionMemories] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._records_path = os.path.join(directory, "records.jsonl")
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _load(self):
+        name = getattr(self.embed, "name", type(self.embed).__name__)
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["embedder"] != name:
+                raise ValueError(
+                    f"{self.directory} was built with the '{meta['embedder']}' embedder, not '{name}'"
+                )
+            self.dim = meta["dim"]
+        else:
+            self.dim = self.embed(["dimension probe"]).shape[1]
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"embedder": name, "dim": self.dim}, f)
+
+        sessions, end = [], 0
+        if os.path.exists(self._records_path):
+            with open(self._records_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):  # cut by an interrupted write
+                        break
+                    self._offsets.append(end)
+                    sessions.append(json.loads(line).get("session", "default"))
+                    end += len(line)
+        vectors_size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        row_size = self.dim * 4
+
+        # both files are appended record by record; keep only complete pairs
+        rows = min(len(self._offsets), vectors_size // row_size)
+        self._records_end = self._offsets[rows] if rows < len(self._offsets) else end
+        del self._offsets[rows:]
+        for row in range(rows):
+            self._rows_by_session.setdefault(sessions[row], array("q")).append(row)
+        for path, size in ((self._records_path, self._records_end), (self._vectors_path, rows * row_size)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def _session(self, session: str) -> _SessionMemories:
+        """The memories of `session`, read from the files if it is not loaded. Call with the lock held."""
+        memories = self._loaded.get(session)
+        if memories is not None:
+            return memories
+        memories = self._loaded[session] = _SessionMemories(self.dim)
+        rows = self._rows_by_session.get(session)
+        if rows:
+            row_size = self.dim * 4
+            records, vectors = [], np.empty((len(rows), self.dim), dtype=np.float32)
+            with open(self._records_path, "rb") as records_file, open(self._vectors_path, "rb") as vectors_file:
+                for i, row in enumerate(rows):
+                    records_file.seek(self._offsets[row])
+                    records.append(json.loads(records_file.readline()))
+                    vectors_file.seek(row * row_size)
+                    vectors[i] = np.frombuffer(vectors_file.read(row_size), dtype=np.float32)
+            memories.append(records, vectors)
+        return memories
+
+    def unload(self, session: str):
+        """Drop the memories of `session` from RAM; they stay on disk."""
+        with self._lock:
+            self._loaded.pop(session, None)
+
+    def add_many(self, texts: list[str], kind: str = "turn", session: str = "default") -> list[int]:
+        """Embed and store `texts`; returns their row numbers."""
+        if not texts:
+            return []
+        vectors = np.asarray(self.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            memories = self._session(session)
+            new = [{"kind": kind, "text": text, "session": session} for text in texts]
+            lines = [(json.dumps(record) + "\n").encode() for record in new]
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self._records_path, "ab") as f:
+                f.writelines(lines)
+
+            first = len(self._offsets)
+            rows = list(range(first, first + len(new)))
+            session_rows = self._rows_by_session.setdefault(session, array("q"))
+            for row, line in zip(rows, lines):
+                self._offsets.append(self._records_end)
+                self._records_end += len(line)
+                session_rows.append(row)
+            memories.append(new, vectors)
+        return rows
+
+    def add(self, text: str, kind: str = "turn", session: str = "default") -> int:
+        return self.add_many([text], kind, session)[0]
+
+    def search(
+        self,
+        query: str,
+        k: int = 3,
+        min_score: float = 0.2,
+        skip_recent_turns: int = 0,
+        session: str = "default",
+    ) -> list[tuple[float, str]]:
+        """
+        The `k` memories of `session` most similar to `query` (score >=
+        `min_score`), best first, as (score, text). The last
+        `skip_recent_turns` turns are left out, since they are still in the
+        live context.
+        """
+        if k <= 0 or not self._rows_by_session.get(session):
+            return []
+        query_vector = np.asarray(self.embed([query])[0], dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm == 0:
+            return []
+
+        with self._lock:
+            memories = self._session(session)
+            records, used = memories.records, len(memories.records)
+            if skip_recent_turns > 0 and memories.turns:
+                skipped = set(memories.turns[-skip_recent_turns:])
+                rows = np.array([row for row in range(used) if row not in skipped], dtype=np.int64)
+                if not len(rows):
+                    return []
+                vectors = memories.vectors[rows]
+            else:
+                rows = np.arange(used)
+                vectors = memories.vectors[:used]
+            scores = vectors @ (query_vector / norm)
+
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), records[rows[i]]["text"]) for i in top if scores[i] >= min_score]
+
+    def clear(self):
+        with self._lock:
+            self._offsets = array("q")
+            self._records_end = 0
+            self._rows_by_session = {}
+            self._loaded = {}
+            for path in (self._records_path, self._vectors_path):
+                if os.path.exists(path):
+                    os.remove(path)
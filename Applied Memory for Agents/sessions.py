@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from context import ContextManager, item_to_dict
+
+SAFE_ID_RE = re.compile(r"[\w-]{1,64}")
+
+
+class SessionManager:
+    """
+    One ContextManager per session id, for serving many conversations from
+    one process.
+
+    At most `max_active` contexts are kept in memory. When a new one is
+    needed, the least recently used idle session is written to
+    `directory/<id>.jsonl` (a header line with the summary, then one line
+    per context item) and dropped; it is read back the next time its id is
+    used. Sessions in use (see `use`) are never evicted, and `on_evict` is
+    called with the id of every session dropped from memory, so that other
+    per-session state can follow it out.
+
+    Contexts are compacted to their token budget, so each costs a bounded
+    amount of memory and disk.
+    """
+
+    def __init__(
+        self,
+        directory: str = "sessions",
+        max_active: int = 1000,
+        context_factory: Callable[[], ContextManager] = ContextManager,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
+        self.directory = directory
+        self.max_active = max_active
+        self.context_factory = context_factory
+        self.on_evict = on_evict
+        self._active: OrderedDict[str, ContextManager] = OrderedDict()
+        self._in_use: dict[str, int] = {}
+        # one lock per session in use, so that its messages are handled one at a time
+        self._session_locks: dict[str, threading.Lock] = {}
+        # coroutines wait for a session on these instead of holding a worker thread
+        self._async_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._active or os.path.exists(self._path(session_id))
+
+    def _path(self, session_id: str) -> str:
+        name = session_id if SAFE_ID_RE.fullmatch(session_id) else hashlib.sha256(session_id.encode()).hexdigest()
+        return os.path.join(self.directory, name + ".jsonl")
+
+    def _save(self, session_id: str, context: ContextManager):
+        path = self._path(session_id)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"session_id": session_id, "summary": context.summary}) + "\n")
+            for item in context.messages:
+                f.write(json.dumps(item_to_dict(item), separators=(",", ":")) + "\n")
+        os.replace(tmp_path, path)
+
+    def _restore(self, session_id: str) -> ContextManager:
+        context = self.context_factory()
+        path = self._path(session_id)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                context.summary = header["summary"]
+                context.messages = [json.loads(line) for line in f if line.strip()]
+        return context
+
+    def _evict_idle(self):
+        for session_id in list(self._active):
+            if len(self._active) <= self.max_active:
+                return
+            if not self._in_use.get(session_id):
+                self._save(session_id, self._active.pop(session_id))
+                if self.on_evict is not None:
+                    self.on_evict(session_id)
+
+    def get(self, session_id: str) -> ContextManager:
+        """The context of `session_id`, restored from disk or created if needed."""
+        with self._lock:
+            context = self._active.get(session_id)
+            if context is None:
+                context = self._active[session_id] = self._restore(session_id)
+                self._evict_idle()
+            else:
+                self._active.move_to_end(session_id)
+            return context
+
+    def _enter(self, session_id: str) -> ContextManager:
+        """Pin `session_id`, wait for its lock and return its context."""
+        with self._lock:
+            self._in_use[session_id] = self._in_use.get(session_id, 0) + 1
+            lock = self._session_locks.setdefault(session_id, threading.Lock())
+        lock.acquire()
+        try:
+            return self.get(session_id)
+        except BaseException:
+            self._exit(session_id)
+            raise
+
+    def _exit(self, session_id: str):
+        with self._lock:
+            self._session_locks[session_id].release()
+            self._in_use[session_id] -= 1
+            if not self._in_use[session_id]:
+                del self._in_use[session_id]
+                del self._session_locks[session_id]
+            self._evict_idle()
+
+    @contextmanager
+    def use(self, session_id: str) -> Iterator[ContextManager]:
+        """
+        Like `get`, but holds the session until the block exits: it cannot
+        be evicted, and other `use` blocks of the same session wait.
+        """
+        context = self._enter(session_id)
+        try:
+            yield context
+        finally:
+            self._exit(session_id)
+
+    @asynccontextmanager
+    async def use_async(self, session_id: str) -> AsyncIterator[ContextManager]:
+        """
+        `use` for coroutines. Coroutines of one session queue on an
+        asyncio.Lock, and the session lock, restore and eviction (file I/O)
+        run in a worker thread, so the event loop never blocks.
+        """
+        async_lock = self._async_locks.get(session_id)
+        if async_lock is None:
+            async_lock = self._async_locks[session_id] = asyncio.Lock()
+        async with async_lock:
+            entering = asyncio.ensure_future(asyncio.to_thread(self._enter, session_id))
+            try:
+                context = await asyncio.shield(entering)
+            except asyncio.CancelledError:
+                # the worker thread still enters the session: leave it once it has
+                def leave(task: asyncio.Future):
+                    if task.exception() is None:
+                        self._exit(session_id)
+
+                entering.add_done_callback(leave)
+                raise
+            try:
+                yield context
+            finally:
+                await asyncio.to_thread(self._exit, session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._active.pop(session_id, None)
+            path = self._path(session_id)
+            if os.path.exists(path):
+                os.remove(path)
+            if self.on_evict is not None:
+                self.on_evict(session_id)
+
+    def save_all(self):
+        """Write every active session to disk (they stay in memory)."""
+        with self._lock:
+            for session_id, context in self._active.items():
+                self._save(session_id, context)
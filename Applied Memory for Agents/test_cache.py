@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from cache import ResponseCache, normalize
+
+
+def embed_by_keyword(texts: list[str]) -> np.ndarray:
+    """'todo' and 'to do' share a direction; everything else is orthogonal to them."""
+    return np.array([[1.0, 0.0] if "todo" in text.replace(" ", "") else [0.0, 1.0] for text in texts])
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_key_normalization(self):
+        self.assertEqual(normalize("  What's on   my LIST?! "), "what s on my list")
+        cache = ResponseCache()
+        cache.put("s", "What's on my list?", 1, "Milk.")
+        self.assertEqual(cache.get("s", "what's on my list", 1), "Milk.")
+        self.assertEqual(cache.get("s", "WHAT'S ON MY LIST!!", 1), "Milk.")
+        self.assertIsNone(cache.get("s", "what's on my other list", 1))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_sessions_are_separate(self):
+        cache = ResponseCache()
+        cache.put("a", "my tasks", 1, "Milk.")
+        self.assertIsNone(cache.get("b", "my tasks", 1))
+
+    def test_new_version_invalidates_every_entry(self):
+        cache = ResponseCache()
+        cache.put("a", "my tasks", 1, "Milk.")
+        cache.put("b", "my tasks", 1, "Eggs.")
+        self.assertIsNone(cache.get("a", "my tasks", 2))
+        self.assertEqual(len(cache), 0)
+        # an answer computed at an older version is dropped as soon as it is stored
+        cache.put("b", "my tasks", 1, "Eggs.")
+        self.assertIsNone(cache.get("b", "my tasks", 2))
+
+    def test_invalidate_drops_one_session(self):
+        cache = ResponseCache()
+        cache.put("a", "my tasks", 1, "Milk.")
+        cache.put("b", "my tasks", 1, "Eggs.")
+        cache.invalidate("a")
+        self.assertIsNone(cache.get("a", "my tasks", 1))
+        self.assertEqual(cache.get("b", "my tasks", 1), "Eggs.")
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, ttl=10)
+        with mock.patch("cache.time.monotonic", return_value=100.0):
+            cache.put("s", "one", 1, "1")
+            cache.put("s", "two", 1, "2")
+            cache.get("s", "one", 1)
+            cache.put("s", "three", 1, "3")
+            self.assertIsNone(cache.get("s", "two", 1))
+            self.assertEqual(cache.get("s", "one", 1), "1")
+        with mock.patch("cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("s", "three", 1))
+            self.assertEqual(len(cache), 0)
+
+    def test_near_duplicate_hits_with_embeddings(self):
+        cache = ResponseCache(embed=embed_by_keyword)
+        cache.put("s", "what's on my todo list", 1, "Milk.")
+        self.assertEqual(cache.get("s", "what is on my to do list?", 1), "Milk.")
+        self.assertIsNone(cache.get("s", "what is done", 1))
+        self.assertIsNone(cache.get("other", "my todo list", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
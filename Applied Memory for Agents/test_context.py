@@ -0,0 +1,90 @@
+import unittest
+
+from context import ContextManager
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def new_context(**kwargs) -> ContextManager:
+    options = {"max_tokens": 200, "keep_turns": 2, "summary_tokens": 40, "count_tokens": count_words}
+    options.update(kwargs)
+    return ContextManager(**options)
+
+
+def add_turn(context: ContextManager, i: int, words: int = 20):
+    context.add_user_message(f"question {i} " + "word " * words)
+    context.update_messages(context.messages + [{"role": "assistant", "content": f"answer {i} " + "word " * words}])
+
+
+class TestContextBudget(unittest.TestCase):
+    def test_fits_without_folding(self):
+        context = new_context()
+        add_turn(context, 0)
+        self.assertEqual(context.fit_to_budget(), 0)
+        self.assertEqual(context.summary, "")
+
+    def test_oldest_turns_are_folded_into_the_summary(self):
+        context = new_context()
+        for i in range(10):
+            add_turn(context, i)
+
+        folded = context.fit_to_budget()
+
+        self.assertGreater(folded, 0)
+        self.assertEqual(context.turn_count(), 10 - folded)
+        self.assertLessEqual(context.token_count(), context.max_tokens)
+        self.assertTrue(context.messages[0]["content"].startswith(f"question {folded} "))
+        # the summary keeps the most recent folded turns, within summary_tokens
+        self.assertIn(f"assistant: answer {folded - 1}", context.summary)
+        self.assertNotIn("question 0 ", context.summary)
+        self.assertLessEqual(count_words(context.summary), context.summary_tokens)
+        first = context.get_context()[0]
+        self.assertEqual(first["role"], "developer")
+        self.assertTrue(first["content"].startswith(ContextManager.SUMMARY_PREFIX))
+
+    def test_pinned_turns_are_kept_even_over_budget(self):
+        context = new_context(keep_turns=2)
+        for i in range(3):
+            add_turn(context, i, words=150)
+        self.assertEqual(context.fit_to_budget(), 1)
+        self.assertEqual(context.turn_count(), 2)
+
+    def test_turn_in_progress_is_never_folded(self):
+        context = new_context(keep_turns=0)
+        add_turn(context, 0)
+        context.add_user_message("question 1 " + "word " * 300)
+        tool_call = {"type": "function_call", "name": "find_tasks", "arguments": "{}"}
+        tool_output = {"type": "function_call_output", "output": "word " * 50}
+        context.update_messages(context.messages + [tool_call, tool_output])
+
+        self.assertEqual(context.fit_to_budget(), 1)
+        self.assertEqual(context.messages[1:], [tool_call, tool_output])
+
+    def test_recalled_memories_count_against_the_budget(self):
+        context = new_context(keep_turns=1)
+        for i in range(3):
+            add_turn(context, i)
+        self.assertEqual(context.fit_to_budget(), 0)
+
+        context.set_recalled(["memory " * 60])
+        self.assertGreater(context.fit_to_budget(), 0)
+        self.assertLessEqual(context.token_count(), context.max_tokens)
+        self.assertEqual(context.get_context()[1]["content"].count("memory"), 60)
+
+    def test_update_messages_drops_summary_and_recall_items(self):
+        context = new_context()
+        for i in range(10):
+            add_turn(context, i)
+        context.set_recalled(["the user likes tea"])
+        context.fit_to_budget()
+
+        sent = context.get_context()
+        context.update_messages(sent + [{"role": "user", "content": "next"}])
+        self.assertEqual([item["role"] for item in context.messages[-2:]], ["assistant", "user"])
+        self.assertNotIn("developer", [item["role"] for item in context.messages])
+
+
+if __name__ == "__main__":
+    unittest.main()
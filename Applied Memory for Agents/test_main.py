@@ -0,0 +1,217 @@
+import asyncio
+import atexit
+import os
+import re
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+import main
+from context import ContextManager
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def tool_call(name: str, arguments: str, call_id: str) -> ResponseFunctionToolCall:
+    return ResponseFunctionToolCall(type="function_call", id=call_id, call_id=call_id, name=name, arguments=arguments)
+
+
+def answer(text: str) -> ResponseOutputMessage:
+    return ResponseOutputMessage(
+        type="message", id="msg", role="assistant", status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+class FakeResponses:
+    """Stands in for CLIENT.responses: returns the scripted outputs in turn and records every input."""
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.inputs = []
+
+    def create(self, **kwargs):
+        self.inputs.append(list(kwargs["input"]))
+        return SimpleNamespace(output=self.outputs.pop(0))
+
+
+class FakeAsyncResponses:
+    """Stands in for ASYNC_CLIENT.responses: streams each scripted output as text deltas, then a completed event."""
+
+    def __init__(self, *outputs):
+        self.outputs = list(outputs)
+        self.inputs = []
+
+    async def create(self, **kwargs):
+        self.inputs.append(list(kwargs["input"]))
+        return self._stream(self.outputs.pop(0))
+
+    @staticmethod
+    async def _stream(output):
+        for item in output:
+            if item.type == "message":
+                for word in re.findall(r"\S+\s*", item.content[0].text):
+                    yield SimpleNamespace(type="response.output_text.delta", delta=word)
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(output=output))
+
+
+class AssistantTestCase(unittest.TestCase):
+    """A PersonalAssistant working in a temporary directory, with the API replaced by `FakeResponses` / `FakeAsyncResponses`."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.assistant = main.PersonalAssistant()
+
+    def tearDown(self):
+        atexit.unregister(self.assistant.sessions.save_all)
+        atexit.unregister(self.assistant.tasks_store.close)
+        self.assistant.tool_executor.shutdown()
+        self.assistant.tasks_store.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def fake_api(self, *outputs) -> FakeResponses:
+        responses = FakeResponses(*outputs)
+        patcher = mock.patch.object(main, "CLIENT", SimpleNamespace(responses=responses))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return responses
+
+    def fake_async_api(self, *outputs) -> FakeAsyncResponses:
+        responses = FakeAsyncResponses(*outputs)
+        patcher = mock.patch.object(main, "ASYNC_CLIENT", SimpleNamespace(responses=responses))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return responses
+
+    def stream(self, message: str) -> list[str]:
+        async def collect():
+            return [delta async for delta in self.assistant.send_message_stream(message)]
+
+        return asyncio.run(collect())
+
+
+class TestContextBudget(AssistantTestCase):
+    def test_every_request_of_a_turn_is_budgeted(self):
+        context = self.assistant.sessions.get("default")
+        context.max_tokens, context.keep_turns, context.summary_tokens = 400, 1, 40
+        context.count_tokens = count_words
+        for i in range(10):
+            context.add_user_message(f"question {i} " + "word " * 20)
+            context.update_messages(context.messages + [{"role": "assistant", "content": "ok " * 20}])
+
+        self.assistant.tasks_store.create_tasks(["task " + "word " * 30 for _ in range(6)], "to-do")
+        responses = self.fake_api([tool_call("find_tasks", "{}", "call_1")], [answer("Six tasks.")])
+
+        self.assertEqual(self.assistant.send_message("list my tasks"), "Six tasks.")
+        second = responses.inputs[1]
+        # the tool output alone is ~200 words: older turns are folded again before the follow-up
+        for sent in responses.inputs:
+            self.assertLessEqual(context._tokens(sent), context.max_tokens)
+        self.assertTrue(second[0]["content"].startswith(ContextManager.SUMMARY_PREFIX))
+
+
+class TestToolCalls(AssistantTestCase):
+    def test_writes_run_in_emitted_order_and_results_keep_call_order(self):
+        calls = [
+            tool_call("create_task", '{"name": "report", "status": "to-do"}', "call_1"),
+            tool_call("find_task", '{"key": "name", "value": "report"}', "call_2"),
+            tool_call("update_task_status", '{"name": "report", "new_status": "done"}', "call_3"),
+            tool_call("find_tasks", '{"status": "done"}', "call_4"),
+            tool_call("find_task", '{"key": "status", "value": "to-do"}', "call_5"),
+        ]
+        responses = self.fake_api(calls, [answer("Done.")])
+
+        threads = {}
+        registry_call = self.assistant.tool_registry.call
+
+        def call(name, arguments, **injected):
+            threads.setdefault(name, set()).add(threading.current_thread().name)
+            return registry_call(name, arguments, **injected)
+
+        with mock.patch.object(self.assistant.tool_registry, "call", call):
+            self.assistant.send_message("add the report, then mark it done")
+
+        outputs = [item for item in responses.inputs[1] if isinstance(item, dict) and item.get("type") == "function_call_output"]
+        self.assertEqual([output["call_id"] for output in outputs], [f"call_{i}" for i in range(1, 6)])
+        self.assertEqual(outputs[1]["output"], "Found tasks:\n- report [to-do]")
+        self.assertEqual(outputs[3]["output"], "Found 1 tasks (page 1 of 1):\n- report [done]")
+        self.assertEqual(outputs[4]["output"], "No matching tasks found.")
+
+        main_thread = threading.current_thread().name
+        self.assertEqual(threads["create_task"], {main_thread})
+        self.assertEqual(threads["update_task_status"], {main_thread})
+        self.assertNotIn(main_thread, threads["find_task"] | threads["find_tasks"])
+
+
+class TestStreaming(AssistantTestCase):
+    def test_tool_step_deltas_metrics_and_cache_hit(self):
+        responses = self.fake_async_api(
+            [tool_call("find_tasks", "{}", "call_1")],
+            [answer("Nothing to do.")],
+        )
+        budget_threads = []
+        budgeted = self.assistant._budgeted
+
+        def record_thread(context_manager, context):
+            budget_threads.append(threading.current_thread())
+            return budgeted(context_manager, context)
+
+        with mock.patch.object(self.assistant, "_budgeted", record_thread):
+            deltas = self.stream("What's on my list?")
+
+        self.assertEqual(deltas, ["Nothing ", "to ", "do."])
+        self.assertEqual(len(responses.inputs), 2)
+        outputs = [item for item in responses.inputs[1] if isinstance(item, dict) and item.get("type") == "function_call_output"]
+        self.assertEqual([(output["call_id"], output["output"]) for output in outputs], [("call_1", "No matching tasks found.")])
+
+        self.assertEqual([step["step"] for step in self.assistant.last_timings], [0, 1])
+        self.assertEqual([name for name, _, _ in self.assistant.last_timings[0]["tools"]], ["find_tasks"])
+        metrics = self.assistant.last_stream_metrics
+        self.assertIsNotNone(metrics["first_token_seconds"])
+        self.assertLessEqual(metrics["first_token_seconds"], metrics["total_seconds"])
+        # every request of the turn was budgeted, off the event loop
+        self.assertEqual(len(budget_threads), 2)
+        self.assertNotIn(threading.main_thread(), budget_threads)
+
+        # the same lookup again is answered from the cache, without a request
+        self.assertEqual(self.stream("what's on my list"), ["Nothing to do."])
+        self.assertEqual(len(responses.inputs), 2)
+        self.assertEqual(self.assistant.response_cache.hits, 1)
+
+
+class TestResponseCaching(AssistantTestCase):
+    def test_turns_without_tools_are_not_cached(self):
+        responses = self.fake_api([answer("Booked the train.")], [answer("Booked the hotel.")])
+
+        self.assertEqual(self.assistant.send_message("Yes"), "Booked the train.")
+        self.assertEqual(self.assistant.send_message("yes!"), "Booked the hotel.")
+        self.assertEqual(len(responses.inputs), 2)
+
+    def test_lookups_are_cached_until_a_fact_is_saved(self):
+        responses = self.fake_api(
+            [tool_call("find_tasks", "{}", "call_1")], [answer("Nothing to do.")],
+            [tool_call("remember_fact", '{"fact": "The user calls chores quests."}', "call_2")], [answer("Noted.")],
+            [tool_call("find_tasks", "{}", "call_3")], [answer("No quests.")],
+        )
+
+        self.assertEqual(self.assistant.send_message("What's on my list?"), "Nothing to do.")
+        self.assertEqual(self.assistant.send_message("what's on my list"), "Nothing to do.")
+        self.assertEqual(len(responses.inputs), 2)
+
+        self.assistant.send_message("Call my chores quests")
+        self.assertEqual(self.assistant.send_message("what's on my list"), "No quests.")
+        self.assertEqual(len(responses.inputs), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
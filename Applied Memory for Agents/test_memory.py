@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from memory import HashingEmbedder, MemoryStore
+
+# one axis per word: the cosine of two texts is set by the words they share
+WORDS = ["tea", "coffee", "cat", "dog", "train", "paris"]
+
+
+def embed_words(texts: list[str]) -> np.ndarray:
+    return np.array([[float(text.split().count(word)) for word in WORDS] for text in texts], dtype=np.float32)
+
+
+class MemoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def open_store(self) -> MemoryStore:
+        return MemoryStore(self.tmp.name, embed=embed_words)
+
+
+class TestSearch(MemoryTestCase):
+    def test_top_k_by_cosine_score(self):
+        memory = self.open_store()
+        memory.add_many(["tea", "tea tea coffee", "coffee", "cat", "tea coffee coffee"], kind="fact")
+
+        results = memory.search("tea", k=3, min_score=0.0)
+
+        self.assertEqual([text for _, text in results], ["tea", "tea tea coffee", "tea coffee coffee"])
+        scores = [score for score, _ in results]
+        np.testing.assert_allclose(scores, [1.0, 2 / np.sqrt(5), 1 / np.sqrt(5)], rtol=1e-6)
+
+    def test_min_score_and_k(self):
+        memory = self.open_store()
+        memory.add_many(["tea", "tea coffee coffee", "cat"], kind="fact")
+        self.assertEqual([text for _, text in memory.search("tea", k=5, min_score=0.5)], ["tea"])
+        self.assertEqual(memory.search("tea", k=0), [])
+        # a query sharing no word with the embedder's vocabulary matches nothing
+        self.assertEqual(memory.search("hello"), [])
+
+    def test_sessions_are_isolated(self):
+        memory = self.open_store()
+        memory.add("tea", kind="fact", session="alice")
+        memory.add("tea coffee", kind="fact", session="bob")
+
+        self.assertEqual([text for _, text in memory.search("tea", session="alice")], ["tea"])
+        self.assertEqual([text for _, text in memory.search("tea", session="bob")], ["tea coffee"])
+        self.assertEqual(memory.search("tea", session="carol"), [])
+
+    def test_recent_turns_are_skipped(self):
+        memory = self.open_store()
+        memory.add("train", kind="fact")
+        memory.add("train paris")
+        memory.add("train dog")
+        results = memory.search("train", k=5, min_score=0.0, skip_recent_turns=1)
+        self.assertEqual({text for _, text in results}, {"train", "train paris"})
+
+    def test_search_after_unload_and_reopen(self):
+        memory = self.open_store()
+        memory.add_many(["tea", "coffee"], kind="fact", session="a")
+        memory.add("cat", kind="fact", session="b")
+        expected = memory.search("tea coffee", k=2, min_score=0.0, session="a")
+
+        memory.unload("a")
+        self.assertNotIn("a", memory._loaded)
+        self.assertEqual(memory.search("tea coffee", k=2, min_score=0.0, session="a"), expected)
+        self.assertIn("a", memory._loaded)
+
+        # adding to an unloaded session reads it back first
+        memory.unload("a")
+        memory.add("tea tea", kind="fact", session="a")
+        self.assertEqual(len(memory.search("tea", k=5, min_score=0.0, session="a")), 3)
+
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened._loaded, {})
+        self.assertEqual([text for _, text in reopened.search("cat", session="b")], ["cat"])
+        self.assertEqual(list(reopened._loaded), ["b"])
+
+    def test_directory_is_tied_to_its_embedder(self):
+        self.open_store()
+        with self.assertRaises(ValueError):
+            MemoryStore(self.tmp.name, embed=HashingEmbedder())
+
+
+if __name__ == "__main__":
+    unittest.main()
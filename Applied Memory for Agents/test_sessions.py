@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from sessions import SessionManager
+
+
+class SessionsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.evicted = []
+        self.sessions = SessionManager(os.path.join(self.tmp.name, "sessions"), max_active=2, on_evict=self.evicted.append)
+
+
+class TestEviction(SessionsTestCase):
+    def test_least_recently_used_idle_session_is_evicted(self):
+        self.sessions.get("a")
+        self.sessions.get("b")
+        self.sessions.get("a")
+        self.sessions.get("c")
+
+        self.assertEqual(list(self.sessions._active), ["a", "c"])
+        self.assertEqual(self.evicted, ["b"])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "sessions", "b.jsonl")))
+        self.assertIn("b", self.sessions)
+
+    def test_sessions_in_use_are_not_evicted(self):
+        with self.sessions.use("a"):
+            self.sessions.get("b")
+            self.sessions.get("c")
+            self.assertEqual(list(self.sessions._active), ["a", "c"])
+        self.assertEqual(self.evicted, ["b"])
+
+    def test_restore_round_trip(self):
+        context = self.sessions.get("user/1")
+        context.summary = "the user is planning a trip"
+        context.add_user_message("book the train")
+        context.update_messages(context.messages + [
+            {"type": "function_call", "call_id": "call_1", "name": "find_tasks", "arguments": "{}"},
+            {"type": "function_call_output", "call_id": "call_1", "output": "No matching tasks found."},
+            {"role": "assistant", "content": "Done."},
+        ])
+        saved = list(context.messages)
+
+        self.sessions.get("b")
+        self.sessions.get("c")
+        self.assertNotIn("user/1", self.sessions._active)
+        self.assertEqual(self.evicted, ["user/1"])
+
+        restored = self.sessions.get("user/1")
+        self.assertIsNot(restored, context)
+        self.assertEqual(restored.summary, "the user is planning a trip")
+        self.assertEqual(restored.messages, saved)
+
+
+class TestSessionLocks(SessionsTestCase):
+    def test_messages_to_one_session_run_one_at_a_time(self):
+        running, overlaps = [], []
+
+        def handle(session_id):
+            with self.sessions.use(session_id):
+                running.append(session_id)
+                if running.count(session_id) > 1:
+                    overlaps.append(session_id)
+                time.sleep(0.01)
+                running.remove(session_id)
+
+        threads = [threading.Thread(target=handle, args=(session_id,)) for session_id in "aaaabb"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(overlaps, [])
+        self.assertEqual(self.sessions._in_use, {})
+        self.assertEqual(self.sessions._session_locks, {})
+
+    def test_use_async_serializes_coroutines_of_a_session(self):
+        order = []
+
+        async def handle(name):
+            async with self.sessions.use_async("a") as context:
+                order.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                context.add_user_message(name)
+                order.append(f"{name} end")
+
+        async def main():
+            await asyncio.gather(handle("first"), handle("second"))
+
+        asyncio.run(main())
+        self.assertEqual(order, ["first start", "first end", "second start", "second end"])
+        self.assertEqual([message["content"] for message in self.sessions.get("a").messages], ["first", "second"])
+        self.assertEqual(self.sessions._in_use, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import atexit
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from main import TasksStore
+
+
+class TasksStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "tasks.json")
+        self.store = self.open_store()
+
+    def open_store(self, flush_every: int = 3) -> TasksStore:
+        store = TasksStore(self.path, flush_every=flush_every)
+        atexit.unregister(store.close)
+        self.addCleanup(store.close)
+        return store
+
+    def assertIndexesMatch(self, store: TasksStore):
+        """The name and status indexes hold exactly the tasks in the table."""
+        by_name, by_status = {}, {}
+        for doc in store.db.all():
+            by_name.setdefault(doc["name"], set()).add(doc.doc_id)
+            by_status.setdefault(doc["status"], set()).add(doc.doc_id)
+
+        def non_empty(index):
+            return {key: ids for key, ids in index.items() if ids}
+
+        self.assertEqual(non_empty(store._ids_by_name), by_name)
+        self.assertEqual(non_empty(store._ids_by_status), by_status)
+
+
+class TestIndexes(TasksStoreTestCase):
+    def test_bulk_changes_keep_indexes_consistent(self):
+        self.store.create_tasks([f"report {i}" for i in range(5)], "to-do")
+        self.store.create_tasks(["call mum", "report 0"], "in-progress")
+        self.store.create_task("groceries", "to-do")
+        self.assertIndexesMatch(self.store)
+
+        self.assertEqual(
+            self.store.update_tasks_status("done", status="to-do", name_contains="REPORT"),
+            "Updated 5 tasks to status 'done'.",
+        )
+        self.store.update_task_status("report 0", "in-progress")
+        self.assertIndexesMatch(self.store)
+        self.assertEqual(self.store.find_tasks(status="to-do"), "Found 1 tasks (page 1 of 1):\n- groceries [to-do]")
+        self.assertEqual(len(self.store._select("in-progress")), 3)
+
+        self.store.flush()
+        self.assertIndexesMatch(self.store)
+        self.assertEqual(self.store.find_tasks(), "No matching tasks found.")
+
+        self.store.create_tasks(["after flush"], "done")
+        self.assertIndexesMatch(self.store)
+        self.assertEqual(self.store.find_task("name", "after flush"), "Found tasks:\n- after flush [done]")
+
+    def test_indexes_rebuilt_from_disk_match(self):
+        self.store.create_tasks([f"task {i}" for i in range(4)], "to-do")
+        self.store.update_tasks_status("in-progress", name_contains="task 1")
+        self.store.flush()
+        self.store.create_tasks(["kept", "also kept"], "to-do")
+        self.store.update_task_status("kept", "done")
+        # write what is still in the write cache (flush_every=3 already wrote the rest)
+        self.store.sync()
+
+        reopened = self.open_store()
+        self.assertIndexesMatch(reopened)
+        self.assertEqual(reopened._ids_by_name.keys(), {"kept", "also kept"})
+        self.assertEqual(
+            reopened.find_tasks(),
+            "Found 2 tasks (page 1 of 1):\n- kept [done]\n- also kept [to-do]",
+        )
+
+    def test_every_change_bumps_the_version(self):
+        versions = [self.store.version]
+        for change in (
+            lambda: self.store.create_tasks(["a", "b"], "to-do"),
+            lambda: self.store.update_tasks_status("done"),
+            lambda: self.store.update_task_status("a", "to-do"),
+            self.store.flush,
+        ):
+            change()
+            self.assertGreater(self.store.version, versions[-1])
+            versions.append(self.store.version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from enum import Enum
+from typing import Annotated, Literal
+
+from tools import Tool, ToolError, ToolRegistry
+
+
+class Priority(Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+def add_item(
+    name: Annotated[str, "Item name"],
+    tags: list[str],
+    priority: Priority = Priority.LOW,
+    size: Literal["small", "large"] = "small",
+    weight: float = 1.0,
+    count: int = 1,
+    urgent: bool = False,
+    user_id: str = "",
+) -> str:
+    """Add an item to the list."""
+    return f"{name} {tags} {priority.value} {size} {weight} {count} {urgent} {user_id}"
+
+
+class TestToolSchema(unittest.TestCase):
+    def test_schema_is_built_from_the_signature(self):
+        tool = Tool(add_item, "add_item", "Add an item to the list.", injected=("user_id",))
+        parameters = tool.schema["parameters"]
+
+        self.assertEqual(tool.schema["name"], "add_item")
+        self.assertEqual(parameters["required"], ["name", "tags"])
+        self.assertFalse(parameters["additionalProperties"])
+        self.assertEqual(parameters["properties"], {
+            "name": {"type": "string", "description": "Item name"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "priority": {"type": "string", "enum": ["low", "high"], "default": "low"},
+            "size": {"type": "string", "enum": ["small", "large"], "default": "small"},
+            "weight": {"type": "number", "default": 1.0},
+            "count": {"type": "integer", "default": 1},
+            "urgent": {"type": "boolean", "default": False},
+        })
+
+    def test_registry_uses_the_docstring(self):
+        registry = ToolRegistry()
+        registry.register(add_item)
+        (schema,) = registry.schemas()
+        self.assertEqual(schema["description"], "Add an item to the list.")
+
+    def test_unsupported_parameter_type_fails_at_registration(self):
+        def tool(options: dict) -> str:
+            return ""
+
+        with self.assertRaises(TypeError):
+            ToolRegistry().register(tool)
+
+
+class TestToolValidation(unittest.TestCase):
+    def setUp(self):
+        self.tool = Tool(add_item, "add_item", "", injected=("user_id",))
+
+    def assertRejected(self, arguments: str, message: str):
+        with self.assertRaises(ToolError) as caught:
+            self.tool.validate(arguments)
+        self.assertEqual(str(caught.exception), message)
+
+    def test_valid_arguments_are_converted(self):
+        kwargs = self.tool.validate('{"name": "milk", "tags": ["food"], "priority": "high", "weight": 2}')
+        self.assertEqual(kwargs, {"name": "milk", "tags": ["food"], "priority": Priority.HIGH, "weight": 2})
+
+    def test_missing_required_arguments(self):
+        self.assertRejected('{"name": "milk"}', "missing argument(s): tags")
+        self.assertRejected("", "missing argument(s): name, tags")
+
+    def test_unknown_arguments(self):
+        self.assertRejected('{"name": "milk", "tags": [], "colour": "red"}', "unknown argument 'colour'")
+        # injected parameters cannot be set by the model
+        self.assertRejected('{"name": "milk", "tags": [], "user_id": "admin"}', "unknown argument 'user_id'")
+
+    def test_wrong_types(self):
+        self.assertRejected('{"name": 3, "tags": []}', "argument 'name' must be a string")
+        self.assertRejected('{"name": "milk", "tags": "food"}', "argument 'tags' must be an array")
+        self.assertRejected('{"name": "milk", "tags": [1]}', "argument 'tags' must be a string")
+        self.assertRejected('{"name": "milk", "tags": [], "count": 1.5}', "argument 'count' must be an integer")
+        self.assertRejected('{"name": "milk", "tags": [], "count": true}', "argument 'count' must be an integer")
+        self.assertRejected('{"name": "milk", "tags": [], "urgent": 1}', "argument 'urgent' must be a boolean")
+        self.assertRejected('{"name": "milk", "tags": [], "priority": "top"}', "argument 'priority' must be one of low, high")
+        self.assertRejected('{"name": "milk", "tags": [], "size": "huge"}', "argument 'size' must be one of small, large")
+
+    def test_malformed_json(self):
+        self.assertRejected('["milk"]', "arguments must be a JSON object")
+        with self.assertRaises(ToolError):
+            self.tool.validate('{"name": ')
+
+
+class TestToolRegistryCall(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.registry = ToolRegistry()
+
+        def add_item(name: str, user_id: str = "") -> str:
+            self.calls.append((name, user_id))
+            return f"Added {name}"
+
+        self.registry.register(add_item, injected=("user_id",))
+
+    def test_valid_call_runs_with_injected_arguments(self):
+        output, _ = self.registry.call("add_item", '{"name": "milk"}', user_id="u1", session_id="ignored")
+        self.assertEqual(output, "Added milk")
+        self.assertEqual(self.calls, [("milk", "u1")])
+
+    def test_invalid_calls_never_reach_the_function(self):
+        output, _ = self.registry.call("add_item", '{"name": 1}')
+        self.assertEqual(output, "Error: argument 'name' must be a string. Fix the arguments and call add_item again.")
+        output, _ = self.registry.call("delete_item", "{}")
+        self.assertEqual(output, "Error: unknown tool 'delete_item'. Available tools: add_item.")
+
+        self.assertEqual(self.calls, [])
+        self.assertEqual((self.registry.calls, self.registry.rejected), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import inspect
+import json
+import threading
+import time
+import typing
+from enum import Enum
+from typing import Annotated, Any, Callable, Literal, Optional, get_args, get_origin
+
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+class ToolError(Exception):
+    """Arguments a tool cannot be called with; the message goes back to the model."""
+
+
+def _compile_param(annotation) -> tuple[dict, Callable[[Any], Any]]:
+    """
+    JSON schema of one parameter plus a converter that checks a decoded
+    JSON value against it and returns the value to call with (raising
+    ToolError when it does not match).
+    """
+    description = None
+    if get_origin(annotation) is Annotated:
+        annotation, *extras = get_args(annotation)
+        description = next((extra for extra in extras if isinstance(extra, str)), None)
+
+    if get_origin(annotation) is Literal:
+        choices = get_args(annotation)
+        allowed = frozenset(choices)
+        schema = {"type": JSON_TYPES[type(choices[0])], "enum": list(choices)}
+
+        def convert(value):
+            if value not in allowed:
+                raise ToolError(f"must be one of {', '.join(map(str, choices))}")
+            return value
+    elif isinstance(annotation, type) and issubclass(annotation, Enum):
+        members = {member.value: member for member in annotation}
+        schema = {"type": JSON_TYPES[type(next(iter(members)))], "enum": list(members)}
+
+        def convert(value):
+            try:
+                return members[value]
+            except (KeyError, TypeError):
+                raise ToolError(f"must be one of {', '.join(map(str, members))}") from None
+    elif get_origin(annotation) is list:
+        (item_annotation,) = get_args(annotation)
+        item_schema, convert_item = _compile_param(item_annotation)
+        schema = {"type": "array", "items": item_schema}
+
+        def convert(value):
+            if not isinstance(value, list):
+                raise ToolError("must be an array")
+            return [convert_item(item) for item in value]
+    elif annotation in JSON_TYPES:
+        schema = {"type": JSON_TYPES[annotation]}
+        # JSON numbers may come back as ints; bools are ints in Python
+        accepted = (int, float) if annotation is float else annotation
+        expected = ("an " if schema["type"][0] in "aeiou" else "a ") + schema["type"]
+
+        def convert(value):
+            if not isinstance(value, accepted) or (isinstance(value, bool) and annotation is not bool):
+                raise ToolError(f"must be {expected}")
+            return value
+    else:
+        raise TypeError(f"Unsupported tool parameter type: {annotation!r}")
+
+    if description:
+        schema["description"] = description
+    return schema, convert
+
+
+class Tool:
+    """A function exposed to the model, with its schema and compiled argument validator."""
+
+    def __init__(self, fn: Callable, name: str, description: str, injected: tuple = ()):
+        self.fn = fn
+        self.name = name
+        self.injected = frozenset(injected)
+
+        hints = typing.get_type_hints(fn, include_extras=True)
+        properties = {}
+        required = []
+        converters = {}
+        for param in inspect.signature(fn).parameters.values():
+            if param.name in self.injected:
+                continue
+            schema, converters[param.name] = _compile_param(hints[param.name])
+            if param.default is inspect.Parameter.empty:
+                required.append(param.name)
+            else:
+                default = param.default
+                schema["default"] = default.value if isinstance(default, Enum) else default
+            properties[param.name] = schema
+
+        self.schema = {
+            "type": "function",
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+                "additionalProperties": False
+            }
+        }
+        self._converters = converters
+        self._required = frozenset(required)
+
+    def validate(self, arguments: str) -> dict:
+        """Parse the model's JSON arguments and return the keyword arguments to call with."""
+        try:
+            values = json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError as e:
+            raise ToolError(f"arguments are not valid JSON ({e})") from None
+        if not isinstance(values, dict):
+            raise ToolError("arguments must be a JSON object")
+
+        missing = self._required - values.keys()
+        if missing:
+            raise ToolError(f"missing argument(s): {', '.join(sorted(missing))}")
+
+        kwargs = {}
+        for key, value in values.items():
+            convert = self._converters.get(key)
+            if convert is None:
+                raise ToolError(f"unknown argument '{key}'")
+            try:
+                kwargs[key] = convert(value)
+            except ToolError as e:
+                raise ToolError(f"argument '{key}' {e}") from None
+        return kwargs
+
+
+class ToolRegistry:
+    """
+    Tools built from plain function signatures.
+
+    Parameter types (str, int, float, bool, list[...], Literal[...] and
+    Enum subclasses, optionally wrapped in Annotated[..., "description"])
+    become the JSON schema sent to the model, and are compiled once into a
+    validator that checks the model's arguments before the call. Invalid
+    arguments never reach the function: the call returns an error message
+    the model can correct in its next step.
+    """
+
+    def __init__(self):
+        self._tools: dict[str, Tool] = {}
+        self.calls = 0
+        self.rejected = 0
+        self.validation_seconds = 0.0
+        self._stats_lock = threading.Lock()
+
+    def register(self, fn: Callable, name: Optional[str] = None, injected: tuple = ()) -> Tool:
+        """
+        Expose `fn` as a tool. The description is its docstring; `injected`
+        parameters are left out of the schema and passed by `call` instead.
+        """
+        name = name or fn.__name__
+        description = inspect.getdoc(fn) or ""
+        tool = self._tools[name] = Tool(fn, name, description, injected)
+        return tool
+
+    def schemas(self) -> list[dict]:
+        return [tool.schema for tool in self._tools.values()]
+
+    def call(self, name: str, arguments: str, **injected) -> tuple[str, float]:
+        """
+        Validate and run one tool call. Returns the output text and the
+        time spent validating; errors are returned as output, not raised.
+        """
+        start = time.perf_counter()
+        tool = self._tools.get(name)
+        error = None
+        try:
+            if tool is None:
+                raise ToolError(f"unknown tool '{name}'")
+            kwargs = tool.validate(arguments)
+        except ToolError as e:
+            error = e
+        elapsed = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.calls += 1
+            self.rejected += error is not None
+            self.validation_seconds += elapsed
+        if tool is None:
+            return f"Error: {error}. Available tools: {', '.join(self._tools)}.", elapsed
+        if error is not None:
+            return f"Error: {error}. Fix the arguments and call {name} again.", elapsed
+
+        kwargs.update((key, value) for key, value in injected.items() if key in tool.injected)
+        return str(tool.fn(**kwargs)), elapsed
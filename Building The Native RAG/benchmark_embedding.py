@@ -0,0 +1,71 @@
+"""
+Embedding throughput of EmbeddingEngine per number of worker processes.
+
+Run with:  python benchmark_embedding.py [--chunks 4000] [--workers 1 2 4 8] [--batch-size 64]
+
+Embeds synthetic ~500-character scene chunks and reports chunks/sec and
+the speedup over one worker. Model loading is done (and excluded) before
+timing, by a warm-up batch on every worker.
+"""
+import argparse
+import os
+import random
+import time
+
+from embedding_engine import EmbeddingEngine
+
+WORDS = (
+    "INT. EXT. NIGHT DAY KITCHEN STREET CAR he she looks turns runs door window gun phone rain "
+    "slowly suddenly silence whispers shouts table light shadow train station office"
+).split()
+
+
+def synthetic_chunks(n: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(n):
+        words = []
+        while sum(len(word) + 1 for word in words) < 500:
+            words.append(rng.choice(WORDS))
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def default_worker_counts() -> list[int]:
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=4000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts())
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    print(f"{args.chunks:,} chunks, batch size {args.batch_size}, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'threads/worker':>15} {'seconds':>9} {'chunks/sec':>11} {'speedup':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        with EmbeddingEngine(workers=workers, batch_size=args.batch_size) as engine:
+            engine.embed_documents(chunks[:args.batch_size] * workers)  # load the model everywhere
+
+            start = time.perf_counter()
+            vectors = engine.embed_documents(chunks)
+            elapsed = time.perf_counter() - start
+        assert len(vectors) == len(chunks)
+
+        rate = len(chunks) / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8} {engine.threads:>15} {elapsed:>9.2f} {rate:>11,.0f} {rate / baseline:>7.2f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
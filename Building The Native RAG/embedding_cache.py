@@ -0,0 +1,173 @@
+import hashlib
+import sqlite3
+import threading
+from array import array
+from typing import Iterator
+
+from langchain_core.embeddings import Embeddings
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any LangChain Embeddings with a persistent cache, so unchanged
+    text is never sent to the model twice, across runs.
+
+    Vectors are stored in SQLite as float32 blobs, keyed by (model,
+    sha256(text)). Queries are cached under "<model>:query", since some
+    models embed queries differently from documents. Past `max_entries`
+    the least recently used vectors are evicted; the entry count is kept
+    as a running total, so storing a batch does not count the table.
+    `hits` and `misses` count the distinct texts of each call that were
+    served from the cache and that were sent to the model.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, path: str = "embeddings_cache.sqlite", max_entries: int = 200_000):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model     TEXT NOT NULL,
+                    hash      BLOB NOT NULL,
+                    vector    BLOB NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, hash)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used);
+            """)
+        (self._clock,) = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    # --------------------------------------------------
+    # Storage
+    # --------------------------------------------------
+    def _get(self, model: str, hashes: list[bytes]) -> dict:
+        """
+        Cached vectors of the distinct `hashes` (hash -> vector), marked as
+        just used, and counted as hits or misses.
+        """
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({', '.join('?' * len(chunk))})",
+                    [model, *chunk],
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                self._clock += 1
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                        ((self._clock, model, key) for key in found),
+                    )
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def _put(self, model: str, items: list[tuple[bytes, list[float]]]):
+        with self._lock:
+            self._clock += 1
+            with self._conn:
+                # a text stored meanwhile has the same vector: keep it
+                inserted = self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                    ((model, key, array("f", vector).tobytes(), self._clock) for key, vector in items),
+                ).rowcount
+                self._count += inserted
+                if self._count > self.max_entries:
+                    # least recently used first
+                    self._count -= self._conn.execute(
+                        "DELETE FROM embeddings WHERE (model, hash) IN "
+                        "(SELECT model, hash FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (self._count - self.max_entries,),
+                    ).rowcount
+
+    # --------------------------------------------------
+    # Embeddings interface
+    # --------------------------------------------------
+    def embed_batches(self, texts: list[str]) -> Iterator[list[list[float]]]:
+        """
+        Yield the embeddings of `texts` in order, in consecutive batches.
+        Cached texts are served at once; the others are embedded (with the
+        wrapped model's own batching when it has `embed_batches`) and
+        stored as their batches arrive.
+        """
+        hashes = [text_hash(text) for text in texts]
+        vectors = [None] * len(texts)
+        cached = self._get(self.model, list(set(hashes)))
+        missing = {}  # hash -> indexes of the texts to embed
+        for i, key in enumerate(hashes):
+            if key in cached:
+                vectors[i] = cached[key]
+            else:
+                missing.setdefault(key, []).append(i)
+
+        keys = list(missing)
+        miss_texts = [texts[missing[key][0]] for key in keys]
+        if not miss_texts:
+            batches = iter(())
+        elif hasattr(self.embeddings, "embed_batches"):
+            batches = self.embeddings.embed_batches(miss_texts)
+        else:
+            batches = iter([self.embeddings.embed_documents(miss_texts)])
+
+        ready = 0  # vectors[:ready] have been yielded
+        done = 0
+        while True:
+            while ready < len(texts) and vectors[ready] is None:
+                batch = next(batches)
+                batch_keys = keys[done:done + len(batch)]
+                done += len(batch)
+                self._put(self.model, list(zip(batch_keys, batch)))
+                for key, vector in zip(batch_keys, batch):
+                    for i in missing[key]:
+                        vectors[i] = vector
+            end = ready
+            while end < len(texts) and vectors[end] is not None:
+                end += 1
+            if end == ready:
+                return
+            yield vectors[ready:end]
+            ready = end
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for batch in self.embed_batches(texts):
+            vectors.extend(batch)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        model = self.model + ":query"
+        key = text_hash(text)
+        cached = self._get(model, [key])
+        if key in cached:
+            return cached[key]
+        vector = self.embeddings.embed_query(text)
+        self._put(model, [(key, vector)])
+        return vector
+
+    def close(self):
+        self._conn.close()
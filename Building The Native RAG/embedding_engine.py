@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """Load the model once per worker process, limited to `threads` torch threads."""
+    global _worker_model
+    import torch
+    from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+    torch.set_num_threads(threads)
+    _worker_model = HuggingFaceEmbeddings(model_name=model_name)
+
+
+def _embed_batch(texts: list[str]) -> list[list[float]]:
+    return _worker_model.embed_documents(texts)
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Sentence-transformers embeddings computed in batches by a pool of
+    worker processes, each with its own copy of the model.
+
+    `embed_batches` shards the texts into batches of `batch_size`, keeps
+    at most two batches per worker in flight and yields the results in
+    input order as they complete, so a consumer (see
+    `indexing.index_chunks`) can upload batch i while later ones are still
+    being embedded. With `workers=1` the model runs in this process.
+
+    Each worker uses `threads` torch threads (default: cores / workers),
+    so the pool does not oversubscribe the CPU. Workers are started with
+    the spawn method on every platform: forking a process that already
+    runs torch threads can deadlock.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        workers: Optional[int] = None,
+        batch_size: int = 64,
+        threads: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = None
+        self._local_model = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads),
+            )
+        return self._pool
+
+    def _local(self):
+        if self._local_model is None:
+            from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+            self._local_model = HuggingFaceEmbeddings(model_name=self.model_name)
+        return self._local_model
+
+    def embed_batches(self, texts: list[str]) -> Iterator[list[list[float]]]:
+        """Yield the embeddings of each batch of `batch_size` texts, in order."""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers == 1:
+            for batch in batches:
+                yield self._local().embed_documents(batch)
+            return
+
+        pool = self._executor()
+        in_flight = []
+        pending = iter(batches)
+        for batch in pending:
+            in_flight.append(pool.submit(_embed_batch, batch))
+            if len(in_flight) >= 2 * self.workers:
+                break
+        while in_flight:
+            yield in_flight.pop(0).result()
+            batch = next(pending, None)
+            if batch is not None:
+                in_flight.append(pool.submit(_embed_batch, batch))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for batch in self.embed_batches(texts):
+            vectors.extend(batch)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        # a single short text: not worth a round trip to a worker
+        return self._local().embed_query(text)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
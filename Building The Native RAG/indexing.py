@@ -0,0 +1,147 @@
+import hashlib
+import itertools
+import json
+import queue
+import threading
+import uuid
+from typing import Iterable, Iterator, Optional, Union
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointIdsList, PointStruct
+
+# payload keys QdrantVectorStore reads documents from
+CONTENT_KEY = "page_content"
+METADATA_KEY = "metadata"
+
+
+def chunk_id(text: str, metadata: Optional[dict] = None) -> str:
+    """
+    Point id of a chunk: a UUID made of the first 128 bits of the sha256 of
+    its text, and of its metadata when it has some (so a metadata change
+    replaces the point too).
+    """
+    key = text if not metadata else text + "\0" + json.dumps(metadata, sort_keys=True)
+    return str(uuid.UUID(hex=hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]))
+
+
+def existing_ids(client: QdrantClient, collection_name: str, page_size: int = 1024) -> set[str]:
+    """Ids of every point of the collection (ids only, no vectors or payloads)."""
+    ids = set()
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids.update(str(point.id) for point in points)
+        if offset is None:
+            return ids
+
+
+def _embed_batches(embeddings: Embeddings, texts: list[str], batch_size: int) -> Iterator[list[list[float]]]:
+    """Batches from the engine's own pipeline when it has one (EmbeddingEngine), else embed_documents per batch."""
+    if hasattr(embeddings, "embed_batches"):
+        yield from embeddings.embed_batches(texts)
+        return
+    for start in range(0, len(texts), batch_size):
+        yield embeddings.embed_documents(texts[start:start + batch_size])
+
+
+def index_chunks(
+    client: QdrantClient,
+    collection_name: str,
+    chunks: Iterable[Union[str, tuple[str, dict]]],
+    embeddings: Embeddings,
+    batch_size: int = 64,
+    queue_size: int = 4,
+    window: int = 1024,
+) -> dict:
+    """
+    Make the collection hold exactly `chunks`, embedding only what it lacks.
+
+    `chunks` are texts or (text, metadata) pairs, such as the SceneChunks
+    of scene_splitter.split_scenes. They are consumed lazily: only the
+    point ids seen so far and the next `window` new chunks are held in
+    memory, so a generator is indexed as it is produced.
+
+    Point ids are derived from the chunk content, so a chunk already in the
+    collection is recognized without comparing vectors: unchanged chunks
+    are skipped, new or edited ones are embedded and upserted in batches,
+    and once every chunk has been seen, points whose chunk is gone
+    (including points added by other means) are deleted. Running it twice
+    on the same chunks costs one scroll over the ids and no embedding.
+
+    Uploads run in a background thread fed through a queue of at most
+    `queue_size` embedded batches, so upserting one batch overlaps
+    embedding the next ones while memory stays bounded.
+
+    Returns the number of chunks added, kept and removed.
+    """
+    present = existing_ids(client, collection_name)
+    seen = set()
+    kept = 0
+
+    def new_chunks() -> Iterator[tuple[str, str, dict]]:
+        nonlocal kept
+        for chunk in chunks:
+            text, metadata = (chunk, {}) if isinstance(chunk, str) else chunk
+            point_id = chunk_id(text, metadata)
+            if point_id in seen:
+                continue  # identical chunks are stored once
+            seen.add(point_id)
+            if point_id in present:
+                kept += 1
+            else:
+                yield point_id, text, metadata
+
+    uploads = queue.Queue(maxsize=queue_size)
+    errors = []
+
+    def upload():
+        while True:
+            points = uploads.get()
+            if points is None:
+                return
+            if errors:
+                continue  # keep draining so the producer never blocks
+            try:
+                client.upsert(collection_name=collection_name, points=points)
+            except Exception as e:
+                errors.append(e)
+
+    uploader = threading.Thread(target=upload, name="qdrant-upload", daemon=True)
+    uploader.start()
+    added = 0
+    try:
+        pending = new_chunks()
+        # a window of new chunks at a time keeps the engine's pipeline full across batches
+        while not errors:
+            new = list(itertools.islice(pending, window))
+            if not new:
+                break
+            done = 0
+            for vectors in _embed_batches(embeddings, [text for _, text, _ in new], batch_size):
+                batch = new[done:done + len(vectors)]
+                done += len(vectors)
+                uploads.put([
+                    PointStruct(id=point_id, vector=vector, payload={CONTENT_KEY: text, METADATA_KEY: metadata})
+                    for (point_id, text, metadata), vector in zip(batch, vectors)
+                ])
+                if errors:
+                    break
+            added += len(new)
+    finally:
+        uploads.put(None)
+        uploader.join()
+    if errors:
+        raise errors[0]
+
+    stale_ids = list(present - seen)
+    if stale_ids:
+        client.delete(collection_name=collection_name, points_selector=PointIdsList(points=stale_ids))
+
+    return {"added": added, "kept": kept, "removed": len(stale_ids)}
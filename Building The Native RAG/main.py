@@ -1,174 +1,206 @@
+import argparse
 import dotenv
 import os
 os.environ["USER_AGENT"] = "Mozilla/5.0 (compatible; MovieScraper/1.0)"
 
-from langchain_community.document_loaders import IMSDbLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from bs4 import BeautifulSoup
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-import requests
-import re
 from langchain_qdrant import QdrantVectorStore
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client.http.models import Distance, PayloadSchemaType, VectorParams
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from script_cache import ScriptCache, script_url
+from indexing import index_chunks
+from scene_splitter import split_scenes
+from embedding_engine import DEFAULT_MODEL, EmbeddingEngine
+from embedding_cache import CachedEmbeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask questions about a movie script from IMSDb")
+    parser.add_argument("--cache-dir", default="script_cache", help="local copy of the fetched pages and scripts")
+    parser.add_argument("--refresh", action="store_true", help="re-check cached pages with IMSDb (ETag / Last-Modified)")
+    parser.add_argument("--import-dir", help="add a directory of .txt / .html scripts to the cache, then exit")
+    parser.add_argument("--workers", type=int, default=None, help="embedding processes (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per embedding batch")
+    args = parser.parse_args()
+
+    dotenv.load_dotenv()
+    api_key=os.environ.get("OPENROUTER_API_KEY", None)
+
+    script_cache = ScriptCache(args.cache_dir)
+    if args.import_dir:
+        count = script_cache.import_directory(args.import_dir)
+        print(f"Imported {count} scripts from {args.import_dir} into {args.cache_dir}.")
+        return
+
+    movie_names = script_cache.movie_titles(revalidate=args.refresh)
+
+    for i, title in enumerate(movie_names, start=1):
+        print(f"{i}. {title}")
+    print()
 
+    user_input = input("> ")
+    if user_input in movie_names:
+        title = user_input.replace(" ", "-")
+        url_movie = script_url(user_input)
+        text = script_cache.script_text(user_input, revalidate=args.refresh)
 
-dotenv.load_dotenv()
-api_key=os.environ.get("OPENROUTER_API_KEY", None)
-
-url_all_movies = "https://imsdb.com/all-scripts.html"
-response = requests.get(url_all_movies)
+        print(f"Loaded script for {user_input} from {url_movie}.")
+        print()
 
-soup = BeautifulSoup(response.text, "html.parser")
+        collection_name = title
+        engine = EmbeddingEngine(  # all-MiniLM-L6-v2, 384 dimensions
+            workers=args.workers,
+            batch_size=args.batch_size
+        )
+        embeddings_model = CachedEmbeddings(
+            engine,
+            model=DEFAULT_MODEL,
+            path=os.path.join(args.cache_dir, "embeddings.sqlite")
+        )
+        qdrant_client = QdrantClient(
+            url="http://192.168.50.68:6333"  # Qdrant REST API endpoint
+        )
+        if not qdrant_client.collection_exists(collection_name):
+            qdrant_client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=384, distance=Distance.COSINE)
+            )
+        # scene metadata is stored as payload: index it for filtered searches.
+        # Done on every open (existing indexes are kept), so collections
+        # created before the indexes existed get them too.
+        for field, schema in [
+            ("metadata.scene", PayloadSchemaType.INTEGER),
+            ("metadata.setting", PayloadSchemaType.KEYWORD),
+            ("metadata.location", PayloadSchemaType.KEYWORD),
+            ("metadata.characters", PayloadSchemaType.KEYWORD),
+        ]:
+            qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=schema
+            )
+
+        try:
+            # one pass over the script, one chunk per scene (or per part of a
+            # long scene), embedded and uploaded as the scenes are split
+            counts = index_chunks(
+                qdrant_client,
+                collection_name,
+                split_scenes(text),
+                embeddings_model
+            )
+        finally:
+            engine.close()  # queries are embedded in this process
+        vector_store = QdrantVectorStore(
+            client=qdrant_client,
+            collection_name=collection_name,
+            embedding=embeddings_model,
+        )
+        print(
+            f"Embedded script for {user_input}: {counts['added'] + counts['kept']} scene chunks, "
+            f"{counts['added']} new, {counts['kept']} already indexed, {counts['removed']} removed "
+            f"({embeddings_model.hits} embeddings from cache, {embeddings_model.misses} computed)."
+        )
 
-movie_names = [a.get_text(strip=True) for a in soup.select("p a")]
 
-for i, title in enumerate(movie_names, start=1):
-    print(f"{i}. {title}")
-print()
+        print()
+        user_query = input("> ")
 
-user_input = input("> ")
-if user_input in movie_names:
-    title = user_input.replace(" ", "-")
-    url_movie = f"https://imsdb.com/scripts/{title}.html"
-    loader = IMSDbLoader(url_movie)
-    data = loader.load()
-    text = data[0].page_content
-    text = re.sub(r'\s+', ' ', text).strip()
+        llm = ChatOpenAI(
+            model="openai/gpt-4o-mini",
+            api_key=api_key,
+            base_url="https://openrouter.ai/api/v1",
+            temperature=0.2
+        )
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=10,
-        separators=["INT."],
-        keep_separator="start"  # ensures "INT." stays at start of chunk
-    )
+        rewrite_prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+        You are a query rewriter for a movie scene retrieval system.
 
-    scene_chunks = splitter.split_text(text)
+        The system retrieves scenes based on semantic similarity to scene descriptions.
 
+        Rewrite the user's query so that it:
+        - ensures that it emphasizes the necessary keywords for scene retrieval
+        - Uses clear, descriptive language
+        - Avoids questions or conversational phrasing
+        - Is optimized for embedding-based retrieval
 
+        Return ONLY the rewritten query.
 
-    print(f"Loaded script for {user_input} from {url_movie}.")
-    print()
+        example:
+        users' query: "Only scenes involving trains"
+        Your rewritten query: "Find scenes featuring trains."
+        """),
+            ("human", "{query}")
+        ])
 
-    print(f"Found {len(scene_chunks)} scenes in the script for {user_input}.\n")
-    #for i, scene in enumerate(scene_chunks, start=1):
-    #    print(f"Scene {i}: {scene.strip()}")
-
-    collection_name = title
-    embeddings_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")  # 384 dimensions
-    qdrant_client = QdrantClient(
-        url="http://192.168.50.68:6333"  # Qdrant REST API endpoint
-    )
-    if not qdrant_client.collection_exists(collection_name):
-        qdrant_client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=384, distance=Distance.COSINE)
-        )
+        query_rewriter = rewrite_prompt | llm | StrOutputParser()
 
-    vector_store = QdrantVectorStore.from_texts(
-        texts=scene_chunks,
-        embedding=embeddings_model,
-        collection_name=collection_name,
-        url="http://192.168.50.68:6333",
-    )
-    print(f'Embedded script for {user_input}.')
+        rewritten_query = query_rewriter.invoke({
+            "query": user_query
+        })
 
+        print(f"Rewritten query to: \"{rewritten_query}\"")
+        print()
 
-    print()
-    user_query = input("> ")
-
-    llm = ChatOpenAI(
-        model="openai/gpt-4o-mini",
-        api_key=api_key,
-        base_url="https://openrouter.ai/api/v1",
-        temperature=0.2
-    )
-
-    rewrite_prompt = ChatPromptTemplate.from_messages([
-        ("system", """
-    You are a query rewriter for a movie scene retrieval system.
-    
-    The system retrieves scenes based on semantic similarity to scene descriptions.
-    
-    Rewrite the user's query so that it:
-    - ensures that it emphasizes the necessary keywords for scene retrieval
-    - Uses clear, descriptive language
-    - Avoids questions or conversational phrasing
-    - Is optimized for embedding-based retrieval
-    
-    Return ONLY the rewritten query.
-    
-    example:
-    users' query: "Only scenes involving trains"
-    Your rewritten query: "Find scenes featuring trains."
-    """),
-        ("human", "{query}")
-    ])
-
-    query_rewriter = rewrite_prompt | llm | StrOutputParser()
-
-    rewritten_query = query_rewriter.invoke({
-        "query": user_query
-    })
-
-    print(f"Rewritten query to: \"{rewritten_query}\"")
-    print()
+        results = vector_store.similarity_search(
+            rewritten_query,
+            k=5
+        )
 
-    results = vector_store.similarity_search(
-        rewritten_query,
-        k=5
-    )
+        #for i, doc in enumerate(results, start=1):
+        #    print(f"Scene {i}: {doc.page_content}")
 
-    #for i, doc in enumerate(results, start=1):
-    #    print(f"Scene {i}: {doc.page_content}")
+        context_text = "\n\n---\n\n".join(
+            doc.page_content for doc in results
+        )
 
-    context_text = "\n\n---\n\n".join(
-        doc.page_content for doc in results
-    )
+        answer_prompt = ChatPromptTemplate.from_messages([
+            ("system", """
+        You are an expert screenwriter and movie script analyst.
 
-    answer_prompt = ChatPromptTemplate.from_messages([
-        ("system", """
-    You are an expert screenwriter and movie script analyst.
+        You are given:
+        - A user request
+        - Relevant context extracted from movie script scenes
 
-    You are given:
-    - A user request
-    - Relevant context extracted from movie script scenes
+        Your task:
+        - Use ONLY the provided context when appropriate
+        - Expand, adapt, or creatively synthesize scenes if requested
+        - Write in proper screenplay format when applicable
+        - Be vivid, descriptive, and faithful to cinematic conventions
 
-    Your task:
-    - Use ONLY the provided context when appropriate
-    - Expand, adapt, or creatively synthesize scenes if requested
-    - Write in proper screenplay format when applicable
-    - Be vivid, descriptive, and faithful to cinematic conventions
+        If the user asks to create or rewrite a scene, respond in screenplay format.
+        """),
+            ("human", """
+        USER REQUEST:
+        {query}
 
-    If the user asks to create or rewrite a scene, respond in screenplay format.
-    """),
-        ("human", """
-    USER REQUEST:
-    {query}
+        RELEVANT SCRIPT CONTEXT:
+        {context}
 
-    RELEVANT SCRIPT CONTEXT:
-    {context}
+        Write a detailed and insightful response.
+        """)
+        ])
 
-    Write a detailed and insightful response.
-    """)
-    ])
+        answer_chain = answer_prompt | llm | StrOutputParser()
 
-    answer_chain = answer_prompt | llm | StrOutputParser()
+        final_answer = answer_chain.invoke({
+            "query": user_query,
+            "context": context_text
+        })
 
-    final_answer = answer_chain.invoke({
-        "query": user_query,
-        "context": context_text
-    })
+        print("Final Answer:")
+        print(final_answer)
 
-    print("Final Answer:")
-    print(final_answer)
 
+    else:
+        print(f"Script for '{user_input}' wasn't found in the list of movie scripts.")
 
-else:
-    print(f"Script for '{user_input}' wasn't found in the list of movie scripts.")
 
+# worker processes (spawn start method) import this module: keep the script out of import time
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import re
+import textwrap
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+# "INT. BRIDGE - NIGHT", "EXT/INT. CAR", "I/E HOUSE", optionally numbered: "12A INT. BRIDGE 12A"
+SCENE_HEADING = re.compile(
+    r"^(?:(\d+[A-Z]?)\.?\s+)?"
+    r"(INT\.?\s*/\s*EXT|EXT\.?\s*/\s*INT|I\s*/\s*E|INT|EXT)(?:\.|\s)\s*"
+    r"(.*?)"
+    r"(?:\s+\1\.?)?$"
+)
+TIMES_OF_DAY = {
+    "DAY", "NIGHT", "MORNING", "AFTERNOON", "EVENING", "DAWN", "DUSK", "SUNSET", "SUNRISE",
+    "LATER", "CONTINUOUS", "MOMENTS LATER", "SAME", "SAME TIME",
+}
+# all-caps lines that are not a character speaking
+NOT_CHARACTERS = {
+    "CONTINUED", "THE END", "FADE IN", "FADE OUT", "FADE TO BLACK", "CUT TO", "SMASH CUT", "DISSOLVE TO",
+    "MATCH CUT", "BACK TO", "INTERCUT", "ANGLE", "CLOSE", "CLOSE ON", "CLOSEUP", "POV", "INSERT", "TITLE",
+    "SUPER", "MONTAGE", "END MONTAGE", "FLASHBACK", "END FLASHBACK", "LATER", "SILENCE", "BLACK",
+}
+# "(V.O.)", "(CONT'D)", "(INTO RADIO)"...
+CHARACTER_EXTENSION = re.compile(r"(?:\s*\([^)]*\))+\s*$")
+
+
+class SceneChunk(NamedTuple):
+    text: str
+    metadata: dict
+
+
+def _lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Lines of a whole text (without slicing it all up front), or of any iterable of lines such as a file."""
+    if not isinstance(source, str):
+        for line in source:
+            yield line.rstrip("\r\n")
+        return
+    start = 0
+    while start < len(source):
+        end = source.find("\n", start)
+        if end == -1:
+            end = len(source)
+        yield source[start:end].rstrip("\r")
+        start = end + 1
+
+
+def _normalize(line: str) -> str:
+    return " ".join(line.split())
+
+
+def parse_heading(line: str) -> Optional[dict]:
+    """Setting, location and time of day of a scene heading, or None if `line` is not one."""
+    match = SCENE_HEADING.match(line)
+    if match is None:
+        return None
+    setting = re.sub(r"[\s.]", "", match.group(2))
+    setting = "INT/EXT" if setting not in ("INT", "EXT") else setting
+    location, time = match.group(3).strip(" .-"), None
+    head, sep, tail = location.rpartition(" - ")
+    if sep and tail.strip(" .") in TIMES_OF_DAY:
+        location, time = head.strip(), tail.strip(" .")
+    elif location in TIMES_OF_DAY:
+        location, time = "", location
+    return {"setting": setting, "location": location, "time": time}
+
+
+def character_cue(line: str, next_line: Optional[str]) -> Optional[str]:
+    """
+    The character a line introduces, if it is a dialogue cue: a short
+    all-caps line (extensions such as "(V.O.)" removed) followed by a line
+    of dialogue or a parenthetical rather than more capitals.
+    """
+    name = CHARACTER_EXTENSION.sub("", line).strip()
+    if not name or not name.isupper() or len(name) > 30 or len(name.split()) > 4:
+        return None
+    if name[-1] in ":!?." or name.strip(" .") in NOT_CHARACTERS or name[0].isdigit():
+        return None
+    if next_line is None or (next_line.isupper() and not next_line.startswith("(")):
+        return None
+    return name
+
+
+class _Scene:
+    def __init__(self, number: int, heading: Optional[str], info: Optional[dict]):
+        self.number = number
+        self.heading = heading
+        self.info = info or {"setting": None, "location": None, "time": None}
+        self.lines = [heading] if heading else []
+
+    def chunks(self, max_chars: int) -> Iterator[SceneChunk]:
+        # continuation parts keep the heading, so each one is retrievable on its own
+        base = [self.heading] if self.heading else []
+        base_size = len(self.heading) + 1 if self.heading else 0
+
+        body = self.lines[len(base):]
+        characters = []
+        for line, next_line in zip(body, body[1:] + [None]):
+            name = character_cue(line, next_line)
+            if name is not None and name not in characters:
+                characters.append(name)
+
+        parts = []
+        current, size = list(base), base_size
+        for line in body:
+            for piece in textwrap.wrap(line, max_chars) if len(line) > max_chars else [line]:
+                if len(current) > len(base) and size + len(piece) > max_chars:
+                    parts.append(current)
+                    current, size = list(base), base_size
+                current.append(piece)
+                size += len(piece) + 1
+        if current:
+            parts.append(current)
+
+        for part, lines in enumerate(parts):
+            yield SceneChunk("\n".join(lines), {
+                "scene": self.number,
+                "part": part,
+                **self.info,
+                "characters": characters,
+            })
+
+
+def split_scenes(source: Union[str, Iterable[str]], max_chars: int = 1000) -> Iterator[SceneChunk]:
+    """
+    Split a screenplay into its scenes in one pass over the lines.
+
+    A scene starts at each INT. / EXT. / INT./EXT. heading and runs to the
+    next one; text before the first heading (title page, FADE IN) is scene
+    0. Only the current scene is held in memory, so a whole script is never
+    copied or collapsed. Whitespace inside lines is normalized and blank
+    lines are dropped.
+
+    Scenes longer than `max_chars` are cut at line boundaries into several
+    chunks, each starting with the scene heading. Every chunk's metadata has
+    the scene number, the part within the scene, the setting (INT, EXT or
+    INT/EXT), the location, the time of day and the characters who speak in
+    the scene.
+    """
+    scene = _Scene(0, None, None)
+    for raw in _lines(source):
+        line = _normalize(raw)
+        if not line:
+            continue
+        info = parse_heading(line)
+        if info is not None:
+            yield from scene.chunks(max_chars)
+            scene = _Scene(scene.number + 1, line, info)
+        else:
+            scene.lines.append(line)
+    yield from scene.chunks(max_chars)
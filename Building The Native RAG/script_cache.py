@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+IMSDB_URL = "https://imsdb.com"
+
+
+def script_url(title: str, base_url: str = IMSDB_URL) -> str:
+    return f"{base_url}/scripts/{title.replace(' ', '-')}.html"
+
+
+def clean_script_html(html: str) -> str:
+    """The script text of an IMSDb script page (what IMSDbLoader returns)."""
+    soup = BeautifulSoup(html, "html.parser")
+    script = soup.select_one("td[class='scrtext']")
+    return script.text if script is not None else soup.get_text()
+
+
+class ScriptCache:
+    """
+    Local copy of the script corpus, so runs start from disk instead of
+    IMSDb.
+
+    Content (raw HTML pages and cleaned script texts) is stored once per
+    sha256 under `blobs/`, and checked against its hash when read back.
+    `index.json` maps each fetched URL to its HTML blob and HTTP validators
+    (ETag, Last-Modified), each HTML blob to its cleaned text, and each
+    known title to its script text.
+
+    Cached pages are served without any request. With `revalidate=True`
+    they are re-checked with a conditional GET: a 304, or a body with the
+    same hash, keeps the cached page and its cleaned text, so a script is
+    only parsed again when it really changed.
+    """
+
+    def __init__(self, directory: str = "script_cache", base_url: str = IMSDB_URL, timeout: float = 30):
+        self.directory = Path(directory)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = os.environ.get("USER_AGENT", "MovieScraper/1.0")
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+
+        self._index_path = self.directory / "index.json"
+        if self._index_path.exists():
+            self.index = json.loads(self._index_path.read_text(encoding="utf-8"))
+        else:
+            self.index = {"urls": {}, "cleaned": {}, "titles": {}}
+
+    # --------------------------------------------------
+    # Content-addressed blobs
+    # --------------------------------------------------
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / digest
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_blob(self, digest: str) -> Optional[bytes]:
+        """The blob's content, or None if it is missing or does not match its hash."""
+        path = self._blob_path(digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(data).hexdigest() != digest:
+            path.unlink()
+            return None
+        return data
+
+    def save_index(self):
+        tmp_path = self._index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.index), encoding="utf-8")
+        os.replace(tmp_path, self._index_path)
+
+    # --------------------------------------------------
+    # Fetching
+    # --------------------------------------------------
+    def fetch(self, url: str, revalidate: bool = False) -> str:
+        """The page at `url`, from the cache unless missing (or `revalidate` and changed)."""
+        entry = self.index["urls"].get(url)
+        cached = self.get_blob(entry["html"]) if entry else None
+        if cached is not None and not revalidate:
+            return cached.decode("utf-8")
+
+        headers = {}
+        if cached is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            return cached.decode("utf-8")
+        response.raise_for_status()
+
+        html = response.text
+        self.index["urls"][url] = {
+            "html": self.put_blob(html.encode("utf-8")),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        self.save_index()
+        return html
+
+    def movie_titles(self, revalidate: bool = False) -> list[str]:
+        """
+        Titles listed on the IMSDb index page, followed by the titles only
+        known from imported files. Without network, the imported titles
+        alone are returned.
+        """
+        try:
+            html = self.fetch(f"{self.base_url}/all-scripts.html", revalidate)
+        except requests.RequestException:
+            if not self.index["titles"]:
+                raise
+            return sorted(self.index["titles"])
+
+        soup = BeautifulSoup(html, "html.parser")
+        titles = [a.get_text(strip=True) for a in soup.select("p a")]
+        listed = set(titles)
+        return titles + sorted(title for title in self.index["titles"] if title not in listed)
+
+    def script_text(self, title: str, revalidate: bool = False) -> str:
+        """The cleaned script of `title`; a page is only parsed once per content hash."""
+        known = self.index["titles"].get(title)
+        if known is not None and (not revalidate or known["source"] == "file"):
+            text = self.get_blob(known["text"])
+            if text is not None:
+                return text.decode("utf-8")
+            if known["source"] == "file":
+                raise FileNotFoundError(f"The imported script of '{title}' is missing from {self.directory}")
+
+        html = self.fetch(script_url(title, self.base_url), revalidate)
+        html_digest = self.index["urls"][script_url(title, self.base_url)]["html"]
+
+        text_digest = self.index["cleaned"].get(html_digest)
+        text = self.get_blob(text_digest) if text_digest else None
+        if text is None:
+            text = clean_script_html(html).encode("utf-8")
+            text_digest = self.index["cleaned"][html_digest] = self.put_blob(text)
+
+        self.index["titles"][title] = {"text": text_digest, "source": "web"}
+        self.save_index()
+        return text.decode("utf-8")
+
+    # --------------------------------------------------
+    # Offline import
+    # --------------------------------------------------
+    def import_directory(self, directory: str) -> int:
+        """
+        Add every script of `directory` to the cache: `.txt` files as
+        script text, `.html` files as IMSDb pages to clean. The title is the
+        file name with dashes and underscores as spaces. Returns the number
+        of scripts imported.
+        """
+        count = 0
+        for path in sorted(Path(directory).iterdir()):
+            if path.suffix.lower() == ".txt":
+                text = path.read_text(encoding="utf-8", errors="replace")
+            elif path.suffix.lower() in (".html", ".htm"):
+                text = clean_script_html(path.read_text(encoding="utf-8", errors="replace"))
+            else:
+                continue
+            title = path.stem.replace("-", " ").replace("_", " ")
+            self.index["titles"][title] = {"text": self.put_blob(text.encode("utf-8")), "source": "file"}
+            count += 1
+
+        self.save_index()
+        return count
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Vectors made from the text (queries differ from documents); remembers what it embedded."""
+
+    def __init__(self):
+        self.documents = []
+        self.queries = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.documents.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.queries.append(text)
+        return [float(len(text)), -1.0]
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "embeddings.sqlite")
+        self.inner = CountingEmbeddings()
+
+    def open_cache(self, model: str = "mini", **kwargs) -> CachedEmbeddings:
+        cache = CachedEmbeddings(self.inner, model=model, path=self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_hits_and_misses(self):
+        cache = self.open_cache()
+        self.assertEqual(cache.embed_documents(["a", "bb", "a"]), [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]])
+        self.assertEqual(self.inner.documents, ["a", "bb"])
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+        self.assertEqual(cache.embed_documents(["bb", "ccc"]), [[2.0, 1.0], [3.0, 1.0]])
+        self.assertEqual(self.inner.documents, ["a", "bb", "ccc"])
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(len(cache), 3)
+
+    def test_single_and_batch_lookups_count_alike(self):
+        cache = self.open_cache()
+        cache.embed_query("where is the ship")
+        cache.embed_query("where is the ship")
+        self.assertEqual(self.inner.queries, ["where is the ship"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # queries are cached apart from documents of the same text
+        self.assertEqual(cache.embed_documents(["where is the ship"]), [[17.0, 1.0]])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_vectors_persist_across_runs(self):
+        self.open_cache().embed_documents(["a", "bb"])
+        reopened = self.open_cache()
+        self.assertEqual(reopened.embed_documents(["bb", "a"]), [[2.0, 1.0], [1.0, 1.0]])
+        self.assertEqual(self.inner.documents, ["a", "bb"])
+        self.assertEqual(len(reopened), 2)
+
+    def test_models_are_kept_apart(self):
+        self.open_cache("mini").embed_documents(["a"])
+        other = self.open_cache("large")
+        other.embed_documents(["a"])
+        self.assertEqual(self.inner.documents, ["a", "a"])
+        self.assertEqual((other.hits, other.misses), (0, 1))
+        self.assertEqual(len(other), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.open_cache(max_entries=3)
+        cache.embed_documents(["a", "bb", "ccc"])
+        cache.embed_documents(["a"])  # "bb" and "ccc" are now the oldest
+        cache.embed_documents(["dddd", "eeeee"])
+        self.assertEqual(len(cache), 3)
+
+        self.inner.documents = []
+        cache.embed_documents(["a", "dddd", "eeeee"])
+        self.assertEqual(self.inner.documents, [])
+        cache.embed_documents(["bb"])
+        self.assertEqual(self.inner.documents, ["bb"])
+        self.assertEqual(len(cache), 3)
+        # the running count matches the table, also after reopening
+        self.assertEqual(len(self.open_cache(max_entries=3)), 3)
+
+    def test_batches_come_back_in_order(self):
+        class Batched(CountingEmbeddings):
+            def embed_batches(self, texts):
+                for start in range(0, len(texts), 2):
+                    yield self.embed_documents(texts[start:start + 2])
+
+        self.inner = Batched()
+        cache = self.open_cache()
+        cache.embed_documents(["bb", "dddd"])
+        batches = list(cache.embed_batches(["a", "bb", "ccc", "dddd", "eeeee"]))
+        self.assertEqual([vector[0] for batch in batches for vector in batch], [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(self.inner.documents, ["bb", "dddd", "a", "ccc", "eeeee"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import Distance, VectorParams
+
+from indexing import CONTENT_KEY, METADATA_KEY, chunk_id, existing_ids, index_chunks
+
+
+class CountingEmbeddings(Embeddings):
+    """Small deterministic vectors; remembers every text it embedded."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0, 0.5] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestIndexChunks(unittest.TestCase):
+    def setUp(self):
+        self.client = QdrantClient(":memory:")
+        self.client.create_collection("script", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+        self.embeddings = CountingEmbeddings()
+
+    def index(self, chunks, window=1024):
+        self.embeddings.embedded = []
+        return index_chunks(self.client, "script", chunks, self.embeddings, batch_size=2, window=window)
+
+    def test_chunk_ids_hash_the_content(self):
+        self.assertEqual(chunk_id("INT. BRIDGE"), chunk_id("INT. BRIDGE"))
+        self.assertNotEqual(chunk_id("INT. BRIDGE"), chunk_id("INT. BRIDGE "))
+        self.assertEqual(chunk_id("INT. BRIDGE", {}), chunk_id("INT. BRIDGE"))
+        self.assertEqual(chunk_id("x", {"scene": 1, "part": 0}), chunk_id("x", {"part": 0, "scene": 1}))
+        self.assertNotEqual(chunk_id("x", {"scene": 1}), chunk_id("x", {"scene": 2}))
+
+    def test_second_run_skips_unchanged_chunks(self):
+        texts = [f"scene {i}" for i in range(5)]
+        metadatas = [{"scene": i} for i in range(5)]
+
+        self.assertEqual(self.index(zip(texts, metadatas)), {"added": 5, "kept": 0, "removed": 0})
+        self.assertEqual(self.embeddings.embedded, texts)
+        self.assertEqual(existing_ids(self.client, "script"), {chunk_id(t, m) for t, m in zip(texts, metadatas)})
+
+        self.assertEqual(self.index(zip(texts, metadatas)), {"added": 0, "kept": 5, "removed": 0})
+        self.assertEqual(self.embeddings.embedded, [])
+
+    def test_edited_chunks_are_replaced(self):
+        self.index(["scene 0", "scene 1", "scene 2"])
+
+        counts = self.index(["scene 0", "scene 1 (revised)", "scene 3", "scene 3"])
+
+        self.assertEqual(counts, {"added": 2, "kept": 1, "removed": 2})
+        self.assertEqual(self.embeddings.embedded, ["scene 1 (revised)", "scene 3"])
+        points, _ = self.client.scroll("script", with_payload=True)
+        self.assertEqual(
+            sorted(point.payload[CONTENT_KEY] for point in points),
+            ["scene 0", "scene 1 (revised)", "scene 3"],
+        )
+        self.assertTrue(all(point.payload[METADATA_KEY] == {} for point in points))
+
+    def test_generator_is_consumed_a_window_at_a_time(self):
+        produced = []
+
+        def chunks():
+            for i in range(7):
+                produced.append(i)
+                yield f"scene {i}", {"scene": i}
+
+        embedded_when = []
+        embed_documents = self.embeddings.embed_documents
+
+        def record(texts):
+            embedded_when.append(len(produced))
+            return embed_documents(texts)
+
+        self.embeddings.embed_documents = record
+        self.assertEqual(self.index(chunks(), window=3), {"added": 7, "kept": 0, "removed": 0})
+        # windows of 3 chunks, embedded in batches of 2, before the next window is read
+        self.assertEqual(embedded_when, [3, 3, 6, 6, 7])
+        self.assertEqual(len(existing_ids(self.client, "script")), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
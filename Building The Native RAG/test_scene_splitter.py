@@ -0,0 +1,81 @@
+import io
+import unittest
+
+from scene_splitter import parse_heading, split_scenes
+
+SCRIPT = """
+                              ALIEN
+
+FADE IN:
+
+INT. NOSTROMO - BRIDGE - NIGHT
+
+          The crew wakes up, one by one.
+
+                              DALLAS
+                    Everybody up.
+
+                              RIPLEY (V.O.)
+                    We're not home.
+
+EXT.   PLANETOID - DAY
+
+          A storm. THE SHIP LANDS.
+
+12A  INT./EXT. SHUTTLE - CONTINUOUS  12A
+
+                              KANE
+                         (into radio)
+                    Going in.
+
+                              CUT TO:
+"""
+
+
+class TestSceneSplitter(unittest.TestCase):
+    def test_scenes_and_metadata(self):
+        chunks = list(split_scenes(SCRIPT))
+        self.assertEqual([chunk.metadata["scene"] for chunk in chunks], [0, 1, 2, 3])
+
+        self.assertEqual(chunks[0].text, "ALIEN\nFADE IN:")
+        self.assertIsNone(chunks[0].metadata["setting"])
+
+        bridge = chunks[1]
+        self.assertTrue(bridge.text.startswith("INT. NOSTROMO - BRIDGE - NIGHT\nThe crew wakes up, one by one."))
+        self.assertEqual(bridge.metadata["setting"], "INT")
+        self.assertEqual(bridge.metadata["location"], "NOSTROMO - BRIDGE")
+        self.assertEqual(bridge.metadata["time"], "NIGHT")
+        self.assertEqual(bridge.metadata["characters"], ["DALLAS", "RIPLEY"])
+
+        planetoid = chunks[2].metadata
+        self.assertEqual((planetoid["setting"], planetoid["location"], planetoid["time"]), ("EXT", "PLANETOID", "DAY"))
+        self.assertEqual(planetoid["characters"], [])
+
+        shuttle = chunks[3].metadata
+        self.assertEqual((shuttle["setting"], shuttle["location"], shuttle["time"]), ("INT/EXT", "SHUTTLE", "CONTINUOUS"))
+        self.assertEqual(shuttle["characters"], ["KANE"])
+
+    def test_headings(self):
+        self.assertEqual(parse_heading("EXT. ROOM 101"), {"setting": "EXT", "location": "ROOM 101", "time": None})
+        self.assertEqual(parse_heading("I/E CAR - DAWN")["setting"], "INT/EXT")
+        self.assertIsNone(parse_heading("INTERIOR DESIGN"))
+        self.assertIsNone(parse_heading("Int. she walks in"))
+
+    def test_long_scene_is_cut_at_lines_and_keeps_heading(self):
+        lines = ["INT. CORRIDOR - NIGHT"] + [f"Ripley runs past door {i}." for i in range(100)]
+        chunks = list(split_scenes("\n".join(lines), max_chars=200))
+
+        self.assertGreater(len(chunks), 1)
+        for part, chunk in enumerate(chunks):
+            self.assertLessEqual(len(chunk.text), 200)
+            self.assertTrue(chunk.text.startswith("INT. CORRIDOR - NIGHT\n"))
+            self.assertEqual((chunk.metadata["scene"], chunk.metadata["part"]), (1, part))
+        body = [line for chunk in chunks for line in chunk.text.split("\n")[1:]]
+        self.assertEqual(body, lines[1:])
+
+    def test_file_and_text_give_the_same_chunks(self):
+        self.assertEqual(list(split_scenes(io.StringIO(SCRIPT))), list(split_scenes(SCRIPT)))
+
+
+if __name__ == "__main__":
+    unittest.main()
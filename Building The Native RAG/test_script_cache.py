@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from script_cache import ScriptCache
+
+INDEX_PAGE = """<html><body>
+<p><a href="/Movie Scripts/Alien Script.html">Alien</a> (1979)</p>
+<p><a href="/Movie Scripts/Blade Runner Script.html">Blade Runner</a> (1982)</p>
+</body></html>"""
+
+SCRIPT_PAGE = """<html><body><table><tr>
+<td class="scrtext"><pre>INT. NOSTROMO - BRIDGE
+The crew wakes up.
+EXT. PLANETOID - NIGHT
+A storm.</pre></td>
+</tr></table></body></html>"""
+
+
+class FakeIMSDb(BaseHTTPRequestHandler):
+    """Serves `pages` with ETags and answers If-None-Match with 304, counting requests."""
+
+    pages = {}
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(self.path)
+        body = self.pages.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScriptCache(unittest.TestCase):
+    def setUp(self):
+        FakeIMSDb.pages = {
+            "/all-scripts.html": INDEX_PAGE,
+            "/scripts/Alien.html": SCRIPT_PAGE,
+        }
+        FakeIMSDb.requests_seen = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeIMSDb)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.stop_server()
+        self.tmp.cleanup()
+
+    def stop_server(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def new_cache(self):
+        return ScriptCache(self.cache_dir, base_url=self.base_url)
+
+    def test_second_run_starts_from_cache(self):
+        cache = self.new_cache()
+        self.assertEqual(cache.movie_titles(), ["Alien", "Blade Runner"])
+        text = cache.script_text("Alien")
+        self.assertIn("INT. NOSTROMO - BRIDGE", text)
+        self.assertIn("EXT. PLANETOID - NIGHT", text)
+        self.assertNotIn("<pre>", text)
+        self.assertEqual(len(FakeIMSDb.requests_seen), 2)
+
+        # a new process with IMSDb unreachable
+        self.stop_server()
+        cache = self.new_cache()
+        self.assertEqual(cache.movie_titles(), ["Alien", "Blade Runner"])
+        self.assertEqual(cache.script_text("Alien"), text)
+        self.assertEqual(len(FakeIMSDb.requests_seen), 2)
+
+    def test_revalidation_uses_etags(self):
+        cache = self.new_cache()
+        text = cache.script_text("Alien")
+
+        self.assertEqual(cache.script_text("Alien", revalidate=True), text)
+        self.assertEqual(len(FakeIMSDb.requests_seen), 2)  # answered with a 304
+
+        FakeIMSDb.pages["/scripts/Alien.html"] = SCRIPT_PAGE.replace("A storm.", "A sandstorm.")
+        self.assertIn("A sandstorm.", cache.script_text("Alien", revalidate=True))
+        self.assertIn("A sandstorm.", self.new_cache().script_text("Alien"))
+
+    def test_corrupted_blob_is_rebuilt(self):
+        cache = self.new_cache()
+        text = cache.script_text("Alien")
+        digest = cache.index["titles"]["Alien"]["text"]
+        with open(cache._blob_path(digest), "w", encoding="utf-8") as f:
+            f.write("garbage")
+
+        self.assertEqual(self.new_cache().script_text("Alien"), text)
+
+    def test_offline_import(self):
+        scripts = os.path.join(self.tmp.name, "scripts")
+        os.mkdir(scripts)
+        with open(os.path.join(scripts, "The-Thing.txt"), "w", encoding="utf-8") as f:
+            f.write("EXT. ANTARCTICA - DAY\nA dog runs.")
+        with open(os.path.join(scripts, "Alien_3.html"), "w", encoding="utf-8") as f:
+            f.write(SCRIPT_PAGE)
+        with open(os.path.join(scripts, "notes.md"), "w", encoding="utf-8") as f:
+            f.write("not a script")
+
+        self.stop_server()
+        cache = self.new_cache()
+        self.assertEqual(cache.import_directory(scripts), 2)
+        self.assertEqual(cache.movie_titles(), ["Alien 3", "The Thing"])
+        self.assertIn("A dog runs.", cache.script_text("The Thing"))
+        self.assertIn("INT. NOSTROMO - BRIDGE", cache.script_text("Alien 3"))
+        self.assertEqual(FakeIMSDb.requests_seen, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+"""
+Benchmarks for the CLI Tasks Manager core.
+
+Run with:  python benchmark.py [--sizes N [N ...]] [--suites core layout scheduler] [--trace]
+
+The "core" suite times add_task, edit_task, mark_task_done, view_tasks,
+save_to_file and load_from_file on synthetic workloads (10k to 10M
+tasks). It reports ops/sec and the process's peak RSS, and with --trace
+it also reports the peak traced memory and the number of allocated
+blocks that each operation leaves behind (tracemalloc). Timings taken
+with --trace include the tracing overhead.
+
+To profile an interactive or batch session instead, run
+main.py --profile stats.prof.
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from main import DAYS, Task, TaskManager
+
+
+class DictTask:
+    """The previous Task layout (plain __dict__ instance), kept as a baseline."""
+
+    def __init__(self, day, description, priority="medium", due_date=None):
+        self.id = 0
+        self.day = day
+        self.description = description
+        self.priority = priority
+        self.due_date = due_date
+        self.status = "pending"
+
+
+PRIORITIES = ["low", "medium", "high"]
+
+
+def synthetic_rows(n: int, seed: int = 42):
+    """Yield (day, description, priority, due_date) tuples."""
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    for i in range(n):
+        due = start + timedelta(days=rng.randrange(365)) if rng.random() < 0.7 else None
+        # fresh string objects, like values coming from input() or a file
+        yield (
+            "".join(rng.choice(DAYS)),
+            f"Task number {i}",
+            "".join(rng.choice(PRIORITIES)),
+            due,
+        )
+
+
+def measure_build(cls, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = [cls(*row) for row in rows]
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tasks, elapsed, peak
+
+
+def measure_iteration(tasks, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = 0
+        for task in tasks:
+            if task.status == "pending" and task.priority == "high":
+                count += 1
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_task_layout(n: int):
+    print(f"Task layout, {n:,} tasks")
+    print(f"{'layout':<10} {'build s':>10} {'peak MiB':>10} {'B/task':>8} {'scan s':>10}")
+    for name, cls in (("__dict__", DictTask), ("__slots__", Task)):
+        tasks, build_s, peak = measure_build(cls, synthetic_rows(n))
+        scan_s = measure_iteration(tasks)
+        print(
+            f"{name:<10} {build_s:>10.3f} {peak / 2**20:>10.1f} "
+            f"{peak / n:>8.0f} {scan_s:>10.3f}"
+        )
+        del tasks
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_scheduler(n: int):
+    manager = TaskManager()
+    _, load_s = timed(
+        manager.bulk_add,
+        (
+            {"day": day, "description": desc, "priority": prio, "due_date": due}
+            for day, desc, prio, due in synthetic_rows(n)
+        ),
+    )
+
+    print(f"\nDue-date scheduler, {n:,} tasks (bulk_add {load_s:.2f}s)")
+    print(f"{'operation':<34} {'ms':>10} {'results':>8}")
+
+    as_of = date(2026, 1, 3)
+    for label, fn, args in (
+        ("next_due(10)", manager.next_due, (10,)),
+        ("next_due(10, as_of=Jul 1)", manager.next_due, (10, date(2026, 7, 1))),
+        ("overdue(Jan 3)", manager.overdue, (as_of,)),
+        ("due_between(Mar 1, Mar 1)", manager.due_between, (date(2026, 3, 1), date(2026, 3, 1))),
+    ):
+        result, elapsed = timed(fn, *args)
+        print(f"{label:<34} {elapsed * 1000:>10.3f} {len(result):>8}")
+
+    rng = random.Random(1)
+    ids = rng.sample(list(manager._tasks_by_id), min(n, 10_000))
+    start = time.perf_counter()
+    for task_id in ids:
+        # the index maintenance part of edit_task, without its positional lookup
+        task = manager.get_task(task_id)
+        manager._apply_edit(task, due_date=date(2027, 1, 1) + timedelta(days=rng.randrange(365)))
+    edit_s = time.perf_counter() - start
+    print(f"{'10k due-date edits (per edit)':<34} {edit_s / len(ids) * 1000:>10.4f}")
+
+    start = time.perf_counter()
+    for i in range(10_000):
+        manager.add_task("General", f"extra {i}", due_date=date(2026, 6, 1) + timedelta(days=i % 90))
+    add_s = time.perf_counter() - start
+    print(f"{'10k add_task (per add)':<34} {add_s / 10_000 * 1000:>10.4f}")
+
+
+def peak_rss_mib() -> Optional[float]:
+    """Peak resident set size of this process so far (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if os.uname().sysname == "Darwin" else peak / 2**10
+
+
+def core_operations(n: int, workdir: str):
+    """
+    Yield (name, op_count, fn) for each core operation, in an order where
+    each one sees the state the previous ones left behind.
+    """
+    manager = TaskManager()
+    rows = list(synthetic_rows(n))
+    rng = random.Random(3)
+    sample = min(n, 100_000)
+    targets = []
+
+    def add_all():
+        for day, description, priority, due_date in rows:
+            manager.add_task(day, description, priority, due_date)
+        lengths = {day: len(tasks) for day, tasks in manager.tasks_by_day.items()}
+        days = list(lengths)
+        for _ in range(sample):
+            day = rng.choice(days)
+            targets.append((day, rng.randrange(lengths[day])))
+
+    def edit_some():
+        for day, task_index in targets:
+            manager.edit_task(day, task_index, description="edited", priority="high")
+
+    def mark_some_done():
+        for day, task_index in targets:
+            manager.mark_task_done(day, task_index)
+
+    def view_all():
+        seen = 0
+        for tasks in manager.view_tasks().values():
+            for task in tasks:
+                seen += task.status == "done"
+        return seen
+
+    path = os.path.join(workdir, "tasks.json")
+
+    def load():
+        TaskManager().load_from_file(path)
+
+    yield "add_task", n, add_all
+    yield "edit_task", sample, edit_some
+    yield "mark_task_done", sample, mark_some_done
+    yield "view_tasks (per task)", n, view_all
+    yield "save_to_file (per task)", n, lambda: manager.save_to_file(path)
+    yield "load_from_file (per task)", n, load
+
+
+def bench_core(n: int, trace: bool):
+    print(f"\nCore operations, {n:,} tasks")
+    header = f"{'operation':<26} {'ops':>10} {'seconds':>9} {'ops/sec':>12} {'peak RSS MiB':>13}"
+    if trace:
+        header += f" {'traced peak MiB':>16} {'blocks kept':>12}"
+    print(header)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, count, fn in core_operations(n, workdir):
+            gc.collect()
+            if trace:
+                tracemalloc.start()
+                before = tracemalloc.take_snapshot()
+
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+
+            line = f"{name:<26} {count:>10,} {elapsed:>9.3f} {count / elapsed:>12,.0f}"
+            rss = peak_rss_mib()
+            line += f" {rss:>13,.0f}" if rss is not None else f" {'n/a':>13}"
+
+            if trace:
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                kept = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+                line += f" {peak / 2**20:>16,.1f} {kept:>12,}"
+            print(line, flush=True)
+
+
+SUITES = {
+    "core": bench_core,
+    "layout": lambda n, trace: bench_task_layout(n),
+    "scheduler": lambda n, trace: bench_scheduler(n),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="task counts to benchmark (e.g. 10000 100000 1000000 10000000)",
+    )
+    parser.add_argument("--suites", nargs="+", choices=list(SUITES), default=["core"])
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="also measure allocations with tracemalloc (much slower)",
+    )
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        for suite in args.suites:
+            SUITES[suite](n, args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,83 @@
+import argparse
+import cProfile
+import functools
+import hashlib
+import itertools
 import json
+import os
+import pstats
+import shlex
+import sys
+import threading
+import time
 from datetime import date
 from typing import Optional
 
+from scheduler import DueDateIndex
+from search import InvertedIndex, tokenize
+from storage import (
+    FileLock,
+    SQLiteStorage,
+    StorageEngine,
+    TaskJournal,
+    iter_journal,
+    iter_records,
+    write_records,
+)
+
 DAYS = [
     "Monday", "Tuesday", "Wednesday", "Thursday",
     "Friday", "Saturday", "Sunday", "General"
 ]
 
+def _parse_date(value) -> Optional[date]:
+    """Accept a date, an ISO "YYYY-MM-DD" string, or an empty value."""
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def _search_index_filename(filename: str) -> str:
+    """tasks.json -> tasks.index.json"""
+    return os.path.splitext(filename)[0] + ".index.json"
+
+
+def _read_task_file(filename: str):
+    """
+    Return (next_id, records) for a JSON task file, records in file order.
+    Files written before ids were saved give records with "id" None and
+    a next_id of 0.
+    """
+    with open(filename, "rb") as f:
+        return _parse_task_data(json.loads(f.read()))
+
+
+def _parse_task_data(data: dict):
+    """(next_id, records) of the decoded content of a task file."""
+    records = []
+    for day in DAYS:
+        for task_data in data.get(day, []):
+            records.append({
+                "id": task_data.get("id"),
+                "day": day,
+                "description": task_data["task"],
+                "priority": task_data.get("priority", "medium"),
+                "due_date": task_data.get("due_date"),
+                "status": task_data["status"].lower(),
+                "version": task_data.get("version", 1),
+            })
+    return data.get("next_id", 0), records
+
+
 class Task:
     """Represents a single task."""
 
-    _id_counter = 0  # class-level counter for unique task IDs
+    # no per-instance __dict__: keeps large task sets compact
+    __slots__ = ("id", "day", "description", "priority", "due_date", "status", "version")
+
+    _id_counter = 0  # fallback IDs for tasks created outside a TaskManager
 
     def __init__(
         self,
@@ -18,19 +85,50 @@ class Task:
         description: str,
         priority: str = "medium",
         due_date: Optional[date] = None,
+        task_id: Optional[int] = None,
     ):
-        self.id = Task._id_counter
-        Task._id_counter += 1
+        if task_id is None:
+            task_id = Task._id_counter
+            Task._id_counter += 1
+        self.id = task_id
 
-        self.day = day
+        # day/priority/status come from a handful of values: intern them so
+        # every task shares the same string objects
+        self.day = sys.intern(day)
         self.description = description
-        self.priority = priority
+        self.priority = sys.intern(priority)
         self.due_date = due_date
         self.status = "pending"  # default status
+        self.version = 1  # bumped on every change, used to merge concurrent saves
 
     def mark_done(self):
         self.status = "done"
 
+    def to_record(self) -> dict:
+        return {
+            "id": self.id,
+            "day": self.day,
+            "description": self.description,
+            "priority": self.priority,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "status": self.status,
+            "version": self.version,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Task":
+        """Rebuild a saved task, keeping its original ID if it has one."""
+        task = cls(
+            day=record["day"],
+            description=record["description"],
+            priority=record.get("priority", "medium"),
+            due_date=_parse_date(record.get("due_date")),
+            task_id=record.get("id"),
+        )
+        task.status = sys.intern(record.get("status") or "pending")
+        task.version = record.get("version") or 1
+        return task
+
     def __str__(self):
         return (
             f"[ID: {self.id}] "
@@ -46,6 +144,95 @@ class TaskManager:
 
     def __init__(self):
         self.tasks_by_day = {}  # e.g. {"Monday": [Task, Task]}
+        self._next_id = 0       # IDs are never reused, and survive save/load
+
+        # secondary indexes, kept in sync by add/edit/done/load
+        self._tasks_by_id = {}      # id -> Task
+        self._ids_by_day = {}       # day -> {id, ...}
+        self._ids_by_status = {}    # status -> {id, ...}
+        self._ids_by_priority = {}  # priority -> {id, ...}
+        self._due_index = DueDateIndex()    # (due_date, id) of every task
+        self._pending_due = DueDateIndex()  # (due_date, id) of tasks not done
+        self._search = InvertedIndex()      # description token -> ids
+
+        self._journal = None  # TaskJournal, when one is open
+
+        self._storage = None       # StorageEngine, when one is attached
+        self._loaded_days = set()  # days already read from the storage
+        self._dirty_ids = set()    # tasks changed since the last save_to_storage
+
+    # --------------------------------------------------
+    # Index maintenance
+    # --------------------------------------------------
+    def _index_task(self, task: Task, index_due: bool = True, index_text: bool = True):
+        self._tasks_by_id[task.id] = task
+        self._ids_by_day.setdefault(task.day, set()).add(task.id)
+        self._ids_by_status.setdefault(task.status, set()).add(task.id)
+        self._ids_by_priority.setdefault(task.priority, set()).add(task.id)
+        if index_due:  # bulk callers update the due-date indexes in one go
+            self._add_due(task)
+        if index_text:  # skipped when a saved search index is loaded instead
+            self._search.add(task.id, task.description)
+
+    def _unindex_task(self, task: Task):
+        del self._tasks_by_id[task.id]
+        for index, key in (
+            (self._ids_by_day, task.day),
+            (self._ids_by_status, task.status),
+            (self._ids_by_priority, task.priority),
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(task.id)
+                if not ids:
+                    del index[key]
+        self._remove_due(task)
+        self._search.remove(task.id, task.description)
+
+    def _new_id(self) -> int:
+        task_id = self._next_id
+        self._next_id += 1
+        return task_id
+
+    def _restore_task(self, record: dict) -> Task:
+        """Build a task from a saved record; only ID-less records get a new ID."""
+        task = Task.from_record(record)
+        if record.get("id") is None:
+            task.id = self._new_id()
+        else:
+            self._next_id = max(self._next_id, task.id + 1)
+        return task
+
+    def _clear_indexes(self):
+        self._tasks_by_id.clear()
+        self._ids_by_day.clear()
+        self._ids_by_status.clear()
+        self._ids_by_priority.clear()
+        self._due_index.clear()
+        self._pending_due.clear()
+        self._search.clear()
+
+    @staticmethod
+    def _move_id(index: dict, task_id: int, old_key, new_key):
+        ids = index.get(old_key)
+        if ids is not None:
+            ids.discard(task_id)
+            if not ids:
+                del index[old_key]
+        index.setdefault(new_key, set()).add(task_id)
+
+    def _add_due(self, task: Task):
+        if task.due_date is None:
+            return
+        self._due_index.add(task.due_date, task.id)
+        if task.status != "done":
+            self._pending_due.add(task.due_date, task.id)
+
+    def _remove_due(self, task: Task):
+        if task.due_date is None:
+            return
+        self._due_index.remove(task.due_date, task.id)
+        self._pending_due.remove(task.due_date, task.id)
 
     # --------------------------------------------------
     # Adding a New Task
@@ -57,25 +244,40 @@ class TaskManager:
         priority: str = "medium",
         due_date: Optional[date] = None,
     ):
-        task = Task(day, description, priority, due_date)
+        self._ensure_day(day)
+        task = Task(day, description, priority, due_date, task_id=self._new_id())
 
         if day not in self.tasks_by_day:
             self.tasks_by_day[day] = []
 
         self.tasks_by_day[day].append(task)
+        self._index_task(task)
+        self._log({"op": "add", **task.to_record()})
         return task
 
     # --------------------------------------------------
     # Marking a Task as Done
     # --------------------------------------------------
     def mark_task_done(self, day: str, task_index: int):
+        self._ensure_day(day)
         try:
             task = self.tasks_by_day[day][task_index]
-            task.mark_done()
-            return task
         except (KeyError, IndexError):
             raise ValueError("Invalid day or task index")
 
+        self._apply_done(task)
+        self._log({"op": "done", "id": task.id})
+        return task
+
+    def _apply_done(self, task: Task):
+        old_status = task.status
+        task.mark_done()
+        if task.status != old_status:
+            task.version += 1
+        self._move_id(self._ids_by_status, task.id, old_status, task.status)
+        if task.due_date is not None:
+            self._pending_due.remove(task.due_date, task.id)
+
     # --------------------------------------------------
     # Editing Existing Tasks
     # --------------------------------------------------
@@ -87,48 +289,409 @@ class TaskManager:
         priority: Optional[str] = None,
         due_date: Optional[date] = None,
     ):
+        self._ensure_day(day)
         try:
             task = self.tasks_by_day[day][task_index]
         except (KeyError, IndexError):
             raise ValueError("Invalid day or task index")
 
-        if description is not None:
+        changes = self._apply_edit(task, description, priority, due_date)
+        if changes:
+            self._log({"op": "edit", "id": task.id, **changes})
+
+        return task
+
+    def _apply_edit(
+        self,
+        task: Task,
+        description: Optional[str] = None,
+        priority: Optional[str] = None,
+        due_date: Optional[date] = None,
+    ) -> dict:
+        """Update the task and its indexes, returning the changed fields."""
+        changes = {}
+
+        if description is not None and description != task.description:
+            self._search.remove(task.id, task.description)
+            self._search.add(task.id, description)
             task.description = description
-        if priority is not None:
-            task.priority = priority
-        if due_date is not None:
+            changes["description"] = description
+        if priority is not None and priority != task.priority:
+            self._move_id(self._ids_by_priority, task.id, task.priority, priority)
+            task.priority = sys.intern(priority)
+            changes["priority"] = priority
+        if due_date is not None and due_date != task.due_date:
+            self._remove_due(task)
             task.due_date = due_date
+            self._add_due(task)
+            changes["due_date"] = due_date.isoformat()
 
+        if changes:
+            task.version += 1
+        return changes
+
+    # --------------------------------------------------
+    # Operations by task ID
+    # --------------------------------------------------
+    def mark_done_by_id(self, task_id: int) -> Task:
+        task = self.get_task(task_id)
+        if task.status != "done":
+            self._apply_done(task)
+            self._log({"op": "done", "id": task.id})
+        return task
+
+    def edit_task_by_id(
+        self,
+        task_id: int,
+        description: Optional[str] = None,
+        priority: Optional[str] = None,
+        due_date: Optional[date] = None,
+    ) -> Task:
+        task = self.get_task(task_id)
+        changes = self._apply_edit(task, description, priority, due_date)
+        if changes:
+            self._log({"op": "edit", "id": task.id, **changes})
+        return task
+
+    def delete_task(self, task_id: int) -> Task:
+        """Remove a task. Other tasks keep their IDs; the ID is not reused."""
+        task = self.get_task(task_id)
+        self._remove_task(task)
+        self._log({"op": "delete", "id": task.id})
         return task
 
+    def _remove_task(self, task: Task):
+        day_tasks = self.tasks_by_day[task.day]
+        del day_tasks[next(i for i, t in enumerate(day_tasks) if t is task)]
+        self._unindex_task(task)
+
+    # --------------------------------------------------
+    # Bulk operations
+    # --------------------------------------------------
+    def bulk_add(self, rows) -> int:
+        """
+        Add many tasks at once from an iterable of dicts with the keys of
+        `add_task` (plus an optional "status"). `due_date` may be a date or
+        an ISO string. The due-date indexes are sorted and the journal
+        flushed once for the whole batch instead of once per task.
+
+        If a row raises (e.g. a malformed import line), the rows before it
+        stay added, indexed and journaled, and the error propagates.
+        """
+        records = []
+        due_pairs = []
+        pending_pairs = []
+        try:
+            for row in rows:
+                day = row["day"]
+                self._ensure_day(day)
+                task = Task(
+                    day,
+                    row["description"],
+                    row.get("priority") or "medium",
+                    _parse_date(row.get("due_date")),
+                    task_id=self._new_id(),
+                )
+                if row.get("status"):
+                    task.status = sys.intern(row["status"].lower())
+
+                self.tasks_by_day.setdefault(day, []).append(task)
+                self._index_task(task, index_due=False)
+                if task.due_date is not None:
+                    due_pairs.append((task.due_date, task.id))
+                    if task.status != "done":
+                        pending_pairs.append((task.due_date, task.id))
+                records.append({"op": "add", **task.to_record()})
+        finally:
+            self._due_index.update(due_pairs)
+            self._pending_due.update(pending_pairs)
+            self._log_many(records)
+        return len(records)
+
+    def bulk_update(self, updates) -> int:
+        """
+        Apply many changes from an iterable of dicts holding an "id" and any
+        of "description", "priority", "due_date" or "status": "done".
+        """
+        records = []
+        for update in updates:
+            task = self.get_task(int(update["id"]))
+            changes = self._apply_edit(
+                task,
+                description=update.get("description"),
+                priority=update.get("priority"),
+                due_date=_parse_date(update.get("due_date")),
+            )
+            if changes:
+                records.append({"op": "edit", "id": task.id, **changes})
+            if update.get("status") == "done" and task.status != "done":
+                self._apply_done(task)
+                records.append({"op": "done", "id": task.id})
+
+        self._log_many(records)
+        return len(records)
+
+    def import_tasks(self, filename: str) -> int:
+        """Stream a .csv or .jsonl file into `bulk_add`."""
+        return self.bulk_add(iter_records(filename))
+
+    def export_tasks(self, filename: str) -> int:
+        """Stream every task to a .csv or .jsonl file."""
+        return write_records(filename, (task.to_record() for task in self._all_tasks()))
+
+    # --------------------------------------------------
+    # Indexed lookups and queries
+    # --------------------------------------------------
+    def get_task(self, task_id: int) -> Task:
+        if task_id not in self._tasks_by_id and self._storage is not None:
+            day = self._storage.find_day(task_id)
+            if day is not None:
+                self._ensure_day(day)
+        try:
+            return self._tasks_by_id[task_id]
+        except KeyError:
+            raise ValueError(f"No task with ID {task_id}")
+
+    def query(
+        self,
+        day: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+    ) -> list:
+        """
+        Return the tasks matching every given filter, ordered by ID.
+
+        Each filter is answered from its index and the resulting id sets
+        are intersected smallest first, so no day list is walked.
+        `due_from` and `due_to` are inclusive; setting either one only
+        matches tasks that have a due date. With a storage attached, only
+        the days holding a match are loaded.
+        """
+        if day is not None:
+            self._ensure_day(day)
+        else:
+            self._ensure_days_matching(
+                status=status.lower() if status is not None else None,
+                priority=priority,
+                due_from=due_from,
+                due_to=due_to,
+            )
+
+        candidates = []
+
+        if day is not None:
+            candidates.append(self._ids_by_day.get(day, set()))
+        if status is not None:
+            candidates.append(self._ids_by_status.get(status.lower(), set()))
+        if priority is not None:
+            candidates.append(self._ids_by_priority.get(priority, set()))
+        if due_from is not None or due_to is not None:
+            candidates.append(
+                {task_id for _, task_id in self._due_index.irange(due_from, due_to)}
+            )
+
+        if not candidates:
+            return [self._tasks_by_id[i] for i in sorted(self._tasks_by_id)]
+
+        candidates.sort(key=len)
+        ids = set(candidates[0])
+        for other in candidates[1:]:
+            if not ids:
+                break
+            ids &= other
+
+        return [self._tasks_by_id[i] for i in sorted(ids)]
+
+    def search(self, query: str, limit: Optional[int] = None) -> list:
+        """
+        Tasks whose description contains every word of `query` (each word
+        also matches as a prefix), most relevant first.
+        """
+        words = tokenize(query)
+        if words:
+            self._ensure_days_matching(words=words)
+        return [self._tasks_by_id[task_id] for task_id in self._search.search(query, limit)]
+
+    # --------------------------------------------------
+    # Due-date scheduling
+    # --------------------------------------------------
+    def next_due(self, n: int = 1, as_of: Optional[date] = None) -> list:
+        """The `n` pending tasks due soonest (on or after `as_of`, if given)."""
+        self._ensure_days_matching(exclude_status="done", due_from=as_of, soonest=n)
+        tasks = []
+        for _, task_id in self._pending_due.irange(as_of):
+            if len(tasks) == n:
+                break
+            tasks.append(self._tasks_by_id[task_id])
+        return tasks
+
+    def overdue(self, as_of: Optional[date] = None) -> list:
+        """Pending tasks due strictly before `as_of` (default: today)."""
+        as_of = as_of or date.today()
+        self._ensure_days_matching(exclude_status="done", due_before=as_of)
+        return [
+            self._tasks_by_id[task_id]
+            for _, task_id in self._pending_due.irange(end=as_of, inclusive_end=False)
+        ]
+
+    def due_between(self, start: date, end: date) -> list:
+        """Tasks of any status due from `start` to `end` inclusive, by due date."""
+        self._ensure_days_matching(due_from=start, due_to=end)
+        return [self._tasks_by_id[task_id] for _, task_id in self._due_index.irange(start, end)]
+
     # --------------------------------------------------
     # Viewing Tasks
     # --------------------------------------------------
     def view_tasks(self, day: Optional[str] = None):
+        return self._day_lists(day)
+
+    def _day_lists(self, day: Optional[str] = None) -> dict:
         if day:
+            self._ensure_day(day)
             tasks = self.tasks_by_day.get(day, [])
             return {day: tasks}
+        self._ensure_all_days()
         return self.tasks_by_day
 
-    def display_tasks(self, day: Optional[str] = None):
+    def _all_tasks(self):
+        self._ensure_all_days()
+        for tasks in self.tasks_by_day.values():
+            yield from tasks
+
+    def iter_tasks(
+        self,
+        day: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ):
+        """
+        Lazily yield (day, task_index, task) for the tasks of `day` (or of
+        every day), skipping the first `offset` and stopping after
+        `limit`. Whole days before the offset are skipped by their length,
+        so reaching any page costs O(number of days), not O(tasks).
+
+        With a storage attached, days not loaded yet are neither loaded
+        nor counted in memory: their lengths come from one COUNT query and
+        the rows of the page from a LIMIT/OFFSET query, as detached Task
+        objects meant for display.
+        """
+        for day_name, count in self._day_counts(day).items():
+            if limit is not None and limit <= 0:
+                return
+            if offset >= count:
+                offset -= count
+                continue
+
+            stop = count if limit is None else min(count, offset + limit)
+            yield from self._day_slice(day_name, offset, stop)
+
+            if limit is not None:
+                limit -= stop - offset
+            offset = 0
+
+    def _day_slice(self, day: str, start: int, stop: int):
+        if self._storage is None or day in self._loaded_days:
+            tasks = self.tasks_by_day.get(day, [])
+            for i in range(start, stop):
+                yield day, i, tasks[i]
+            return
+        records = self._storage.load_day(day, offset=start, limit=stop - start)
+        for i, record in enumerate(records, start=start):
+            yield day, i, Task.from_record(record)
+
+    def _day_counts(self, day: Optional[str] = None) -> dict:
+        """Number of tasks of `day` (or of every day, in DAYS order), without loading any day."""
+        if self._storage is None:
+            return {day_name: len(tasks) for day_name, tasks in self._day_lists(day).items()}
+
+        counts = {
+            day_name: count
+            for day_name, count in self._storage.count_by_day().items()
+            if day_name not in self._loaded_days
+        }
+        for day_name in self._loaded_days:
+            counts[day_name] = len(self.tasks_by_day.get(day_name, []))
+        if day is not None:
+            return {day: counts.get(day, 0)}
+
+        order = {day_name: i for i, day_name in enumerate(DAYS)}
+        return {
+            day_name: counts[day_name]
+            for day_name in sorted(counts, key=lambda d: (order.get(d, len(DAYS)), d))
+        }
+
+    def count_tasks(self, day: Optional[str] = None) -> int:
+        return sum(self._day_counts(day).values())
+
+    def format_page(
+        self,
+        day: Optional[str] = None,
+        page: int = 1,
+        limit: int = 20,
+        line_format: str = "{i}: {task.description} - {status} (ID {task.id})",
+    ) -> str:
+        """Render one page of tasks, grouped under day headers, as one string."""
+        total = self.count_tasks(day)
+        if total == 0:
+            return "No tasks found.\n"
+
+        pages = (total + limit - 1) // limit
+        lines = []
+        current_day = None
+        for day_name, i, task in self.iter_tasks(day, (page - 1) * limit, limit):
+            if day_name != current_day:
+                lines.append(f"\n{day_name}:")
+                current_day = day_name
+            lines.append(line_format.format(i=i, task=task, status=task.status.capitalize()))
+        lines.append(f"\nPage {page} of {pages} ({total} tasks)")
+        return "\n".join(lines) + "\n"
+
+    def display_tasks(self, day: Optional[str] = None, page: int = 1, limit: Optional[int] = None):
+        if limit is not None:
+            sys.stdout.write(self.format_page(day, page, limit, line_format="  {i}. {task}"))
+            return
+
         tasks_to_show = self.view_tasks(day)
 
         if not tasks_to_show:
             print("No tasks found.")
             return
 
+        # build the whole listing and write it once instead of one print per task
+        lines = []
         for day_name, tasks in tasks_to_show.items():
-            print(f"\n{day_name}:")
+            lines.append(f"\n{day_name}:")
             if not tasks:
-                print("  No tasks.")
+                lines.append("  No tasks.")
             for i, task in enumerate(tasks):
-                print(f"  {i}. {task}")
+                lines.append(f"  {i}. {task}")
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    def display_search(self, query: str, limit: int = 20):
+        results = self.search(query, limit)
+        if not results:
+            print("No matching tasks.")
+        for task in results:
+            print(f"  {task.day}: {task}")
+
+    def display_due(self, n: int = 5):
+        overdue = self.overdue()
+        print(f"\nOverdue ({len(overdue)}):")
+        for task in overdue:
+            print(f"  {task}")
+
+        print("\nNext due:")
+        for task in self.next_due(n, as_of=date.today()):
+            print(f"  {task}")
 
     # --------------------------------------------------
     # Save tasks to a JSON file
     # --------------------------------------------------
     def save_to_file(self, filename: str):
-        data = {}
+        self._ensure_all_days()
+        data = {"next_id": self._next_id}
 
         for day in DAYS:
             tasks = self.tasks_by_day.get(day, [])
@@ -137,11 +700,28 @@ class TaskManager:
             for task in tasks:
                 data[day].append({
                     "task": task.description,
-                    "status": task.status.capitalize()
+                    "status": task.status.capitalize(),
+                    "priority": task.priority,
+                    "due_date": task.due_date.isoformat() if task.due_date else None,
+                    "id": task.id,
+                    "version": task.version,
                 })
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        # write then rename, so a concurrent reader never sees half a file
+        content = json.dumps(data, indent=4).encode("utf-8")
+        tmp_name = filename + ".tmp"
+        with open(tmp_name, "wb") as f:
+            f.write(content)
+        os.replace(tmp_name, filename)
+
+        # the search index is saved next to the file so load can skip
+        # rebuilding it; the content hash tells whether it still matches
+        saved_ids = {task.id for day in DAYS for task in self.tasks_by_day.get(day, [])}
+        self._search.save(
+            _search_index_filename(filename),
+            {"tasks_sha256": hashlib.sha256(content).hexdigest(), "count": len(saved_ids)},
+            saved_ids,
+        )
 
         #print(f"Tasks saved to {filename}")
 
@@ -149,37 +729,519 @@ class TaskManager:
     # Load tasks from JSON (expects all days + General)
     # --------------------------------------------------
     def load_from_file(self, filename: str):
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(filename, "rb") as f:
+            content = f.read()
+        next_id, records = _parse_task_data(json.loads(content))
 
+        self.close_storage()  # the file replaces whatever the database held
         self.tasks_by_day.clear()
+        self._clear_indexes()
+        self._next_id = next_id
 
         for day in DAYS:
             self.tasks_by_day[day] = []
 
-            for task_data in data.get(day, []):
-                task = Task(
-                    day=day,
-                    description=task_data["task"]
-                )
-                task.status = task_data["status"].lower()
-                self.tasks_by_day[day].append(task)
+        loaded = []
+        for record in records:
+            task = self._restore_task(record)
+            self.tasks_by_day[task.day].append(task)
+            self._index_task(task, index_text=False)
+            loaded.append(task)
+
+        meta = {"tasks_sha256": hashlib.sha256(content).hexdigest(), "count": len(loaded)}
+        if not self._search.load(_search_index_filename(filename), meta):
+            for task in loaded:
+                self._search.add(task.id, task.description)
+
+        # an open journal must describe the newly loaded state
+        self.compact_journal()
 
         #print(f"Tasks loaded from {filename}")
 
+    # --------------------------------------------------
+    # Append-only journal (one record per change)
+    # --------------------------------------------------
+    def open_journal(self, filename: str, compact_every: int = 10_000):
+        """
+        Load the tasks recorded in `filename` if it exists (otherwise start
+        it with the current tasks) and log every following
+        add/edit/done/delete to it.
+        """
+        self.close_journal()
+        exists = os.path.exists(filename)
+        if exists:
+            self.load_from_journal(filename)
+        self._journal = TaskJournal(filename, compact_every)
+        if not exists:
+            self.compact_journal()
+
+    def close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def compact_journal(self):
+        """Rewrite the journal as the next ID plus one "add" record per task."""
+        if self._journal is not None:
+            records = itertools.chain(
+                [{"op": "next_id", "next_id": self._next_id}],
+                ({"op": "add", **task.to_record()} for task in self._all_tasks()),
+            )
+            self._journal.rewrite(records)
+
+    def load_from_journal(self, filename: str):
+        """Rebuild state by replaying a journal record by record."""
+        self.close_storage()
+        self.tasks_by_day.clear()
+        self._clear_indexes()
+        self._next_id = 0
+
+        for record in iter_journal(filename):
+            op = record["op"]
+            if op == "add":
+                task = self._restore_task(record)
+                self.tasks_by_day.setdefault(task.day, []).append(task)
+                self._index_task(task)
+                continue
+            if op == "next_id":
+                self._next_id = max(self._next_id, record["next_id"])
+                continue
+
+            task = self._tasks_by_id.get(record["id"])
+            if task is None:
+                continue
+            if op == "done":
+                self._apply_done(task)
+            elif op == "delete":
+                self._remove_task(task)
+            elif op == "edit":
+                self._apply_edit(
+                    task,
+                    description=record.get("description"),
+                    priority=record.get("priority"),
+                    due_date=_parse_date(record.get("due_date")),
+                )
+
+    def _log(self, record: dict):
+        if self._storage is not None:
+            self._dirty_ids.add(record["id"])
+        if self._journal is None:
+            return
+        self._journal.append(record)
+        if self._journal.needs_compaction(len(self._tasks_by_id)):
+            self.compact_journal()
+
+    def _log_many(self, records: list):
+        if self._storage is not None:
+            self._dirty_ids.update(record["id"] for record in records)
+        if self._journal is None or not records:
+            return
+        self._journal.append_many(records)
+        if self._journal.needs_compaction(len(self._tasks_by_id)):
+            self.compact_journal()
+
+    # --------------------------------------------------
+    # Pluggable storage engine (lazy, per-day loading)
+    # --------------------------------------------------
+    def open_storage(self, storage: StorageEngine):
+        """
+        Attach a storage engine. Nothing is read up front: a day's tasks
+        are loaded the first time that day is used, so startup does not
+        depend on how many tasks are stored.
+        """
+        self.close_storage()
+        self.tasks_by_day.clear()
+        self._clear_indexes()
 
-def main():
-    manager = TaskManager()
+        self._storage = storage
+        self._next_id = storage.next_task_id()
+
+    def has_storage(self) -> bool:
+        return self._storage is not None
+
+    def close_storage(self):
+        if self._storage is not None:
+            self._storage.close()
+            self._storage = None
+        self._loaded_days.clear()
+        self._dirty_ids.clear()
+
+    def save_to_storage(self):
+        """Write every task changed or deleted since the last save in one batch."""
+        if self._storage is None:
+            raise ValueError("No storage is open")
+        changed = sorted(self._dirty_ids)
+        self._storage.write_tasks(
+            (self._tasks_by_id[i].to_record() for i in changed if i in self._tasks_by_id),
+            deleted_ids=[i for i in changed if i not in self._tasks_by_id],
+            next_id=self._next_id,
+        )
+        self._dirty_ids.clear()
+
+    def _ensure_day(self, day: str):
+        if self._storage is None or day in self._loaded_days:
+            return
+        self._loaded_days.add(day)
+
+        tasks = self.tasks_by_day.setdefault(day, [])
+        for record in self._storage.load_day(day):
+            task = self._restore_task(record)
+            tasks.append(task)
+            self._index_task(task)
+
+    def _ensure_all_days(self):
+        if self._storage is not None:
+            for day in self._storage.days():
+                self._ensure_day(day)
+
+    def _ensure_days_matching(self, **filters):
+        """
+        Load the stored days holding a task that matches `filters` (see
+        `StorageEngine.find_days`). Days already loaded are answered from
+        memory, which may hold changes not saved yet.
+        """
+        if self._storage is not None:
+            for day in self._storage.find_days(skip_days=sorted(self._loaded_days), **filters):
+                self._ensure_day(day)
+
+
+def _synchronized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ConcurrentTaskManager(TaskManager):
+    """
+    TaskManager that can be shared between threads, and whose JSON file
+    can be shared between processes.
+
+    Every public method runs under one re-entrant lock: each operation
+    only touches a few index entries, so holding it is short. Saving
+    takes an advisory lock on "<file>.lock", merges in the changes other
+    processes saved since this one last loaded or saved, then writes the
+    file atomically. Per-task version stamps decide which side changed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._base_versions = {}  # id -> version when last loaded/saved
+        # ids given to the ID-less records of a pre-ID file when it was
+        # loaded, by record content, so a merge can recognize them on disk
+        self._legacy_ids = {}
+
+    add_task = _synchronized(TaskManager.add_task)
+    mark_task_done = _synchronized(TaskManager.mark_task_done)
+    edit_task = _synchronized(TaskManager.edit_task)
+    mark_done_by_id = _synchronized(TaskManager.mark_done_by_id)
+    edit_task_by_id = _synchronized(TaskManager.edit_task_by_id)
+    delete_task = _synchronized(TaskManager.delete_task)
+    bulk_add = _synchronized(TaskManager.bulk_add)
+    bulk_update = _synchronized(TaskManager.bulk_update)
+    get_task = _synchronized(TaskManager.get_task)
+    query = _synchronized(TaskManager.query)
+    search = _synchronized(TaskManager.search)
+    next_due = _synchronized(TaskManager.next_due)
+    overdue = _synchronized(TaskManager.overdue)
+    due_between = _synchronized(TaskManager.due_between)
+    export_tasks = _synchronized(TaskManager.export_tasks)
+    save_to_storage = _synchronized(TaskManager.save_to_storage)
+
+    def view_tasks(self, day: Optional[str] = None):
+        # copies, so callers can iterate while other threads keep writing
+        with self._lock:
+            return {
+                day_name: list(tasks)
+                for day_name, tasks in super().view_tasks(day).items()
+            }
+
+    def iter_tasks(self, day: Optional[str] = None, offset: int = 0, limit: Optional[int] = None):
+        # a generator must not hold the lock between rows: collect the page
+        with self._lock:
+            return iter(list(super().iter_tasks(day, offset, limit)))
+
+    def count_tasks(self, day: Optional[str] = None) -> int:
+        with self._lock:
+            return super().count_tasks(day)
+
+    @staticmethod
+    def _legacy_key(record: dict) -> tuple:
+        return (record["day"], record["description"], record["status"], record["priority"], record["due_date"])
+
+    def _restore_task(self, record: dict) -> Task:
+        task = super()._restore_task(record)
+        if record.get("id") is None:
+            self._legacy_ids.setdefault(self._legacy_key(record), []).append(task.id)
+        return task
+
+    def load_from_file(self, filename: str):
+        with self._lock:
+            self._legacy_ids = {}
+            super().load_from_file(filename)
+            self._base_versions = {
+                task_id: task.version for task_id, task in self._tasks_by_id.items()
+            }
+
+    def save_to_file(self, filename: str):
+        with self._lock, FileLock(filename + ".lock"):
+            if os.path.exists(filename):
+                self._merge_file(*_read_task_file(filename))
+            super().save_to_file(filename)
+            self._base_versions = {
+                task_id: task.version for task_id, task in self._tasks_by_id.items()
+            }
+            self._legacy_ids = {}  # the file has IDs now
 
+    def _merge_file(self, next_id: int, records: list):
+        """
+        Fold the tasks saved by other writers into memory:
+
+        - a task unknown here is adopted;
+        - a task only changed on disk takes the disk values;
+        - a task changed on both sides keeps the higher version (this
+          side on a tie), and stays done if either side marked it done;
+        - a task deleted on one side is deleted, unless this side changed
+          it since;
+        - a task added here whose id was meanwhile taken by another
+          writer gets a fresh id.
+
+        ID-less records (a file saved before tasks had IDs) are matched,
+        by content, to the tasks this side loaded from them; the others
+        were added by another writer and are adopted with fresh ids.
+        """
+        legacy_ids = {key: list(ids) for key, ids in self._legacy_ids.items()}
+        saved = []
+        unknown = []
+        for record in records:
+            if record["id"] is None:
+                ids = legacy_ids.get(self._legacy_key(record))
+                if not ids:
+                    unknown.append(record)
+                    continue
+                record = dict(record, id=ids.pop(0))
+            saved.append(record)
+        self._next_id = max(
+            [self._next_id, next_id] + [record["id"] + 1 for record in saved]
+        )
+        saved.extend(dict(record, id=self._new_id()) for record in unknown)
+
+        disk_ids = set()
+        for record in saved:
+            task_id = record["id"]
+            disk_ids.add(task_id)
+            local = self._tasks_by_id.get(task_id)
+            base = self._base_versions.get(task_id)
+
+            if local is not None and base is None:
+                # both sides created a task with this id: move ours away
+                self._unindex_task(local)
+                local.id = self._new_id()
+                self._index_task(local)
+                local = None
+
+            if local is None:
+                if base is not None:
+                    continue  # deleted here since the last load/save
+                task = self._restore_task(record)
+                self.tasks_by_day.setdefault(task.day, []).append(task)
+                self._index_task(task)
+                continue
+
+            disk_changed = record["version"] > base
+            local_changed = local.version > base
+            if not disk_changed:
+                continue
+
+            if not local_changed or record["version"] > local.version:
+                self._apply_edit(
+                    local,
+                    description=record["description"],
+                    priority=record["priority"],
+                    due_date=_parse_date(record["due_date"]),
+                )
+                local.version = record["version"]
+            if record["status"] == "done":
+                version = local.version
+                self._apply_done(local)
+                local.version = version
+
+        for task_id, base in self._base_versions.items():
+            local = self._tasks_by_id.get(task_id)
+            if task_id not in disk_ids and local is not None and local.version == base:
+                self._remove_task(local)  # deleted by another writer
+
+
+# --------------------------------------------------
+# Non-interactive batch mode
+# --------------------------------------------------
+def run_batch_command(manager: TaskManager, args: list):
+    """
+    Run one batch command. Arguments follow the interactive prompts:
+
+        add <day> <description> [priority] [due_date]
+        done <id> | done <day> <task_index>
+        edit <id> [description] [priority] [due_date]
+        edit <day> <task_index> [description] [priority] [due_date]
+        delete <id>
+        view [day] [--page N] [--limit N]
+        due [n]
+        search <query>
+        save [filename] | load [filename]
+        journal [filename] | db [filename]
+        import <file.csv|file.jsonl> | export <file.csv|file.jsonl>
+
+    Quote arguments containing spaces; pass "" to leave an edit field as is.
+    """
+    command, args = args[0].lower(), args[1:]
+
+    def arg(i, default=None):
+        return args[i] if len(args) > i and args[i] != "" else default
+
+    if command == "add":
+        manager.add_task(args[0], args[1], arg(2, "medium"), _parse_date(arg(3)))
+    elif command == "done" and len(args) == 1:
+        manager.mark_done_by_id(int(args[0]))
+    elif command == "done":
+        manager.mark_task_done(args[0], int(args[1]))
+    elif command == "edit" and args[0].isdigit():
+        manager.edit_task_by_id(
+            int(args[0]),
+            description=arg(1),
+            priority=arg(2),
+            due_date=_parse_date(arg(3)),
+        )
+    elif command == "edit":
+        manager.edit_task(
+            args[0],
+            int(args[1]),
+            description=arg(2),
+            priority=arg(3),
+            due_date=_parse_date(arg(4)),
+        )
+    elif command == "delete":
+        manager.delete_task(int(args[0]))
+    elif command == "view":
+        day, page, limit = _parse_view_args(args)
+        manager.display_tasks(day, page, limit)
+    elif command == "due":
+        manager.display_due(int(arg(0, 5)))
+    elif command == "search":
+        manager.display_search(" ".join(args))
+    elif command == "save" and manager.has_storage():
+        manager.save_to_storage()
+    elif command == "save":
+        manager.save_to_file(arg(0, "tasks.json"))
+    elif command == "load":
+        manager.load_from_file(arg(0, "tasks.json"))
+    elif command == "journal":
+        manager.open_journal(arg(0, "tasks.jsonl"))
+    elif command == "db":
+        manager.open_storage(SQLiteStorage(arg(0, "tasks.db")))
+    elif command == "import":
+        manager.import_tasks(args[0])
+    elif command == "export":
+        manager.export_tasks(args[0])
+    else:
+        raise ValueError(f"Unknown command '{command}'")
+
+
+def _parse_view_args(args: list):
+    """[day] [--page N] [--limit N] -> (day, page, limit); --page alone pages by 20."""
+    day, page, limit = None, None, None
+    args = iter(args)
+    for arg in args:
+        if arg == "--page":
+            page = int(next(args, ""))
+        elif arg == "--limit":
+            limit = int(next(args, ""))
+        else:
+            day = arg
+    if page is not None and limit is None:
+        limit = 20
+    if (page is not None and page < 1) or (limit is not None and limit < 1):
+        raise ValueError("--page and --limit must be positive")
+    return day, page or 1, limit
+
+
+def run_batch(manager: TaskManager, lines) -> int:
+    """
+    Run commands from an iterable of lines (a file or stdin), one per line.
+    Blank lines and lines starting with '#' are skipped; a failing command
+    is reported on stderr and does not stop the batch. Prints the
+    throughput on stderr and returns the number of commands run.
+    """
+    count = 0
+    start = time.perf_counter()
+
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            run_batch_command(manager, shlex.split(line))
+        except (ValueError, IndexError, OSError) as e:
+            print(f"Error on line {line_no}: {e}", file=sys.stderr)
+        count += 1
+
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"Ran {count} commands in {elapsed:.3f}s ({rate:,.0f} ops/sec)", file=sys.stderr)
+    return count
+
+
+def run_interactive(manager: TaskManager):
     while True:
-        command = input(
-            "Enter command (add/edit/done/view/save/load/quit): "
-        ).strip().lower()
+        # "done", "edit" and "delete" also accept a task ID ("done 12"),
+        # "view" accepts "[day] [--page N] [--limit N]"
+        command, _, argument = input(
+            "Enter command (add/edit/done/delete/view/save/load/due/search/journal/db/import/export/quit): "
+        ).strip().partition(" ")
+        command = command.lower()
+        argument = argument.strip()
 
         if command == "quit":
             #print("Goodbye!")
+            manager.close_journal()
+            manager.close_storage()
             break
 
+        elif command == "db":
+            filename = input("Enter database filename (default: tasks.db): ").strip()
+            if filename == "":
+                filename = "tasks.db"
+            manager.open_storage(SQLiteStorage(filename))
+
+        elif command == "due":
+            manager.display_due()
+
+        elif command == "search":
+            manager.display_search(input("Enter search query: ").strip())
+
+        elif command in ("import", "export"):
+            filename = input("Enter filename (.csv or .jsonl): ").strip()
+            try:
+                start = time.perf_counter()
+                if command == "import":
+                    count = manager.import_tasks(filename)
+                else:
+                    count = manager.export_tasks(filename)
+                elapsed = time.perf_counter() - start
+                print(f"{command.capitalize()}ed {count} tasks in {elapsed:.3f}s.")
+            except (ValueError, OSError) as e:
+                print(f"Error: {e}")
+
+        elif command == "journal":
+            filename = input("Enter journal filename (default: tasks.jsonl): ").strip()
+            if filename == "":
+                filename = "tasks.jsonl"
+            manager.open_journal(filename)
+
+        elif command == "save" and manager.has_storage():
+            manager.save_to_storage()
+
         elif command == "save":
             filename = input("Enter filename (default: tasks.json): ").strip()
             if filename == "":
@@ -199,6 +1261,20 @@ def main():
             manager.add_task(day, description)
             #print("Task added.")
 
+        elif command == "delete" or (command in ("done", "edit") and argument):
+            try:
+                task_id = int(argument or input("Enter task ID: ").strip())
+                if command == "delete":
+                    manager.delete_task(task_id)
+                elif command == "done":
+                    manager.mark_done_by_id(task_id)
+                else:
+                    manager.get_task(task_id)
+                    new_description = input("Enter new description: ").strip()
+                    manager.edit_task_by_id(task_id, description=new_description or None)
+            except ValueError as e:
+                print(f"Error: {e}")
+
         elif command == "done":
             day = input("Enter day: ").strip()
 
@@ -230,6 +1306,14 @@ def main():
             )
             #print("Task updated.")
 
+        elif command == "view" and argument:
+            try:
+                day, page, limit = _parse_view_args(shlex.split(argument))
+            except ValueError as e:
+                print(f"Error: {e}")
+                continue
+            sys.stdout.write(manager.format_page(day, page, limit or 20))
+
         elif command == "view":
             day = input("Enter day (or leave blank to view all): ").strip()
 
@@ -239,18 +1323,66 @@ def main():
                 print("No tasks found.")
                 continue
 
+            # one write for the whole listing instead of one print per task
+            lines = []
             for day_name, tasks in tasks_by_day.items():
-                print(f"\n{day_name}:")
+                lines.append(f"\n{day_name}:")
                 #if not tasks:
-                    #print("  No tasks.")
+                    #lines.append("  No tasks.")
                 for i, task in enumerate(tasks):
                     status = task.status.capitalize()
-                    print(f"{i}: {task.description} - {status}")
+                    lines.append(f"{i}: {task.description} - {status} (ID {task.id})")
+            sys.stdout.write("\n".join(lines) + "\n")
 
         else:
             print("Unknown command. Please try again.")
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI Tasks Manager")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="run commands from FILE ('-' for stdin) instead of prompting",
+    )
+    parser.add_argument(
+        "--concurrent",
+        action="store_true",
+        help="merge with changes other processes saved to the same file instead of overwriting them",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="profile the session with cProfile, save the stats to FILE and print the top entries",
+    )
+    args = parser.parse_args(argv)
+
+    manager = ConcurrentTaskManager() if args.concurrent else TaskManager()
+
+    profiler = None
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.batch is None:
+            run_interactive(manager)
+        elif args.batch == "-":
+            run_batch(manager, sys.stdin)
+        else:
+            with open(args.batch, "r", encoding="utf-8") as f:
+                run_batch(manager, f)
+    finally:
+        manager.close_journal()
+        manager.close_storage()
+
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(15)
+
+
 if __name__ == "__main__":
     # Write your solution here
     main()
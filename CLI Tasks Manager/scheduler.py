@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+class DueDateIndex:
+    """
+    Sorted collection of (due_date, task_id) pairs.
+
+    Pairs are kept in sorted buckets of a few hundred items, with a list of
+    each bucket's last item on top. Finding a position is two binary
+    searches and inserting or deleting only shifts one small bucket, so
+    add/remove stay cheap at millions of entries (a single flat list would
+    memmove half of itself on every insert). Range scans cost
+    O(log N + k).
+    """
+
+    LOAD = 512  # target bucket size; buckets are split at twice this
+
+    def __init__(self, pairs: Iterable[Tuple[date, int]] = ()):
+        self._buckets = []
+        self._maxes = []
+        self._len = 0
+        self.update(pairs)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Tuple[date, int]]:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def clear(self):
+        self._buckets.clear()
+        self._maxes.clear()
+        self._len = 0
+
+    def add(self, due_date: date, task_id: int):
+        item = (due_date, task_id)
+        if not self._buckets:
+            self._buckets.append([item])
+            self._maxes.append(item)
+            self._len = 1
+            return
+
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            i -= 1
+            self._buckets[i].append(item)
+            self._maxes[i] = item
+        else:
+            insort(self._buckets[i], item)
+        self._len += 1
+
+        bucket = self._buckets[i]
+        if len(bucket) > 2 * self.LOAD:
+            tail = bucket[self.LOAD:]
+            del bucket[self.LOAD:]
+            self._maxes[i] = bucket[-1]
+            self._buckets.insert(i + 1, tail)
+            self._maxes.insert(i + 1, tail[-1])
+
+    def remove(self, due_date: date, task_id: int) -> bool:
+        item = (due_date, task_id)
+        i = bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return False
+
+        bucket = self._buckets[i]
+        pos = bisect_left(bucket, item)
+        if pos == len(bucket) or bucket[pos] != item:
+            return False
+
+        del bucket[pos]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+        return True
+
+    def update(self, pairs: Iterable[Tuple[date, int]]):
+        """Add many pairs with one sort instead of one insert per pair."""
+        new = list(pairs)
+        if not new:
+            return
+        items = list(self)
+        items.extend(new)
+        items.sort()
+
+        self._buckets = [items[i:i + self.LOAD] for i in range(0, len(items), self.LOAD)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(items)
+
+    def irange(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        inclusive_end: bool = True,
+    ) -> Iterator[Tuple[date, int]]:
+        """Yield the pairs with start <= due_date <= end (or < end), in order."""
+        if not self._buckets:
+            return
+
+        if start is None:
+            i, pos = 0, 0
+        else:
+            i = bisect_left(self._maxes, (start,))
+            if i == len(self._maxes):
+                return
+            pos = bisect_left(self._buckets[i], (start,))
+
+        for j in range(i, len(self._buckets)):
+            bucket = self._buckets[j]
+            if end is not None:
+                bound = (
+                    bisect_right(bucket, (end, float("inf")), pos)
+                    if inclusive_end
+                    else bisect_left(bucket, (end,), pos)
+                )
+                yield from bucket[pos:bound]
+                if bound < len(bucket):
+                    return
+            else:
+                yield from bucket[pos:]
+            pos = 0
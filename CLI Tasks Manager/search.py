@@ -0,0 +1,145 @@
+import json
+import math
+import re
+from bisect import bisect_left
+from typing import Optional
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Maps each token to the task ids containing it (with term counts).
+
+    Kept up to date incrementally with `add`/`remove`, so a search only
+    touches the postings of the queried tokens. Every query token also
+    matches as a prefix ("groc" finds "groceries"), looked up by binary
+    search in the sorted vocabulary.
+    """
+
+    def __init__(self):
+        self._postings = {}  # token -> {task_id: count}
+        self._doc_count = 0
+        self._terms = []     # sorted vocabulary, rebuilt lazily
+        self._terms_dirty = False
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_count = 0
+        self._terms = []
+        self._terms_dirty = False
+
+    def add(self, task_id: int, text: str):
+        for token in tokenize(text):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._terms_dirty = True
+            postings[task_id] = postings.get(task_id, 0) + 1
+        self._doc_count += 1
+
+    def remove(self, task_id: int, text: str):
+        """Undo `add(task_id, text)`; `text` must be what was indexed."""
+        for token in set(tokenize(text)):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(task_id, None)
+            if not postings:
+                del self._postings[token]
+                self._terms_dirty = True
+        self._doc_count -= 1
+
+    def _expand(self, prefix: str) -> list:
+        if self._terms_dirty:
+            self._terms = sorted(self._postings)
+            self._terms_dirty = False
+        start = bisect_left(self._terms, prefix)
+        end = bisect_left(self._terms, prefix + "\uffff", start)
+        return self._terms[start:end]
+
+    def search(self, query: str, limit: Optional[int] = None) -> list:
+        """
+        Return ids of the tasks matching every query token, best first.
+
+        A task scores tf * idf for each matching term, with exact token
+        matches weighted twice as much as prefix-only matches.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                weight = math.log(1 + self._doc_count / len(postings))
+                if term == token:
+                    weight *= 2
+                for task_id, count in postings.items():
+                    token_scores[task_id] = token_scores.get(task_id, 0.0) + count * weight
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    task_id: score + token_scores[task_id]
+                    for task_id, score in scores.items()
+                    if task_id in token_scores
+                }
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda task_id: (-scores[task_id], task_id))
+        return ranked[:limit] if limit is not None else ranked
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def save(self, filename: str, meta: dict, keep: set):
+        """
+        Write the postings of the task ids in `keep`. `meta` is stored
+        as-is so the loader can check the index still matches its task
+        file.
+        """
+        postings = {}
+        for token, docs in self._postings.items():
+            saved = [[task_id, count] for task_id, count in docs.items() if task_id in keep]
+            if saved:
+                postings[token] = saved
+
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(
+                {"meta": meta, "doc_count": len(keep), "postings": postings},
+                f,
+                separators=(",", ":"),
+            )
+
+    def load(self, filename: str, meta: dict) -> bool:
+        """
+        Replace the index with the saved one if its `meta` equals `meta`.
+        Returns False (leaving the index untouched) when the file is
+        missing or stale.
+        """
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("meta") != meta:
+            return False
+
+        self.clear()
+        for token, docs in data["postings"].items():
+            self._postings[token] = {task_id: count for task_id, count in docs}
+        self._doc_count = data["doc_count"]
+        self._terms_dirty = True
+        return True
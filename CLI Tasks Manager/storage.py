@@ -0,0 +1,393 @@
+import csv
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Exclusive advisory lock shared by every process using the same
+    `path` (flock on POSIX, msvcrt.locking on Windows). Blocks until the
+    lock is free. Use as a context manager.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK retries for about 10 seconds before raising
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+
+class TaskJournal:
+    """
+    Append-only JSON Lines log of task changes.
+
+    Every add/edit/done writes one small record, so persisting a change
+    costs O(1) regardless of how many tasks exist. The log is rewritten
+    as a snapshot (compacted) once it has grown past `compact_every`
+    records and past the number of live tasks, which keeps the amortized
+    cost per change constant.
+    """
+
+    def __init__(self, filename: str, compact_every: int = 10_000):
+        self.filename = filename
+        self.compact_every = compact_every
+        self.records_since_compaction = 0
+        self._file = open(filename, "a", encoding="utf-8")
+
+    def append(self, record: dict):
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.records_since_compaction += 1
+
+    def append_many(self, records: Iterable[dict]):
+        """Append a batch of records with a single flush."""
+        count = 0
+        for record in records:
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+        self._file.flush()
+        self.records_since_compaction += count
+
+    def needs_compaction(self, live_tasks: int) -> bool:
+        threshold = max(self.compact_every, live_tasks)
+        return self.records_since_compaction >= threshold
+
+    def rewrite(self, records: Iterable[dict]):
+        """Replace the log with `records`, atomically."""
+        self._file.close()
+
+        tmp_name = self.filename + ".tmp"
+        with open(tmp_name, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(tmp_name, self.filename)
+
+        self._file = open(self.filename, "a", encoding="utf-8")
+        self.records_since_compaction = 0
+
+    def close(self):
+        self._file.close()
+
+
+def iter_journal(filename: str) -> Iterator[dict]:
+    """
+    Stream the records of a journal file one line at a time.
+
+    A last line without its newline is the trace of an interrupted write
+    and is skipped; any other malformed line is an error.
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if not line.endswith("\n"):
+                    return
+                raise ValueError(f"Corrupted journal {filename} at line {line_no}")
+
+
+# --------------------------------------------------
+# Streaming CSV / JSON Lines import and export
+# --------------------------------------------------
+RECORD_FIELDS = ("id", "day", "description", "priority", "due_date", "status")
+REQUIRED_FIELDS = ("day", "description")
+
+
+def _checked(record, filename: str, line_no: int) -> dict:
+    """`record` if it is an object with every required field, else ValueError naming the line."""
+    if not isinstance(record, dict):
+        raise ValueError(f"{filename} line {line_no}: expected an object")
+    missing = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if missing:
+        raise ValueError(f"{filename} line {line_no}: missing {', '.join(missing)}")
+    return record
+
+
+def iter_csv_records(filename: str) -> Iterator[dict]:
+    """Yield one dict per CSV row; empty cells become None."""
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            record = {key: (value if value != "" else None) for key, value in row.items()}
+            yield _checked(record, filename, reader.line_num)
+
+
+def write_csv_records(filename: str, records: Iterable[dict]) -> int:
+    count = 0
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def iter_jsonl_records(filename: str) -> Iterator[dict]:
+    with open(filename, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{filename} line {line_no}: {e}") from None
+                yield _checked(record, filename, line_no)
+
+
+def write_jsonl_records(filename: str, records: Iterable[dict]) -> int:
+    count = 0
+    with open(filename, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def iter_records(filename: str) -> Iterator[dict]:
+    """Pick the streaming reader from the file extension (.csv or .jsonl)."""
+    if filename.endswith(".csv"):
+        return iter_csv_records(filename)
+    if filename.endswith(".jsonl"):
+        return iter_jsonl_records(filename)
+    raise ValueError(f"Unsupported file type: {filename} (expected .csv or .jsonl)")
+
+
+def write_records(filename: str, records: Iterable[dict]) -> int:
+    if filename.endswith(".csv"):
+        return write_csv_records(filename, records)
+    if filename.endswith(".jsonl"):
+        return write_jsonl_records(filename, records)
+    raise ValueError(f"Unsupported file type: {filename} (expected .csv or .jsonl)")
+
+
+class StorageEngine(ABC):
+    """
+    Interface of the persistent backends a TaskManager can be attached to.
+
+    Engines exchange plain task records (see `Task.to_record`) so they do
+    not depend on the Task class itself.
+    """
+
+    @abstractmethod
+    def next_task_id(self) -> int:
+        """The ID the next new task will get (IDs are never reused)."""
+
+    @abstractmethod
+    def days(self) -> list:
+        """Days that have at least one stored task."""
+
+    @abstractmethod
+    def count_by_day(self) -> dict:
+        """Number of stored tasks of each day that has any."""
+
+    @abstractmethod
+    def load_day(self, day: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[dict]:
+        """
+        Stored records of one day, in insertion order; with `offset` and
+        `limit`, only that slice of them.
+        """
+
+    @abstractmethod
+    def find_day(self, task_id: int) -> Optional[str]:
+        """Day of a stored task, or None if it is not stored."""
+
+    @abstractmethod
+    def find_days(
+        self,
+        status: Optional[str] = None,
+        exclude_status: Optional[str] = None,
+        priority: Optional[str] = None,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+        due_before: Optional[date] = None,
+        words: Iterable[str] = (),
+        skip_days: Iterable[str] = (),
+        soonest: Optional[int] = None,
+    ) -> list:
+        """
+        Days, other than `skip_days`, with at least one stored task matching
+        every given filter. `due_from` and `due_to` are inclusive,
+        `due_before` is exclusive, and any due-date filter only matches
+        tasks that have a due date. Each of `words` must appear in the
+        lower-cased description. With `soonest`, only the `soonest`
+        matching tasks due first are considered.
+        """
+
+    @abstractmethod
+    def write_tasks(
+        self,
+        records: Iterable[dict],
+        deleted_ids: Iterable[int] = (),
+        next_id: Optional[int] = None,
+    ):
+        """
+        Insert or update a batch of records, delete `deleted_ids` and
+        store `next_id`, all in a single transaction.
+        """
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage(StorageEngine):
+    """
+    SQLite backend: one row per task, indexed on the columns `find_days`
+    filters on, so a query only loads the days holding a match.
+    """
+
+    COLUMNS = RECORD_FIELDS
+
+    def __init__(self, filename: str = "tasks.db"):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        # Unicode-aware lower(), matching how the search index tokenizes
+        self.conn.create_function("py_lower", 1, str.lower, deterministic=True)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id          INTEGER PRIMARY KEY,
+                    day         TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    priority    TEXT NOT NULL,
+                    due_date    TEXT,
+                    status      TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tasks_day ON tasks(day);
+                CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+                CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+                CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+
+    def next_task_id(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        (max_id,) = self.conn.execute("SELECT MAX(id) FROM tasks").fetchone()
+        return max(row[0] if row else 0, -1 if max_id is None else max_id + 1)
+
+    def days(self) -> list:
+        return [day for (day,) in self.conn.execute("SELECT DISTINCT day FROM tasks")]
+
+    def count_by_day(self) -> dict:
+        return dict(self.conn.execute("SELECT day, COUNT(*) FROM tasks GROUP BY day"))
+
+    def load_day(self, day: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[dict]:
+        # idx_tasks_day entries are ordered by (day, rowid = id): a page only
+        # reads its own rows, plus the skipped index entries
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM tasks WHERE day = ? ORDER BY id LIMIT ? OFFSET ?",
+            (day, -1 if limit is None else limit, offset),
+        )
+        for row in cursor:
+            yield dict(zip(self.COLUMNS, row))
+
+    def find_day(self, task_id: int) -> Optional[str]:
+        row = self.conn.execute("SELECT day FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return row[0] if row else None
+
+    def find_days(
+        self,
+        status: Optional[str] = None,
+        exclude_status: Optional[str] = None,
+        priority: Optional[str] = None,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+        due_before: Optional[date] = None,
+        words: Iterable[str] = (),
+        skip_days: Iterable[str] = (),
+        soonest: Optional[int] = None,
+    ) -> list:
+        where, params = [], []
+        for condition, value in (
+            ("status = ?", status),
+            ("status != ?", exclude_status),
+            ("priority = ?", priority),
+            ("due_date >= ?", due_from.isoformat() if due_from else None),
+            ("due_date <= ?", due_to.isoformat() if due_to else None),
+            ("due_date < ?", due_before.isoformat() if due_before else None),
+        ):
+            if value is not None:
+                where.append(condition)
+                params.append(value)
+        if soonest is not None:
+            where.append("due_date IS NOT NULL")
+        for word in words:
+            where.append("instr(py_lower(description), ?) > 0")
+            params.append(word)
+        skip_days = list(skip_days)
+        if skip_days:
+            where.append(f"day NOT IN ({', '.join('?' * len(skip_days))})")
+            params.extend(skip_days)
+
+        sql = "SELECT day FROM tasks"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if soonest is not None:
+            sql = f"SELECT DISTINCT day FROM ({sql} ORDER BY due_date, id LIMIT ?)"
+            params.append(soonest)
+        else:
+            sql = sql.replace("SELECT day", "SELECT DISTINCT day", 1)
+        return [day for (day,) in self.conn.execute(sql, params)]
+
+    def write_tasks(
+        self,
+        records: Iterable[dict],
+        deleted_ids: Iterable[int] = (),
+        next_id: Optional[int] = None,
+    ):
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                (tuple(record[c] for c in self.COLUMNS) for record in records),
+            )
+            self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?",
+                ((task_id,) for task_id in deleted_ids),
+            )
+            if next_id is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)",
+                    (next_id,),
+                )
+
+    def close(self):
+        self.conn.close()
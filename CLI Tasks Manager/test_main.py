@@ -0,0 +1,741 @@
+import io
+import json
+import multiprocessing
+import os
+import random
+import threading
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+from datetime import date
+
+from main import DAYS, ConcurrentTaskManager, TaskManager, run_batch
+from scheduler import DueDateIndex
+from search import InvertedIndex
+from storage import SQLiteStorage, StorageEngine
+
+
+STRESS_DAYS = ["Monday", "Tuesday", "General"]
+
+
+def _concurrent_writer(path, worker, count):
+    """Stress-test worker: add a task and save, `count` times, never reloading."""
+    manager = ConcurrentTaskManager()
+    for i in range(count):
+        manager.add_task(STRESS_DAYS[i % len(STRESS_DAYS)], f"worker {worker} task {i}")
+        if i % 3 == 2:
+            manager.mark_task_done(STRESS_DAYS[i % len(STRESS_DAYS)], 0)
+        manager.save_to_file(path)
+
+
+class TestTaskIndexes(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager()
+        self.a = self.manager.add_task("Monday", "Buy milk", "high", date(2026, 1, 5))
+        self.b = self.manager.add_task("Monday", "Call Lucy", "low", date(2026, 1, 2))
+        self.c = self.manager.add_task("Friday", "Do laundry", "high")
+
+    def test_get_task_by_id(self):
+        self.assertIs(self.manager.get_task(self.b.id), self.b)
+        with self.assertRaises(ValueError):
+            self.manager.get_task(-1)
+
+    def test_query_combines_filters(self):
+        self.assertEqual(self.manager.query(priority="high"), [self.a, self.c])
+        self.assertEqual(self.manager.query(day="Monday", priority="high"), [self.a])
+        self.assertEqual(self.manager.query(day="Sunday"), [])
+        self.assertEqual(len(self.manager.query()), 3)
+
+    def test_query_by_due_date_range(self):
+        self.assertEqual(self.manager.query(due_to=date(2026, 1, 2)), [self.b])
+        self.assertEqual(self.manager.query(due_from=date(2026, 1, 3)), [self.a])
+        self.assertEqual(
+            self.manager.query(due_from=date(2026, 1, 1), due_to=date(2026, 1, 31)),
+            [self.a, self.b],
+        )
+
+    def test_indexes_follow_edit_and_done(self):
+        self.manager.mark_task_done("Monday", 0)
+        self.manager.edit_task("Friday", 0, priority="low", due_date=date(2026, 1, 1))
+
+        self.assertEqual(self.manager.query(status="done"), [self.a])
+        self.assertEqual(self.manager.query(status="pending", priority="low"), [self.b, self.c])
+        self.assertEqual(self.manager.query(due_to=date(2026, 1, 1)), [self.c])
+
+    def test_indexes_rebuilt_on_load(self):
+        self.manager.mark_task_done("Friday", 0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.json")
+            self.manager.save_to_file(path)
+
+            loaded = TaskManager()
+            loaded.load_from_file(path)
+
+        done = loaded.query(status="done")
+        self.assertEqual([t.description for t in done], ["Do laundry"])
+        self.assertEqual(len(loaded.query(day="Monday")), 2)
+
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _line_count(self):
+        with open(self.path, encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def test_each_change_appends_one_record(self):
+        manager = TaskManager()
+        manager.open_journal(self.path)
+        manager.add_task("Monday", "Buy milk")
+        manager.add_task("Monday", "Call Lucy")
+        manager.edit_task("Monday", 1, priority="high", due_date=date(2026, 3, 1))
+        manager.mark_task_done("Monday", 0)
+        manager.close_journal()
+
+        self.assertEqual(self._line_count(), 1 + 4)  # next_id header + one per change
+
+        replayed = TaskManager()
+        replayed.load_from_journal(self.path)
+        milk, lucy = replayed.tasks_by_day["Monday"]
+        self.assertEqual(milk.status, "done")
+        self.assertEqual((lucy.priority, lucy.due_date), ("high", date(2026, 3, 1)))
+        self.assertEqual(replayed.query(priority="high"), [lucy])
+
+    def test_compaction_keeps_state(self):
+        manager = TaskManager()
+        manager.open_journal(self.path, compact_every=5)
+        for i in range(3):
+            manager.add_task("Friday", f"task {i}")
+        for _ in range(2):
+            manager.edit_task("Friday", 0, description="renamed")
+            manager.edit_task("Friday", 0, description="task 0")
+        manager.close_journal()
+
+        self.assertLess(self._line_count(), 7)
+
+        reopened = TaskManager()
+        reopened.open_journal(self.path)
+        reopened.close_journal()
+        self.assertEqual(
+            [t.description for t in reopened.tasks_by_day["Friday"]],
+            ["task 0", "task 1", "task 2"],
+        )
+
+    def test_truncated_last_record_is_ignored(self):
+        manager = TaskManager()
+        manager.open_journal(self.path)
+        manager.add_task("Sunday", "Rest")
+        manager.close_journal()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"op":"add","id":')
+
+        replayed = TaskManager()
+        replayed.load_from_journal(self.path)
+        self.assertEqual(len(replayed.query()), 1)
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_keeps_priority_and_due_date(self):
+        manager = TaskManager()
+        manager.open_storage(SQLiteStorage(self.path))
+        task = manager.add_task("Monday", "Buy milk", "high", date(2026, 2, 1))
+        manager.add_task("Friday", "Do laundry")
+        manager.mark_task_done("Friday", 0)
+        manager.save_to_storage()
+        manager.close_storage()
+
+        reopened = TaskManager()
+        reopened.open_storage(SQLiteStorage(self.path))
+        (loaded,) = reopened.view_tasks("Monday")["Monday"]
+        self.assertEqual(
+            (loaded.id, loaded.priority, loaded.due_date),
+            (task.id, "high", date(2026, 2, 1)),
+        )
+        self.assertEqual([t.description for t in reopened.query(status="done")], ["Do laundry"])
+        reopened.close_storage()
+
+    def test_days_are_loaded_lazily(self):
+        manager = TaskManager()
+        manager.open_storage(SQLiteStorage(self.path))
+        for day in ("Monday", "Tuesday", "Wednesday"):
+            manager.add_task(day, f"{day} task")
+        manager.save_to_storage()
+        manager.close_storage()
+
+        reopened = TaskManager()
+        reopened.open_storage(SQLiteStorage(self.path))
+        self.assertEqual(reopened.tasks_by_day, {})
+
+        reopened.edit_task("Tuesday", 0, description="changed")
+        self.assertEqual(list(reopened.tasks_by_day), ["Tuesday"])
+        self.assertEqual(len(reopened.query()), 3)
+
+        new_task = reopened.add_task("Monday", "another")
+        self.assertGreater(new_task.id, max(t.id for t in reopened.query(day="Tuesday")))
+        reopened.save_to_storage()
+        reopened.close_storage()
+
+        again = TaskManager()
+        again.open_storage(SQLiteStorage(self.path))
+        self.assertEqual(again.view_tasks("Tuesday")["Tuesday"][0].description, "changed")
+        self.assertEqual(len(again.view_tasks("Monday")["Monday"]), 2)
+        again.close_storage()
+
+    def test_queries_only_load_matching_days(self):
+        manager = TaskManager()
+        manager.open_storage(SQLiteStorage(self.path))
+        manager.add_task("Monday", "Buy milk", "high", date(2026, 1, 5))
+        manager.add_task("Tuesday", "Call Lucy", "low", date(2026, 1, 2))
+        manager.add_task("Friday", "Do laundry", "high")
+        manager.add_task("Sunday", "Crème brûlée", "low", date(2026, 3, 1))
+        manager.mark_task_done("Tuesday", 0)
+        manager.save_to_storage()
+        manager.close_storage()
+
+        def reopen():
+            reopened = TaskManager()
+            reopened.open_storage(SQLiteStorage(self.path))
+            self.addCleanup(reopened.close_storage)
+            return reopened
+
+        cases = [
+            (lambda m: m.query(priority="high"), ["Buy milk", "Do laundry"], {"Monday", "Friday"}),
+            (lambda m: m.query(status="Done"), ["Call Lucy"], {"Tuesday"}),
+            (lambda m: m.query(due_from=date(2026, 1, 3)), ["Buy milk", "Crème brûlée"], {"Monday", "Sunday"}),
+            (lambda m: m.search("laun"), ["Do laundry"], {"Friday"}),
+            (lambda m: m.search("CRÈME"), ["Crème brûlée"], {"Sunday"}),
+            (lambda m: m.next_due(1), ["Buy milk"], {"Monday"}),
+            (lambda m: m.overdue(date(2026, 2, 1)), ["Buy milk"], {"Monday"}),
+            (lambda m: m.due_between(date(2026, 1, 1), date(2026, 1, 31)), ["Call Lucy", "Buy milk"], {"Monday", "Tuesday"}),
+        ]
+        for run, expected, days in cases:
+            reopened = reopen()
+            self.assertEqual([t.description for t in run(reopened)], expected)
+            self.assertEqual(set(reopened.tasks_by_day), days)
+
+        # unsaved changes of a loaded day win over the stored rows
+        reopened = reopen()
+        reopened.mark_task_done("Monday", 0)
+        self.assertEqual([t.description for t in reopened.next_due(1)], ["Crème brûlée"])
+
+    def test_storage_engine_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StorageEngine()
+
+
+class TestBulkAndBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_bulk_add_and_update(self):
+        manager = TaskManager()
+        added = manager.bulk_add(
+            {"day": "Monday", "description": f"task {i}", "due_date": f"2026-01-{30 - i:02d}"}
+            for i in range(20)
+        )
+        self.assertEqual(added, 20)
+
+        ids = [t.id for t in manager.query(day="Monday")]
+        manager.bulk_update([
+            {"id": ids[0], "priority": "high"},
+            {"id": ids[1], "status": "done"},
+        ])
+        self.assertEqual([t.id for t in manager.query(priority="high")], [ids[0]])
+        self.assertEqual([t.id for t in manager.query(status="done")], [ids[1]])
+        self.assertEqual(
+            [t.id for t in manager.query(due_to=date(2026, 1, 12))],
+            sorted(ids[18:]),
+        )
+
+    def test_export_import_round_trip(self):
+        manager = TaskManager()
+        manager.add_task("Monday", "Buy milk, eggs", "high", date(2026, 1, 2))
+        manager.add_task("Friday", "Laundry")
+        manager.mark_task_done("Friday", 0)
+
+        for ext in ("csv", "jsonl"):
+            path = os.path.join(self.tmp.name, f"tasks.{ext}")
+            self.assertEqual(manager.export_tasks(path), 2)
+
+            imported = TaskManager()
+            self.assertEqual(imported.import_tasks(path), 2)
+            milk = imported.query(day="Monday")[0]
+            self.assertEqual(
+                (milk.description, milk.priority, milk.due_date),
+                ("Buy milk, eggs", "high", date(2026, 1, 2)),
+            )
+            self.assertEqual(len(imported.query(status="done")), 1)
+
+    def test_malformed_import_rows_are_reported(self):
+        csv_path = os.path.join(self.tmp.name, "tasks.csv")
+        with open(csv_path, "w") as f:
+            f.write("day,description,priority\nMonday,Buy milk,high\nTuesday,,low\n")
+        jsonl_path = os.path.join(self.tmp.name, "tasks.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write('{"day": "Monday", "description": "Call mum"}\n{"description": "no day"}\n')
+
+        manager = TaskManager()
+        with redirect_stderr(io.StringIO()) as err:
+            count = run_batch(manager, [f'import "{csv_path}"', f'import "{jsonl_path}"', "add Friday Laundry"])
+
+        self.assertEqual(count, 3)
+        self.assertIn(f"Error on line 1: {csv_path} line 3: missing description", err.getvalue())
+        self.assertIn(f"Error on line 2: {jsonl_path} line 2: missing day", err.getvalue())
+        # rows before the bad one are kept, and the batch goes on
+        self.assertEqual(
+            [t.description for t in manager.query()],
+            ["Buy milk", "Call mum", "Laundry"],
+        )
+
+    def test_run_batch(self):
+        manager = TaskManager()
+        lines = [
+            "# comment",
+            'add Monday "Buy milk" high 2026-01-02',
+            "add Friday Laundry",
+            "done Monday 0",
+            'edit Friday 0 "" low',
+            "done Sunday 3",
+        ]
+        with redirect_stderr(io.StringIO()) as err:
+            count = run_batch(manager, lines)
+
+        self.assertEqual(count, 5)
+        self.assertIn("Error on line 6", err.getvalue())
+        self.assertIn("ops/sec", err.getvalue())
+        self.assertEqual(manager.tasks_by_day["Monday"][0].status, "done")
+        self.assertEqual(manager.tasks_by_day["Friday"][0].priority, "low")
+
+
+class TestDueDateScheduling(unittest.TestCase):
+    def test_index_matches_sorted_list(self):
+        rng = random.Random(7)
+        index = DueDateIndex()
+        index.LOAD = 4  # force many bucket splits
+        expected = []
+        for task_id in range(500):
+            pair = (date(2026, 1, 1 + rng.randrange(28)), task_id)
+            index.add(*pair)
+            expected.append(pair)
+        for pair in rng.sample(expected, 200):
+            self.assertTrue(index.remove(*pair))
+            expected.remove(pair)
+        self.assertFalse(index.remove(date(2026, 1, 1), 9999))
+        index.update([(date(2026, 1, 15), 1000), (date(2026, 1, 3), 1001)])
+        expected += [(date(2026, 1, 15), 1000), (date(2026, 1, 3), 1001)]
+        expected.sort()
+
+        self.assertEqual(list(index), expected)
+        self.assertEqual(len(index), len(expected))
+        start, end = date(2026, 1, 5), date(2026, 1, 9)
+        self.assertEqual(
+            list(index.irange(start, end)),
+            [p for p in expected if start <= p[0] <= end],
+        )
+        self.assertEqual(
+            list(index.irange(end=end, inclusive_end=False)),
+            [p for p in expected if p[0] < end],
+        )
+
+    def test_next_due_overdue_and_range(self):
+        manager = TaskManager()
+        early = manager.add_task("Monday", "early", due_date=date(2026, 1, 1))
+        mid = manager.add_task("Monday", "mid", due_date=date(2026, 1, 10))
+        late = manager.add_task("Friday", "late", due_date=date(2026, 2, 1))
+        manager.add_task("Friday", "no due date")
+
+        self.assertEqual(manager.next_due(2), [early, mid])
+        self.assertEqual(manager.next_due(5, as_of=date(2026, 1, 5)), [mid, late])
+        self.assertEqual(manager.overdue(date(2026, 1, 10)), [early])
+        self.assertEqual(manager.due_between(date(2026, 1, 1), date(2026, 1, 10)), [early, mid])
+
+        manager.mark_task_done("Monday", 0)
+        manager.edit_task("Friday", 0, due_date=date(2026, 1, 2))
+        self.assertEqual(manager.next_due(1), [late])
+        self.assertEqual(manager.overdue(date(2026, 1, 10)), [late])
+        self.assertEqual(
+            manager.due_between(date(2026, 1, 1), date(2026, 1, 5)), [early, late]
+        )
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager()
+        self.milk = self.manager.add_task("Monday", "Buy milk at the grocery store")
+        self.groceries = self.manager.add_task("Tuesday", "Groceries: milk, milk and bread")
+        self.lucy = self.manager.add_task("Friday", "Call Lucy about the store")
+
+    def test_ranking_and_prefix(self):
+        self.assertEqual(self.manager.search("milk"), [self.groceries, self.milk])
+        self.assertEqual(self.manager.search("groc"), [self.milk, self.groceries])
+        self.assertEqual(self.manager.search("store call"), [self.lucy])
+        self.assertEqual(self.manager.search("milk", limit=1), [self.groceries])
+        self.assertEqual(self.manager.search("nothing"), [])
+
+    def test_index_follows_edits(self):
+        self.manager.edit_task("Friday", 0, description="Call Bob")
+        self.assertEqual(self.manager.search("lucy"), [])
+        self.assertEqual(self.manager.search("bob"), [self.lucy])
+
+    def test_saved_index_is_loaded_without_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.json")
+            self.manager.save_to_file(path)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "tasks.index.json")))
+
+            loaded = TaskManager()
+            with mock.patch.object(InvertedIndex, "add") as add:
+                loaded.load_from_file(path)
+            add.assert_not_called()
+            self.assertEqual(
+                [t.description for t in loaded.search("milk")],
+                [self.groceries.description, self.milk.description],
+            )
+
+            # a task file changed behind the index's back forces a rebuild
+            index_path = os.path.join(tmp, "tasks.index.json")
+            with open(index_path, encoding="utf-8") as f:
+                stale_index = f.read()
+            other = TaskManager()
+            other.add_task("Monday", "Walk the dog")
+            other.save_to_file(path)
+            with open(index_path, "w", encoding="utf-8") as f:
+                f.write(stale_index)
+
+            reloaded = TaskManager()
+            reloaded.load_from_file(path)
+            self.assertEqual([t.description for t in reloaded.search("dog")], ["Walk the dog"])
+            self.assertEqual(reloaded.search("milk"), [])
+
+    def test_same_size_edit_invalidates_saved_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.json")
+            self.manager.save_to_file(path)
+
+            # edited by hand: the file keeps its size, the index is stale
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content.replace("Buy milk", "Buy silk"))
+
+            loaded = TaskManager()
+            loaded.load_from_file(path)
+            self.assertEqual([t.description for t in loaded.search("silk")], ["Buy silk at the grocery store"])
+            self.assertEqual(
+                [t.description for t in loaded.search("milk")],
+                ["Groceries: milk, milk and bread"],
+            )
+
+
+class TestStableIds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _manager_with_tasks(self):
+        manager = TaskManager()
+        for i in range(4):
+            manager.add_task("Monday", f"task {i}", due_date=date(2026, 1, 1 + i))
+        return manager
+
+    def test_ids_are_per_manager_and_monotonic(self):
+        manager = self._manager_with_tasks()
+        self.assertEqual([t.id for t in manager.query()], [0, 1, 2, 3])
+        self.assertEqual(TaskManager().add_task("Monday", "other").id, 0)
+
+        manager.delete_task(3)
+        self.assertEqual(manager.add_task("Monday", "task 4").id, 4)
+
+    def test_id_operations_survive_deletions(self):
+        manager = self._manager_with_tasks()
+        manager.delete_task(1)
+
+        manager.mark_done_by_id(2)
+        manager.edit_task_by_id(3, description="renamed", priority="high")
+        self.assertEqual([t.id for t in manager.tasks_by_day["Monday"]], [0, 2, 3])
+        self.assertEqual([t.id for t in manager.query(status="done")], [2])
+        self.assertEqual(manager.query(priority="high"), [manager.get_task(3)])
+        self.assertEqual([t.id for t in manager.next_due(5)], [0, 3])
+        self.assertEqual(manager.search("task"), [manager.get_task(0), manager.get_task(2)])
+        with self.assertRaises(ValueError):
+            manager.get_task(1)
+
+    def test_ids_persist_through_file_journal_and_database(self):
+        manager = self._manager_with_tasks()
+        manager.delete_task(3)
+
+        path = os.path.join(self.tmp.name, "tasks.json")
+        manager.save_to_file(path)
+        loaded = TaskManager()
+        loaded.load_from_file(path)
+        self.assertEqual([t.id for t in loaded.query()], [0, 1, 2])
+        self.assertEqual(loaded.add_task("Friday", "new").id, 4)
+
+        journal_path = os.path.join(self.tmp.name, "tasks.jsonl")
+        journaled = self._manager_with_tasks()
+        journaled.open_journal(journal_path, compact_every=2)
+        journaled.add_task("Friday", "new")
+        journaled.delete_task(4)
+        journaled.close_journal()
+        replayed = TaskManager()
+        replayed.load_from_journal(journal_path)
+        self.assertEqual([t.id for t in replayed.query()], [0, 1, 2, 3])
+        self.assertEqual(replayed.add_task("Friday", "newer").id, 5)
+
+        db_path = os.path.join(self.tmp.name, "tasks.db")
+        stored = TaskManager()
+        stored.open_storage(SQLiteStorage(db_path))
+        for i in range(3):
+            stored.add_task("Monday", f"task {i}")
+        stored.save_to_storage()
+        stored.delete_task(2)
+        stored.save_to_storage()
+        stored.close_storage()
+        reopened = TaskManager()
+        reopened.open_storage(SQLiteStorage(db_path))
+        self.assertEqual([t.id for t in reopened.query()], [0, 1])
+        self.assertEqual(reopened.add_task("Monday", "again").id, 3)
+        reopened.close_storage()
+
+    def test_batch_commands_by_id(self):
+        manager = self._manager_with_tasks()
+        with redirect_stderr(io.StringIO()):
+            run_batch(manager, ["done 2", 'edit 1 "first"', "delete 0"])
+        self.assertEqual(manager.get_task(2).status, "done")
+        self.assertEqual(manager.get_task(1).description, "first")
+        self.assertEqual([t.id for t in manager.query()], [1, 2, 3])
+
+
+class TestPagination(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager()
+        for day, count in (("Monday", 3), ("Tuesday", 0), ("Friday", 4)):
+            self.manager.tasks_by_day.setdefault(day, [])
+            for i in range(count):
+                self.manager.add_task(day, f"{day} {i}")
+
+    def test_iter_tasks_pages_across_days(self):
+        rows = list(self.manager.iter_tasks(offset=2, limit=3))
+        self.assertEqual(
+            [(day, i) for day, i, _ in rows],
+            [("Monday", 2), ("Friday", 0), ("Friday", 1)],
+        )
+        self.assertEqual(len(list(self.manager.iter_tasks())), 7)
+        self.assertEqual(list(self.manager.iter_tasks(offset=7)), [])
+        self.assertEqual(
+            [t.description for _, _, t in self.manager.iter_tasks("Friday", 3, 10)],
+            ["Friday 3"],
+        )
+
+    def test_format_page(self):
+        self.assertEqual(
+            self.manager.format_page(page=2, limit=3),
+            "\nFriday:\n"
+            "0: Friday 0 - Pending (ID 3)\n"
+            "1: Friday 1 - Pending (ID 4)\n"
+            "2: Friday 2 - Pending (ID 5)\n"
+            "\nPage 2 of 3 (7 tasks)\n",
+        )
+        self.assertIn("Page 1 of 1 (4 tasks)", self.manager.format_page("Friday", limit=10))
+        self.assertEqual(self.manager.format_page("Sunday"), "No tasks found.\n")
+
+    def test_batch_view_with_page_and_limit(self):
+        out = io.StringIO()
+        with redirect_stdout(out), redirect_stderr(io.StringIO()):
+            run_batch(self.manager, ["view Friday --page 2 --limit 3"])
+        self.assertIn("  3. [ID: 6] Friday 3", out.getvalue())
+        self.assertIn("Page 2 of 2 (4 tasks)", out.getvalue())
+
+    def test_pages_from_storage_without_loading_days(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tasks.db")
+            self.manager.open_storage(SQLiteStorage(path))
+            for day in ("Friday", "Monday"):  # stored out of DAYS order
+                for i in range(4 if day == "Friday" else 3):
+                    self.manager.add_task(day, f"{day} {i}")
+            self.manager.save_to_storage()
+            self.manager.close_storage()
+
+            manager = TaskManager()
+            manager.open_storage(SQLiteStorage(path))
+            expected = (
+                "\nMonday:\n"
+                "2: Monday 2 - Pending (ID 6)\n"
+                "\nFriday:\n"
+                "0: Friday 0 - Pending (ID 0)\n"
+                "\nPage 2 of 4 (7 tasks)\n"
+            )
+            with mock.patch.object(SQLiteStorage, "load_day", wraps=manager._storage.load_day) as load_day:
+                self.assertEqual(manager.format_page(page=2, limit=2), expected)
+            self.assertEqual(manager.tasks_by_day, {})
+            self.assertEqual(
+                [call.kwargs for call in load_day.call_args_list],
+                [{"offset": 2, "limit": 1}, {"offset": 0, "limit": 1}],
+            )
+
+            # a loaded day is paged from memory, with its unsaved changes
+            manager.edit_task("Monday", 2, description="changed")
+            manager.add_task("Monday", "Monday 3")
+            self.assertIn("2: changed - Pending (ID 6)\n3: Monday 3", manager.format_page(limit=4))
+            self.assertEqual(manager.count_tasks(), 8)
+            self.assertEqual(manager.count_tasks("Friday"), 4)
+            manager.close_storage()
+
+
+class TestConcurrentTaskManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_concurrent_saves_merge_instead_of_clobbering(self):
+        setup = ConcurrentTaskManager()
+        setup.add_task("Monday", "shared one")
+        setup.add_task("Monday", "shared two")
+        setup.save_to_file(self.path)
+
+        alice = ConcurrentTaskManager()
+        alice.load_from_file(self.path)
+        bob = ConcurrentTaskManager()
+        bob.load_from_file(self.path)
+
+        alice.mark_task_done("Monday", 0)
+        alice.add_task("Friday", "alice's task")
+        bob.edit_task("Monday", 1, description="shared two (edited)")
+        bob.add_task("Friday", "bob's task")
+
+        alice.save_to_file(self.path)
+        bob.save_to_file(self.path)
+
+        merged = TaskManager()
+        merged.load_from_file(self.path)
+        monday = merged.tasks_by_day["Monday"]
+        self.assertEqual(monday[0].status, "done")
+        self.assertEqual(monday[1].description, "shared two (edited)")
+        self.assertEqual(
+            sorted(t.description for t in merged.tasks_by_day["Friday"]),
+            ["alice's task", "bob's task"],
+        )
+        self.assertEqual(len({t.id for t in merged.query()}), 4)
+
+    def test_deletions_are_merged(self):
+        setup = ConcurrentTaskManager()
+        for i in range(3):
+            setup.add_task("Monday", f"task {i}")
+        setup.save_to_file(self.path)
+
+        alice = ConcurrentTaskManager()
+        alice.load_from_file(self.path)
+        bob = ConcurrentTaskManager()
+        bob.load_from_file(self.path)
+
+        alice.delete_task(0)
+        bob.delete_task(2)
+        alice.save_to_file(self.path)
+        bob.save_to_file(self.path)
+
+        merged = TaskManager()
+        merged.load_from_file(self.path)
+        self.assertEqual([t.id for t in merged.query()], [1])
+
+    def write_legacy_file(self, *descriptions):
+        """A tasks.json saved before tasks had IDs and versions."""
+        data = {day: [] for day in DAYS}
+        data["Monday"] = [{"task": description, "status": "Pending"} for description in descriptions]
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+
+    def test_legacy_file_round_trip(self):
+        self.write_legacy_file("a", "b")
+
+        manager = ConcurrentTaskManager()
+        manager.load_from_file(self.path)
+        manager.edit_task("Monday", 1, description="b (edited)")
+        manager.add_task("Friday", "new")
+        manager.save_to_file(self.path)
+
+        reloaded = TaskManager()
+        reloaded.load_from_file(self.path)
+        self.assertEqual(
+            [(t.id, t.day, t.description) for t in reloaded.query()],
+            [(0, "Monday", "a"), (1, "Monday", "b (edited)"), (2, "Friday", "new")],
+        )
+
+    def test_legacy_records_are_kept_by_a_writer_that_never_loaded(self):
+        self.write_legacy_file("a", "b")
+
+        manager = ConcurrentTaskManager()
+        manager.add_task("Friday", "new")
+        manager.save_to_file(self.path)
+
+        reloaded = TaskManager()
+        reloaded.load_from_file(self.path)
+        self.assertEqual(
+            sorted((t.day, t.description) for t in reloaded.query()),
+            [("Friday", "new"), ("Monday", "a"), ("Monday", "b")],
+        )
+        self.assertEqual(len({t.id for t in reloaded.query()}), 3)
+        # the adopted tasks are now known here: a second save changes nothing
+        manager.save_to_file(self.path)
+        self.assertEqual(len(manager.query()), 3)
+
+    def test_threads_share_one_manager(self):
+        manager = ConcurrentTaskManager()
+
+        def worker(n):
+            for i in range(200):
+                manager.add_task("Monday", f"thread {n} task {i}", due_date=date(2026, 1, 1 + i % 28))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(manager.query(day="Monday")), 800)
+        self.assertEqual(len(manager.due_between(date(2026, 1, 1), date(2026, 1, 28))), 800)
+
+    def test_stress_multiple_processes(self):
+        workers, per_worker = 4, 15
+        processes = [
+            multiprocessing.Process(target=_concurrent_writer, args=(self.path, n, per_worker))
+            for n in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        merged = TaskManager()
+        merged.load_from_file(self.path)
+        tasks = merged.query()
+        self.assertEqual(len(tasks), workers * per_worker)
+        self.assertEqual(
+            sorted(t.description for t in tasks),
+            sorted(f"worker {n} task {i}" for n in range(workers) for i in range(per_worker)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
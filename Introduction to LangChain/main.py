@@ -1,5 +1,6 @@
 
 import dotenv
+import hashlib
 import os
 from langchain_community.document_loaders import TextLoader
 from langchain_chroma import Chroma
@@ -29,12 +30,23 @@ embeddings_model = OpenAIEmbeddings(
     api_key=os.getenv("OPENROUTER_API_KEY")
 )
 
+# kept on disk between runs; each planet's id is the sha256 of its text,
+# so only new or changed planet files are sent to the embedding API
 db = Chroma(
     collection_name="hyper-collection",
-    embedding_function=embeddings_model
+    embedding_function=embeddings_model,
+    persist_directory="chroma_db"
 )
 
-db.add_documents(documents=documents)
+ids = [hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest() for doc in documents]
+stored = set(db.get(include=[])["ids"])
+new_docs = [(doc_id, doc) for doc_id, doc in zip(ids, documents) if doc_id not in stored]
+if new_docs:
+    db.add_documents(documents=[doc for _, doc in new_docs], ids=[doc_id for doc_id, _ in new_docs])
+stale = list(stored - set(ids))
+if stale:
+    db.delete(ids=stale)
+print(f"{len(new_docs)} planets embedded, {len(documents) - len(new_docs)} already stored.")
 
 
 llm = ChatOpenAI(